@@ -0,0 +1,26 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:10
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedUser',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('email', models.EmailField(max_length=255, unique=True)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('groups', models.JSONField(default=list)),
+                ('auth_token', models.CharField(blank=True, db_index=True, max_length=40)),
+                ('refresh_tokens', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('archived_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -1,6 +1,9 @@
 import uuid
 
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models.functions import Upper
+from django.db.models.signals import m2m_changed
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, \
                                                         PermissionsMixin
 
@@ -46,3 +49,60 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     objects = UserManager()
     USERNAME_FIELD = 'email'
+
+    class Meta:
+        indexes = [
+            models.Index(Upper('email'), name='accounts_user_email_upper'),
+        ]
+
+
+class RefreshToken(models.Model):
+    """Server-side refresh token of the signed access token mode"""
+    id = models.UUIDField(default=uuid.uuid4, primary_key=True, editable=False)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='refresh_tokens'
+    )
+    token_hash = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    revoked_at = models.DateTimeField(blank=True, null=True)
+
+
+class ArchivedUser(models.Model):
+    """Inactive user moved out of accounts_user, restorable on demand"""
+    id = models.UUIDField(primary_key=True, editable=False)
+    email = models.EmailField(max_length=255, unique=True)
+    # Remaining user columns, the password hash included
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    groups = models.JSONField(default=list)
+    auth_token = models.CharField(max_length=40, blank=True, db_index=True)
+    refresh_tokens = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    archived_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.email
+
+
+def revoke_tokens_on_groups_change(sender, instance, action, reverse, pk_set,
+                                   **kwargs):
+    """Signed access tokens carry group names, so drop the stale ones"""
+    from .tokens import revoke_user_access_tokens
+
+    if action == 'pre_clear' and reverse:
+        user_ids = list(instance.user_set.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        user_ids = pk_set if reverse else [instance.pk]
+    elif action == 'post_clear' and not reverse:
+        user_ids = [instance.pk]
+    else:
+        return
+    for user_id in user_ids:
+        revoke_user_access_tokens(user_id)
+
+
+m2m_changed.connect(
+    revoke_tokens_on_groups_change,
+    sender=User.groups.through
+)
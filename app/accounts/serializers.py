@@ -1,8 +1,11 @@
 from django.contrib.auth import get_user_model, authenticate
+from django.contrib.auth.hashers import check_password
 from django.utils.translation import ugettext_lazy as _
 
 from rest_framework import serializers
 
+from .authentication import ArchivedAccount
+from .models import ArchivedUser
 from .utils import Util
 
 
@@ -68,8 +71,18 @@ class AuthTokenSerializer(serializers.Serializer):
             password=password,
         )
         if not user:
+            archived = ArchivedUser.objects.filter(email=email).first()
+            # Only the owner of the archived account learns it is archived
+            if archived and check_password(
+                    password, archived.data.get('password')):
+                raise ArchivedAccount()
             msg = _('Unable to authenticate with provided credentials')
             raise serializers.ValidationError(msg, code='authentication')
 
         attrs['user'] = user
         return attrs
+
+
+class RefreshTokenSerializer(serializers.Serializer):
+    """Serializer for the refresh token of the signed token mode"""
+    refresh = serializers.CharField()
@@ -0,0 +1,121 @@
+from unittest import mock
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework import status
+
+from accounts.authentication import SignedTokenAuthentication
+from accounts.models import RefreshToken
+from accounts.throttling import LoginRateThrottle
+from accounts.tokens import InvalidToken, decode_access_token
+from core.utils import HelperTest
+from university.permissions import SchoolAdministrators
+
+SIGNED_TOKEN_URL = reverse('accounts:signed_token')
+REFRESH_URL = reverse('accounts:signed_token_refresh')
+REVOKE_URL = reverse('accounts:signed_token_revoke')
+ME_URL = reverse('accounts:me')
+
+
+class SignedTokenTests(TestCase):
+    """Tests for the signed access token mode"""
+    def setUp(self):
+        cache.clear()
+        LoginRateThrottle.buckets.clear()
+        self.addCleanup(cache.clear)
+        self.addCleanup(LoginRateThrottle.buckets.clear)
+        self.client = APIClient()
+        self.payload = {'email': 'test@email.com', 'password': 'password'}
+        self.user = HelperTest.create_user(name='Test', **self.payload)
+        HelperTest.create_allowed_groups(['School Admin'])
+
+    def issue(self):
+        res = self.client.post(SIGNED_TOKEN_URL, self.payload)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def authenticate(self, access):
+        request = APIRequestFactory().get(
+            '/', HTTP_AUTHORIZATION=f'Bearer {access}'
+        )
+        return SignedTokenAuthentication().authenticate(request)
+
+    def test_issue_and_use_token(self):
+        """Test that a signed token authenticates requests"""
+        tokens = self.issue()
+        self.assertEqual(set(tokens), {'access', 'refresh', 'expires_in'})
+        self.assertTrue(RefreshToken.objects.filter(user=self.user).exists())
+
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}'
+        )
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.payload['email'])
+        self.assertEqual(res.data['name'], 'Test')
+
+    def test_permissions_without_queries(self):
+        """Test that authentication and group checks skip the database"""
+        HelperTest.add_user_allowed_group(self.user, ['School Admin'])
+        access = self.issue()['access']
+
+        with self.assertNumQueries(0):
+            user, payload = self.authenticate(access)
+            request = mock.Mock(user=user)
+            allowed = SchoolAdministrators().has_permission(request, None)
+
+        self.assertTrue(allowed)
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_tampered_and_expired_tokens(self):
+        """Test that changed or expired tokens are refused"""
+        access = self.issue()['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}x')
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        with override_settings(SIGNED_TOKEN_ACCESS_LIFETIME=-1):
+            with self.assertRaisesMessage(InvalidToken, 'Token expired.'):
+                decode_access_token(access)
+
+    def test_refresh_rotates_tokens(self):
+        """Test that a refresh token can only be used once"""
+        tokens = self.issue()
+        res = self.client.post(REFRESH_URL, {'refresh': tokens['refresh']})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.data['refresh'], tokens['refresh'])
+        decode_access_token(res.data['access'])
+
+        res = self.client.post(REFRESH_URL, {'refresh': tokens['refresh']})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoke_tokens(self):
+        """Test that revoked access and refresh tokens are refused"""
+        tokens = self.issue()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}'
+        )
+        res = self.client.post(REVOKE_URL, {'refresh': tokens['refresh']})
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertEqual(
+            self.client.get(ME_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+        self.client.credentials()
+        res = self.client.post(REFRESH_URL, {'refresh': tokens['refresh']})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_group_change_revokes_access(self):
+        """Test that tokens with stale group names are refused"""
+        access = self.issue()['access']
+        self.user.groups.add(Group.objects.get(name='School Admin'))
+
+        with self.assertRaisesMessage(InvalidToken, 'Token revoked.'):
+            decode_access_token(access)
@@ -0,0 +1,113 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from accounts.throttling import (
+    LoginAccountRateThrottle,
+    LoginIPRateThrottle,
+    LoginRateThrottle,
+    TokenBucket,
+)
+from core.utils import HelperTest
+
+GENERATE_TOKEN_USER = reverse('accounts:token')
+LOGIN_METRICS_URL = reverse('accounts:login_metrics')
+
+
+class TokenBucketTests(TestCase):
+    """Tests for the in-process token bucket"""
+    def test_bucket_refill(self):
+        """Test that tokens run out and refill with time"""
+        bucket = TokenBucket(capacity=2, rate=1)
+        self.assertEqual(bucket.consume('key', 100), 0)
+        self.assertEqual(bucket.consume('key', 100), 0)
+        self.assertEqual(bucket.consume('key', 100), 1)
+        self.assertEqual(bucket.consume('key', 101), 0)
+
+    def test_bucket_bounded(self):
+        """Test that the least recently used keys are dropped"""
+        bucket = TokenBucket(capacity=1, rate=1, max_keys=2)
+        for key in ('a', 'b', 'c'):
+            bucket.consume(key, 100)
+        self.assertEqual(list(bucket.buckets), ['b', 'c'])
+
+
+class LoginThrottleTests(TestCase):
+    """Tests for throttling and lockout of token requests"""
+    def setUp(self):
+        cache.clear()
+        LoginRateThrottle.buckets.clear()
+        self.addCleanup(cache.clear)
+        self.addCleanup(LoginRateThrottle.buckets.clear)
+        self.client = APIClient()
+        self.payload = {'email': 'test@email.com', 'password': 'password'}
+        HelperTest.create_user(**self.payload)
+
+    def login(self, password='password', email=None, ip='10.0.0.1'):
+        return self.client.post(
+            GENERATE_TOKEN_USER,
+            {'email': email or self.payload['email'], 'password': password},
+            REMOTE_ADDR=ip
+        )
+
+    @mock.patch.object(LoginIPRateThrottle, 'rate', '2/min', create=True)
+    def test_throttle_per_ip(self):
+        """Test that an address is throttled across accounts"""
+        self.assertEqual(self.login(email='a@email.com').status_code, 400)
+        self.assertEqual(self.login(email='b@email.com').status_code, 400)
+        with self.assertLogs('accounts.throttling', 'WARNING'):
+            res = self.login()
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', res)
+
+        self.assertEqual(self.login(ip='10.0.0.2').status_code, 200)
+
+    @mock.patch.object(LoginAccountRateThrottle, 'rate', '2/min', create=True)
+    def test_throttle_per_account(self):
+        """Test that an account is throttled across addresses"""
+        self.login(ip='10.0.0.1')
+        self.login(ip='10.0.0.2')
+        with self.assertLogs('accounts.throttling', 'WARNING'):
+            res = self.login(ip='10.0.0.3')
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(LOGIN_LOCKOUT_THRESHOLD=2)
+    def test_lockout_skips_password_check(self):
+        """Test that a locked account is refused before hashing"""
+        self.login(password='wrong')
+        with self.assertLogs('accounts.throttling', 'WARNING') as logs:
+            self.login(password='wrong', ip='10.0.0.2')
+        self.assertIn('Login locked for 30s', logs.output[0])
+
+        with mock.patch('accounts.serializers.authenticate') as authenticate:
+            res = self.login()
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        authenticate.assert_not_called()
+
+    @override_settings(LOGIN_LOCKOUT_THRESHOLD=2)
+    def test_success_resets_failures(self):
+        """Test that a successful login clears the failure count"""
+        self.login(password='wrong')
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+        self.login(password='wrong')
+        self.assertEqual(self.login().status_code, status.HTTP_200_OK)
+
+    def test_login_metrics(self):
+        """Test that admins read the login counters"""
+        self.login(password='wrong')
+        self.login()
+        self.client.force_authenticate(HelperTest.create_superuser(
+            email='admin@email.com',
+            password='password'
+        ))
+        res = self.client.get(LOGIN_METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['attempts'], 2)
+        self.assertEqual(res.data['failed'], 1)
+        self.assertEqual(res.data['succeeded'], 1)
@@ -0,0 +1,214 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from rest_framework.throttling import SimpleRateThrottle
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = 'accounts:login_metrics:%s'
+METRICS = ('attempts', 'throttled_ip', 'throttled_account', 'locked',
+           'failed', 'succeeded')
+
+
+def _incr(key, timeout=None):
+    """Atomically increment a shared cache counter, creating it if needed"""
+    if cache.add(key, 1, timeout):
+        return 1
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout)
+        return 1
+
+
+def record_metric(name):
+    _incr(METRICS_KEY % name)
+
+
+def get_login_metrics():
+    values = cache.get_many([METRICS_KEY % name for name in METRICS])
+    return {name: values.get(METRICS_KEY % name, 0) for name in METRICS}
+
+
+def account_ident(email):
+    """Cache-safe identity of the account an email refers to"""
+    email = str(email or '').strip().lower()
+    if not email:
+        return None
+    return hashlib.sha256(email.encode('utf-8')).hexdigest()[:32]
+
+
+class TokenBucket:
+    """
+    In-process token buckets, refilled continuously at `rate` per second.
+
+    Least recently used keys are dropped past `max_keys` so a burst of
+    distinct identities cannot grow the process memory without bound.
+    """
+
+    def __init__(self, capacity, rate, max_keys=10000):
+        self.capacity = capacity
+        self.rate = rate
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def consume(self, key, now):
+        """Take a token, returning 0 or the seconds until one is available"""
+        with self.lock:
+            tokens, updated = self.buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            wait = 0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+            return wait
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class LoginRateThrottle(SimpleRateThrottle):
+    """
+    Login throttle checked before any password hashing runs.
+
+    A per-process token bucket turns bursts away without a cache round
+    trip, then a fixed window counter in the shared cache enforces the
+    rate across every API process.
+    """
+    cache_format = 'throttle_%(scope)s_%(ident)s_%(window)s'
+    metric = None
+    wait_time = None
+    buckets = {}
+
+    def get_ident_value(self, request):
+        raise NotImplementedError('.get_ident_value() must be overridden')
+
+    def get_bucket(self):
+        bucket = self.buckets.get(self.scope)
+        if bucket is None:
+            bucket = TokenBucket(
+                self.num_requests, self.num_requests / self.duration
+            )
+            self.buckets[self.scope] = bucket
+        return bucket
+
+    def get_cache_key(self, request, view):
+        self.ident = self.get_ident_value(request)
+        if not self.ident:
+            return None
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.ident,
+            'window': int(self.now // self.duration),
+        }
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.now = self.timer()
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.wait_time = self.get_bucket().consume(self.ident, self.now)
+        if not self.wait_time:
+            count = _incr(self.key, self.duration)
+            if count > self.num_requests:
+                self.wait_time = self.duration - self.now % self.duration
+
+        if self.wait_time:
+            record_metric(self.metric)
+            logger.warning('Login throttled (%s): %s', self.scope, self.key)
+            return False
+        return True
+
+    def wait(self):
+        return self.wait_time
+
+
+class LoginIPRateThrottle(LoginRateThrottle):
+    scope = 'login_ip'
+    metric = 'throttled_ip'
+
+    def get_ident_value(self, request):
+        return self.get_ident(request)
+
+
+class LoginAccountRateThrottle(LoginRateThrottle):
+    """Per-account throttle that also enforces the failed login lockout"""
+    scope = 'login_account'
+    metric = 'throttled_account'
+
+    def get_ident_value(self, request):
+        try:
+            return account_ident(request.data.get('email'))
+        except AttributeError:
+            return None
+
+    def allow_request(self, request, view):
+        record_metric('attempts')
+        locked_for = get_lockout_remaining(
+            self.get_ident_value(request), self.timer()
+        )
+        if locked_for:
+            self.wait_time = locked_for
+            record_metric('locked')
+            return False
+        return super().allow_request(request, view)
+
+
+def _lockout_keys(ident):
+    return (f'accounts:login_failures:{ident}',
+            f'accounts:login_locked_until:{ident}')
+
+
+def get_lockout_remaining(ident, now):
+    """Seconds left on the account lockout, 0 when it can log in"""
+    if not ident:
+        return 0
+    locked_until = cache.get(_lockout_keys(ident)[1])
+    if locked_until and locked_until > now:
+        return locked_until - now
+    return 0
+
+
+def record_login_failure(email, now):
+    """
+    Count a failed login and lock the account once past the threshold.
+
+    Each failure over LOGIN_LOCKOUT_THRESHOLD doubles the lockout, from
+    LOGIN_LOCKOUT_BASE_SECONDS up to LOGIN_LOCKOUT_MAX_SECONDS.
+    """
+    record_metric('failed')
+    ident = account_ident(email)
+    if not ident:
+        return
+    failures_key, locked_key = _lockout_keys(ident)
+    failures = _incr(failures_key, settings.LOGIN_LOCKOUT_MAX_SECONDS)
+    excess = failures - settings.LOGIN_LOCKOUT_THRESHOLD
+    if excess >= 0:
+        backoff = min(
+            settings.LOGIN_LOCKOUT_BASE_SECONDS * 2 ** excess,
+            settings.LOGIN_LOCKOUT_MAX_SECONDS
+        )
+        cache.set(locked_key, now + backoff, backoff)
+        logger.warning('Login locked for %ss: %s', backoff, ident)
+
+
+def reset_login_failures(email):
+    record_metric('succeeded')
+    ident = account_ident(email)
+    if ident:
+        cache.delete_many(_lockout_keys(ident))
@@ -0,0 +1,129 @@
+import datetime
+import hashlib
+import secrets
+import time
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils import timezone
+
+from .activity import record_activity
+from .models import RefreshToken
+
+ACCESS_TOKEN_SALT = 'accounts.tokens.access'
+REVOKED_KEY = 'accounts:revoked_access:%s'
+NOT_BEFORE_KEY = 'accounts:access_not_before:%s'
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def _hash(refresh):
+    return hashlib.sha256(refresh.encode('utf-8')).hexdigest()
+
+
+def create_access_token(user):
+    """HMAC-signed token carrying the user id, email and group names"""
+    payload = {
+        'uid': str(user.pk),
+        'email': user.email,
+        'grp': sorted(user.groups.values_list('name', flat=True)),
+        'su': user.is_superuser,
+        'st': user.is_staff,
+        'jti': uuid.uuid4().hex,
+        'iat': time.time(),
+    }
+    return signing.dumps(payload, salt=ACCESS_TOKEN_SALT)
+
+
+def decode_access_token(token):
+    """
+    Verify an access token without touching the database.
+
+    Raises InvalidToken when the signature is wrong, the token expired, or
+    it is on the revocation list kept in the cache.
+    """
+    try:
+        payload = signing.loads(
+            token,
+            salt=ACCESS_TOKEN_SALT,
+            max_age=settings.SIGNED_TOKEN_ACCESS_LIFETIME
+        )
+    except signing.SignatureExpired:
+        raise InvalidToken('Token expired.')
+    except signing.BadSignature:
+        raise InvalidToken('Invalid token.')
+
+    revoked_key = REVOKED_KEY % payload['jti']
+    not_before_key = NOT_BEFORE_KEY % payload['uid']
+    revoked = cache.get_many([revoked_key, not_before_key])
+    if revoked_key in revoked or \
+            payload['iat'] < revoked.get(not_before_key, 0):
+        raise InvalidToken('Token revoked.')
+    return payload
+
+
+def revoke_access_token(payload):
+    """Put an access token on the revocation list until it expires"""
+    remaining = payload['iat'] + settings.SIGNED_TOKEN_ACCESS_LIFETIME \
+        - time.time()
+    if remaining > 0:
+        cache.set(REVOKED_KEY % payload['jti'], True, remaining)
+
+
+def revoke_user_access_tokens(user_id):
+    """Revoke every access token issued to a user until now"""
+    cache.set(
+        NOT_BEFORE_KEY % user_id,
+        time.time(),
+        settings.SIGNED_TOKEN_ACCESS_LIFETIME
+    )
+
+
+def issue_token_pair(user):
+    refresh = secrets.token_urlsafe(32)
+    RefreshToken.objects.create(
+        user=user,
+        token_hash=_hash(refresh),
+        expires_at=timezone.now() + datetime.timedelta(
+            seconds=settings.SIGNED_TOKEN_REFRESH_LIFETIME
+        )
+    )
+    return {
+        'access': create_access_token(user),
+        'refresh': refresh,
+        'expires_in': settings.SIGNED_TOKEN_ACCESS_LIFETIME,
+    }
+
+
+def _active_refresh_token(refresh):
+    token = RefreshToken.objects.select_related('user').filter(
+        token_hash=_hash(refresh),
+        revoked_at__isnull=True,
+        expires_at__gt=timezone.now(),
+        user__is_active=True
+    ).first()
+    if token is None:
+        raise InvalidToken('Invalid refresh token.')
+    return token
+
+
+def rotate_token_pair(refresh):
+    """Exchange a refresh token, which is revoked, for a new token pair"""
+    token = _active_refresh_token(refresh)
+    updated = RefreshToken.objects.filter(
+        pk=token.pk, revoked_at__isnull=True
+    ).update(revoked_at=timezone.now())
+    if not updated:
+        raise InvalidToken('Invalid refresh token.')
+    record_activity(token.user)
+    return issue_token_pair(token.user)
+
+
+def revoke_refresh_token(refresh):
+    RefreshToken.objects.filter(
+        token_hash=_hash(refresh), revoked_at__isnull=True
+    ).update(revoked_at=timezone.now())
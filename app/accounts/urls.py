@@ -6,5 +6,25 @@ app_name = "accounts"
 
 urlpatterns = [
     path('token/', views.CreateTokenView.as_view(), name='token'),
+    path(
+        'signed-token/',
+        views.CreateSignedTokenView.as_view(),
+        name='signed_token'
+    ),
+    path(
+        'signed-token/refresh/',
+        views.RefreshSignedTokenView.as_view(),
+        name='signed_token_refresh'
+    ),
+    path(
+        'signed-token/revoke/',
+        views.RevokeSignedTokenView.as_view(),
+        name='signed_token_revoke'
+    ),
     path('me/', views.ManagerUserView.as_view(), name='me'),
+    path(
+        'login-metrics/',
+        views.LoginMetricsView.as_view(),
+        name='login_metrics'
+    ),
 ]
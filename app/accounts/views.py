@@ -1,8 +1,39 @@
-from rest_framework import generics, authentication, permissions
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+
+from rest_framework import generics, permissions, status
+from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 
-from .serializers import AuthTokenSerializer, UserSerializer
+from .authentication import (
+    ArchiveAwareTokenAuthentication,
+    SignedTokenAuthentication,
+)
+from .serializers import (
+    AuthTokenSerializer,
+    RefreshTokenSerializer,
+    UserSerializer,
+)
+from .throttling import (
+    LoginAccountRateThrottle,
+    LoginIPRateThrottle,
+    get_login_metrics,
+    record_login_failure,
+    reset_login_failures,
+)
+from .tokens import (
+    InvalidToken,
+    issue_token_pair,
+    revoke_access_token,
+    revoke_refresh_token,
+    rotate_token_pair,
+)
 
 
 class CreateTokenView(ObtainAuthToken):
@@ -10,14 +41,94 @@ class CreateTokenView(ObtainAuthToken):
     serializer_class = AuthTokenSerializer
     permission_classes = (permissions.AllowAny,)
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = (LoginIPRateThrottle, LoginAccountRateThrottle)
+
+    def post(self, request, *args, **kwargs):
+        email = request.data.get('email') \
+            if hasattr(request.data, 'get') else None
+        try:
+            response = self.create_token(request, *args, **kwargs)
+        except ValidationError:
+            record_login_failure(email, time.time())
+            raise
+        reset_login_failures(email)
+        return response
+
+    def create_token(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+        update_last_login(None, user)
+        token, created = Token.objects.get_or_create(user=user)
+        return Response({'token': token.key})
+
+
+class CreateSignedTokenView(CreateTokenView):
+    """Create a signed access token and a refresh token for user"""
+
+    def create_token(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+        update_last_login(None, user)
+        return Response(issue_token_pair(user))
+
+
+class RefreshSignedTokenView(generics.GenericAPIView):
+    """Exchange a refresh token for a new signed token pair"""
+    serializer_class = RefreshTokenSerializer
+    authentication_classes = ()
+    permission_classes = (permissions.AllowAny,)
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            tokens = rotate_token_pair(serializer.validated_data['refresh'])
+        except InvalidToken as e:
+            raise AuthenticationFailed(str(e))
+        return Response(tokens)
+
+    def get_authenticate_header(self, request):
+        return SignedTokenAuthentication.keyword
+
+
+class RevokeSignedTokenView(generics.GenericAPIView):
+    """Revoke a refresh token and the access token of the request"""
+    serializer_class = RefreshTokenSerializer
+    permission_classes = (permissions.AllowAny,)
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        revoke_refresh_token(serializer.validated_data['refresh'])
+        payload = getattr(request.user, 'signed_token', None)
+        if payload:
+            revoke_access_token(payload)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class LoginMetricsView(APIView):
+    """Counters of login attempts, failures, throttles and lockouts"""
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        return Response(get_login_metrics())
 
 
 class ManagerUserView(generics.RetrieveUpdateAPIView):
     """Retrive and update the user authenticated"""
     serializer_class = UserSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (
+        ArchiveAwareTokenAuthentication,
+        SignedTokenAuthentication,
+    )
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):
         """Get and return the authenticated user"""
-        return self.request.user
+        user = self.request.user
+        if hasattr(user, 'signed_token'):
+            # Users built from a signed token only carry the token claims
+            user = get_user_model().objects.get(pk=user.pk)
+        return user
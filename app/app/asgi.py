@@ -13,4 +13,18 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up
+from university.streams import lesson_events  # noqa: E402
+
+# Long-lived streams served outside of Django's request handling
+streams = {
+    '/api/university/lesson-events/': lesson_events,
+}
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] in streams:
+        return await streams[scope['path']](scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -0,0 +1,74 @@
+"""
+Gunicorn config of the production server.
+
+Run from the app directory with `gunicorn -c app/gunicorn_conf.py`. The
+Django app is loaded once in the master and the workers are forked from
+it. WEB_CONCURRENCY and WEB_THREADS override the computed worker and
+thread counts.
+
+The server event streams (/api/university/lesson-events/) only exist in
+the ASGI application, where the WSGI one answers 501. They are served by
+a second server of this config with GUNICORN_WORKER_CLASS set to
+uvicorn.workers.UvicornWorker and WSGI_APP to app.asgi:application, the
+events service of docker-compose.yml, which the proxy in front routes
+that path to. The API stays on gthread workers: under ASGI, Django 3.2
+runs every sync view of a worker on one thread.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.serving import cpu_count, memory_limit, warm_up, worker_count  # noqa
+
+STARTED = time.monotonic()
+
+wsgi_app = os.getenv('WSGI_APP', 'app.wsgi:application')
+bind = os.getenv('BIND', '0.0.0.0:8000')
+preload_app = True
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.getenv('WEB_CONCURRENCY', 0)) or worker_count(
+    cpu_count(),
+    memory_limit(),
+    int(os.getenv('WEB_WORKER_MEMORY_MB', 160)) * 1024 * 1024
+)
+threads = int(os.getenv('WEB_THREADS', 4))
+
+# Recycle workers to bound slow memory growth, jittered so they do not all
+# restart at once
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', 2000))
+max_requests_jitter = max_requests // 10
+
+timeout = int(os.getenv('WEB_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('WEB_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    warm_up()
+    server.log.info(
+        'Ready in %.2fs with %s %s workers x %s threads',
+        time.monotonic() - STARTED, workers, worker_class, threads
+    )
+
+
+def post_worker_init(worker):
+    from core.audit import audit_log
+
+    audit_log.start()
+    worker.log.info(
+        'Worker %s booted %.2fs after the master started',
+        worker.pid, time.monotonic() - STARTED
+    )
+
+
+def worker_exit(server, worker):
+    from core.audit import audit_log
+
+    # Buffered audit entries must reach the database before the worker dies
+    audit_log.stop()
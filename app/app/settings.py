@@ -49,6 +49,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -92,6 +93,21 @@ DATABASES = {
 }
 
 
+# Cache
+# Throttling, lockouts and cached reports need a cache shared by every
+# process in production, e.g. memcached.
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -130,6 +146,26 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+# Uploaded lesson files are only served through signed, short-lived URLs
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', BASE_DIR / 'media')
+MEDIA_URL = '/media/'
+LESSON_MEDIA_URL_LIFETIME = int(os.getenv('LESSON_MEDIA_URL_LIFETIME', 300))
+# Internal location the front proxy serves MEDIA_ROOT from, e.g.
+# /protected-media/, to answer downloads with X-Accel-Redirect
+MEDIA_ACCEL_REDIRECT = os.getenv('MEDIA_ACCEL_REDIRECT')
+
+# Lesson featured image derivatives, rendered by background jobs.
+# Only MEDIA_ROOT/public/ may be served directly at MEDIA_URL.
+LESSON_IMAGE_WIDTHS = (320, 640, 1280)
+LESSON_IMAGE_DEFAULT_WIDTH = 640
+LESSON_IMAGE_QUALITY = 80
+
+# Database job queue, processed by `manage.py runjobs`. Jobs running longer
+# than JOB_LOCK_TIMEOUT seconds are considered abandoned and queued again.
+JOB_WORKER_CONCURRENCY = int(os.getenv('JOB_WORKER_CONCURRENCY', 4))
+JOB_LOCK_TIMEOUT = 600
+JOB_RETRY_DELAY = 30
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -138,11 +174,114 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Rest Framework setup
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.ArchiveAwareTokenAuthentication',
+        'accounts.authentication.SignedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_FILTER_BACKENDS': [
+        'core.filters.IndexedFilterBackend',
+        'core.filters.IndexedOrderingFilter',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.EstimatedCountPagination',
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.getenv('LOGIN_IP_RATE', '30/min'),
+        'login_account': os.getenv('LOGIN_ACCOUNT_RATE', '10/min'),
+    },
 }
 
+# Safety net lifetime of the cached courses and subjects of each student,
+# which are otherwise dropped on every enrollment or course change
+STUDENT_ACCESS_TIMEOUT = 3600
+
+# Safety net lifetime of the cached payroll report, which is otherwise
+# rebuilt after every salary change
+PAYROLL_REPORT_TIMEOUT = 3600
+
+# Days without login after which students are archived, and the users
+# moved per archival transaction
+ARCHIVE_INACTIVE_DAYS = 365
+ARCHIVE_BATCH_SIZE = 500
+
+# Seconds between last_login writes for the requests of token clients
+LAST_LOGIN_UPDATE_INTERVAL = 3600
+
+# Audit entries written per bulk insert, and the longest they stay
+# buffered in seconds
+AUDIT_BATCH_SIZE = 500
+AUDIT_FLUSH_INTERVAL = 2.0
+
+# Webhook delivery of outbox events: events per request, requests at once,
+# request timeout, attempts, backoff bounds and the seconds after which a
+# batch whose dispatcher died is sent again
+WEBHOOK_BATCH_SIZE = 50
+WEBHOOK_CONCURRENCY = int(os.getenv('WEBHOOK_CONCURRENCY', 4))
+WEBHOOK_TIMEOUT = 10
+WEBHOOK_MAX_ATTEMPTS = 8
+WEBHOOK_RETRY_DELAY = 30
+WEBHOOK_MAX_RETRY_DELAY = 3600
+WEBHOOK_LOCK_TIMEOUT = 300
+
+# Cross-process pub/sub: 'postgres' for LISTEN/NOTIFY, 'local' for this
+# process only, None to pick by database; the NOTIFY channel, and the
+# messages a slow subscriber may fall behind by
+PUBSUB_TRANSPORT = os.getenv('PUBSUB_TRANSPORT') or None
+PUBSUB_CHANNEL = 'app_events'
+PUBSUB_QUEUE_SIZE = 100
+
+# Server-sent event streams: seconds between heartbeats, seconds before a
+# connection is closed for the client to reconnect, and its reconnect
+# delay in milliseconds
+SSE_HEARTBEAT = 15
+SSE_MAX_AGE = 3600
+SSE_RETRY = 3000
+
+# Response bodies smaller than this many bytes are sent uncompressed
+COMPRESSION_MIN_SIZE = 1024
+
+# Compressed text fields: bytes of a trained dictionary (the zlib window),
+# bytes of values sampled to train it, and the seconds before a process
+# looks for a newer dictionary
+COMPRESSION_DICTIONARY_SIZE = 32 * 1024
+COMPRESSION_TRAINING_BYTES = 1024 * 1024
+COMPRESSION_DICTIONARY_REFRESH = 300
+
+# Rendered lesson HTML: renderings kept in memory per process, rows kept
+# in the shared table, and the seconds between last-use updates of a row
+RENDER_CACHE_LOCAL_SIZE = 1000
+RENDER_CACHE_MAX_ENTRIES = 50000
+RENDER_CACHE_TOUCH_INTERVAL = 3600
+
+# Sub-requests accepted per batch request, and the threads running the
+# reads of a parallel batch
+BATCH_MAX_REQUESTS = 50
+BATCH_MAX_WORKERS = 4
+
+# Row count past which list counts use PostgreSQL planner estimates
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+# Seconds paginated list counts are cached for, 0 counts on every request
+PAGINATION_COUNT_CACHE_TIMEOUT = int(
+    os.getenv('PAGINATION_COUNT_CACHE_TIMEOUT', 0)
+)
+
+# Failed logins before an account is locked, and the lockout backoff
+LOGIN_LOCKOUT_THRESHOLD = 5
+LOGIN_LOCKOUT_BASE_SECONDS = 30
+LOGIN_LOCKOUT_MAX_SECONDS = 3600
+
+# Lifetime in seconds of signed access tokens and their refresh tokens
+SIGNED_TOKEN_ACCESS_LIFETIME = 300
+SIGNED_TOKEN_REFRESH_LIFETIME = 14 * 24 * 3600
+
 AUTH_USER_MODEL = 'accounts.User'
@@ -15,6 +15,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from core.views import BatchAPIView
 from university import views
 
 urlpatterns = [
@@ -26,4 +27,5 @@ urlpatterns = [
     path('', views.ExibitionView.as_view(), name='home_message'),# apresatation of project
     path('api/accounts/', include('accounts.urls')),
     path('api/university/', include('university.urls')),
+    path('api/batch/', BatchAPIView.as_view(), name='batch'),
 ]
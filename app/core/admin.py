@@ -3,12 +3,28 @@ from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext as _
 
 from accounts import models
+from core.models import AuditEntry, Job, Webhook, WebhookDelivery
+from core.pagination import EstimatedCountPaginator
 from university import models as university_models
 
 
-class UserAdmin(BaseUserAdmin):
-    ordering = ['id']
+class ScalableAdminMixin:
+    """
+    Changelist settings for large tables.
+
+    Counts are planner estimates past ESTIMATED_COUNT_THRESHOLD and the
+    unfiltered total is not counted. Searches are case-insensitive exact
+    matches, served by the Upper() indexes of the searched columns.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class UserAdmin(ScalableAdminMixin, BaseUserAdmin):
+    ordering = ['email']
     list_display = ['email', 'name']
+    list_filter = ['is_staff', 'is_superuser', 'is_active']
+    search_fields = ['=email']
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
         (_('Personal Info'), {'fields': ('name', 'cpf', 'phone')}),
@@ -33,10 +49,84 @@ class UserAdmin(BaseUserAdmin):
     filter_horizontal = ('groups',)
 
 
+class JobAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    ordering = ['-id']
+    list_display = ['name', 'status', 'attempts', 'run_at', 'finished_at']
+    list_filter = ['status']
+    search_fields = ['name', 'key']
+
+
+class AuditEntryAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    ordering = ['-changed_at']
+    list_display = ['changed_at', 'model', 'object_id', 'field',
+                    'old_value', 'new_value', 'source']
+    list_filter = ['model', 'source']
+    search_fields = ['=object_id']
+    date_hierarchy = 'changed_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class WebhookAdmin(admin.ModelAdmin):
+    list_display = ['url', 'events', 'is_active', 'created_at']
+    list_filter = ['is_active']
+
+
+class WebhookDeliveryAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    ordering = ['-id']
+    list_display = ['event', 'webhook', 'status', 'attempts',
+                    'next_attempt_at', 'delivered_at']
+    list_filter = ['status']
+    list_select_related = ['event', 'webhook']
+    raw_id_fields = ['event']
+
+
+class EmployeeAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ['__str__', 'job', 'salary', 'hired_date']
+    list_select_related = ['user', 'job']
+    list_filter = ['job']
+    ordering = ['-hired_date', '-id']
+    search_fields = ['=user__email']
+    raw_id_fields = ['user']
+
+
+class TeacherAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ['__str__', 'salary', 'hired_date']
+    list_select_related = ['user']
+    ordering = ['-hired_date', '-id']
+    search_fields = ['=user__email']
+    raw_id_fields = ['user']
+
+
+class StudentAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ['__str__', 'course']
+    list_select_related = ['user', 'course']
+    list_filter = ['course']
+    ordering = ['course', 'id']
+    search_fields = ['=user__email']
+    raw_id_fields = ['user']
+
+
+class LessonAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    list_display = ['title', 'subject']
+    list_select_related = ['subject']
+    list_filter = ['subject']
+    ordering = ['subject', 'title']
+    search_fields = ['=title']
+
+
 admin.site.register(models.User, UserAdmin)
-admin.site.register(university_models.Employee)
+admin.site.register(Job, JobAdmin)
+admin.site.register(AuditEntry, AuditEntryAdmin)
+admin.site.register(Webhook, WebhookAdmin)
+admin.site.register(WebhookDelivery, WebhookDeliveryAdmin)
+admin.site.register(university_models.Employee, EmployeeAdmin)
 admin.site.register(university_models.Job)
-admin.site.register(university_models.Teacher)
+admin.site.register(university_models.Teacher, TeacherAdmin)
 admin.site.register(university_models.Subject)
-admin.site.register(university_models.Lesson)
-admin.site.register(university_models.Student)
+admin.site.register(university_models.Lesson, LessonAdmin)
+admin.site.register(university_models.Student, StudentAdmin)
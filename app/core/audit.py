@@ -0,0 +1,199 @@
+"""
+Field level audit log, written in batches off the request path.
+
+Models list the fields to audit in an `audit_fields` attribute. Changes
+are buffered in memory once their transaction commits and written with
+bulk inserts by a background thread (started in each server worker), at
+the end of a request when a batch is due, and on interpreter exit.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+
+from core.models import AuditEntry
+
+logger = logging.getLogger(__name__)
+
+
+def audit_fields(model):
+    return getattr(model, 'audit_fields', ())
+
+
+def _label(model):
+    return model._meta.label_lower
+
+
+def _value(value):
+    return getattr(value, 'pk', value)
+
+
+class AuditLog:
+    """Buffer of unsaved AuditEntry rows and the thread that writes them"""
+
+    def __init__(self):
+        self._entries = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, entries):
+        if not entries:
+            return
+        with self._lock:
+            if not self._entries:
+                self._oldest = time.monotonic()
+            self._entries.extend(entries)
+            full = len(self._entries) >= settings.AUDIT_BATCH_SIZE
+        if full and self._thread is not None:
+            self._wakeup.set()
+
+    def flush(self):
+        """Write every buffered entry, keeping them on database errors"""
+        with self._lock:
+            entries, self._entries = self._entries, []
+            self._oldest = None
+        if not entries:
+            return 0
+        try:
+            AuditEntry.objects.bulk_create(
+                entries, batch_size=settings.AUDIT_BATCH_SIZE
+            )
+        except DatabaseError:
+            logger.exception('Could not write %s audit entries', len(entries))
+            with self._lock:
+                self._entries[:0] = entries
+                self._oldest = time.monotonic()
+            return 0
+        return len(entries)
+
+    def flush_due(self, **kwargs):
+        """Flush a full or stale buffer when no writer thread runs"""
+        if self._thread is not None or not self._entries:
+            return
+        if len(self._entries) >= settings.AUDIT_BATCH_SIZE or \
+                time.monotonic() - self._oldest >= \
+                settings.AUDIT_FLUSH_INTERVAL:
+            self.flush()
+
+    def _run(self):
+        try:
+            while not self._stopping:
+                self._wakeup.wait(settings.AUDIT_FLUSH_INTERVAL)
+                self._wakeup.clear()
+                self.flush()
+        finally:
+            connections.close_all()
+
+    def start(self):
+        """Write the buffer from a background thread of this process"""
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run, name='audit-log', daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Stop the writer thread and flush what is left"""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping = True
+            self._wakeup.set()
+            thread.join()
+        self.flush()
+
+
+audit_log = AuditLog()
+
+
+def record(model, changes, actor=None, source=''):
+    """
+    Buffer `changes`, (pk, field, old, new) tuples, once the current
+    transaction commits.
+    """
+    changed_at = timezone.now()
+    actor_id = getattr(actor, 'pk', None)
+    entries = [
+        AuditEntry(
+            model=_label(model),
+            object_id=str(pk),
+            field=field,
+            old_value=old,
+            new_value=new,
+            actor_id=actor_id,
+            source=source,
+            changed_at=changed_at
+        )
+        for pk, field, old, new in changes
+        if old != new
+    ]
+    if entries:
+        transaction.on_commit(lambda: audit_log.add(entries))
+
+
+def record_update(instance, data, actor=None, source=''):
+    """Audit the audited fields of `instance` that `data` changes"""
+    model = type(instance)
+    changes = []
+    for name in audit_fields(model):
+        if name in data:
+            field = model._meta.get_field(name)
+            changes.append((
+                instance.pk,
+                name,
+                getattr(instance, field.attname),
+                _value(data[name])
+            ))
+    record(model, changes, actor, source)
+
+
+def record_many_related(instance, name, added, removed, actor=None,
+                        source=''):
+    """
+    Audit the pks added to and removed from a many to many field of
+    `instance`, one entry per pk: removed ones as the old value, added
+    ones as the new value.
+    """
+    record(type(instance), [
+        (instance.pk, name, pk, None) for pk in sorted(removed, key=str)
+    ] + [
+        (instance.pk, name, None, pk) for pk in sorted(added, key=str)
+    ], actor, source)
+
+
+def snapshot(queryset):
+    """{pk: {field: value}} of the audited fields of the queryset rows"""
+    fields = [
+        queryset.model._meta.get_field(name).attname
+        for name in audit_fields(queryset.model)
+    ]
+    if not fields:
+        return {}
+    return {
+        row[0]: dict(zip(audit_fields(queryset.model), row[1:]))
+        for row in queryset.values_list('pk', *fields).iterator()
+    }
+
+
+def record_snapshots(model, before, after, actor=None, source=''):
+    """Audit the differences between two snapshots of the same rows"""
+    record(model, [
+        (pk, name, old, after.get(pk, {}).get(name))
+        for pk, values in before.items()
+        for name, old in values.items()
+    ], actor, source)
+
+
+request_finished.connect(audit_log.flush_due)
+atexit.register(audit_log.stop)
@@ -0,0 +1,132 @@
+"""
+Run many API requests from a single HTTP request.
+
+Sub-requests are dispatched straight to the views of their routes, with
+the user the batch request authenticated: credentials are checked and
+group memberships loaded once for the whole batch. Sequential batches run
+in the request thread, on its database connection. Batches of reads may
+run in parallel instead, each worker thread on its own connection.
+"""
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.http import Http404
+from django.urls import Resolver404, resolve
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Headers of the sub-responses worth returning
+RESPONSE_HEADERS = ('Content-Type', 'Location', 'ETag', 'Last-Modified')
+
+
+def share_user(user):
+    """Load the groups of `user` once for every permission check"""
+    if user.is_authenticated and getattr(user, 'group_names', None) is None:
+        user.group_names = frozenset(
+            user.groups.values_list('name', flat=True)
+        )
+    return user
+
+
+def build_request(request, method, url, body):
+    """WSGIRequest of a sub-request, authenticated as `request`"""
+    parts = urlsplit(url)
+    data = b'' if body is None else json.dumps(body).encode()
+    environ = {
+        key: value for key, value in request.META.items()
+        if key.startswith('HTTP_') or key in (
+            'REMOTE_ADDR', 'SERVER_NAME', 'SERVER_PORT', 'SERVER_PROTOCOL'
+        )
+    }
+    # Sub-responses are embedded in the batch response, which is encoded
+    # as a whole, so they are asked for unencoded
+    environ.pop('HTTP_ACCEPT_ENCODING', None)
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': parts.path,
+        'QUERY_STRING': parts.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(data)),
+        'SCRIPT_NAME': '',
+        'wsgi.input': io.BytesIO(data),
+        'wsgi.url_scheme': request.scheme,
+    })
+    sub_request = WSGIRequest(environ)
+    # DRF views take the user as authenticated by the batch request
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = getattr(request, 'auth', None)
+    return sub_request
+
+
+def response_body(response):
+    if response.streaming or response.has_header('Content-Encoding'):
+        return None
+    content_type = response.get('Content-Type', '')
+    if not response.content:
+        return None
+    if content_type.startswith('application/json'):
+        return json.loads(response.content)
+    if content_type.startswith('text/'):
+        return response.content.decode(response.charset)
+    return None
+
+
+def execute(request, item):
+    """Response of one sub-request as a dict"""
+    url = item['url']
+    try:
+        match = resolve(urlsplit(url).path)
+        view_class = getattr(match.func, 'view_class', None)
+        if not getattr(view_class, 'batchable', True):
+            raise Http404
+        response = match.func(
+            build_request(request, item['method'], url, item.get('body')),
+            *match.args,
+            **match.kwargs
+        )
+        if callable(getattr(response, 'render', None)):
+            response = response.render()
+        body = response_body(response)
+    except (Resolver404, Http404):
+        return {'id': item.get('id'), 'status': 404, 'headers': {},
+                'body': {'detail': 'Not found.'}}
+    except Exception:
+        logger.exception('Batched request to %s failed', url)
+        return {'id': item.get('id'), 'status': 500, 'headers': {},
+                'body': {'detail': 'Server error.'}}
+    return {
+        'id': item.get('id'),
+        'status': response.status_code,
+        'headers': {
+            name: response[name] for name in RESPONSE_HEADERS
+            if response.has_header(name)
+        },
+        'body': body,
+    }
+
+
+def _execute_and_close(request, item):
+    try:
+        return execute(request, item)
+    finally:
+        connections.close_all()
+
+
+def run_batch(request, items, parallel=False):
+    """Responses of `items`, in order"""
+    share_user(request.user)
+    if not parallel or len(items) < 2:
+        return [execute(request, item) for item in items]
+    workers = min(settings.BATCH_MAX_WORKERS, len(items))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(
+            lambda item: _execute_and_close(request, item), items
+        ))
@@ -0,0 +1,119 @@
+"""
+Cold start profile of the Django app.
+
+`python -X importtime -m core.coldstart` measures the startup phases of a
+fresh interpreter and prints them as JSON. Only the standard library is
+imported at module level so the profile is not skewed by this module.
+"""
+import json
+import re
+import sys
+import time
+
+IMPORTTIME_RE = re.compile(
+    r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$'
+)
+
+
+def _view_serializers(patterns):
+    for pattern in patterns:
+        if hasattr(pattern, 'url_patterns'):
+            yield from _view_serializers(pattern.url_patterns)
+            continue
+        view_class = getattr(pattern.callback, 'cls', None) or \
+            getattr(pattern.callback, 'view_class', None)
+        serializer_class = getattr(view_class, 'serializer_class', None)
+        if serializer_class is not None:
+            yield serializer_class
+
+
+def measure():
+    """Seconds spent in each startup phase of this interpreter"""
+    phases = {}
+    start = time.perf_counter()
+
+    from django.conf import settings
+
+    settings.INSTALLED_APPS
+    phases['settings'] = time.perf_counter() - start
+
+    mark = time.perf_counter()
+    import django
+
+    django.setup()
+    phases['app_registry'] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    from django.urls import get_resolver
+
+    resolver = get_resolver()
+    resolver.url_patterns
+    resolver.reverse_dict
+    phases['url_resolver'] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    serializers = {}
+    for serializer_class in _view_serializers(resolver.url_patterns):
+        if serializer_class not in serializers:
+            serializer_mark = time.perf_counter()
+            serializer_class().fields
+            serializers[serializer_class] = \
+                time.perf_counter() - serializer_mark
+    phases['serializers'] = time.perf_counter() - mark
+    phases['total'] = time.perf_counter() - start
+    return {
+        'phases': phases,
+        'serializers': {
+            f'{cls.__module__}.{cls.__name__}': seconds
+            for cls, seconds in serializers.items()
+        },
+    }
+
+
+def parse_importtime(output):
+    """
+    Read `-X importtime` lines into {module: (self, cumulative)} seconds.
+
+    A module imported at several nesting levels keeps its first entry,
+    which is where it was really loaded.
+    """
+    modules = {}
+    for line in output.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, _, name = match.groups()
+            modules.setdefault(
+                name, (int(self_us) / 1e6, int(cumulative_us) / 1e6)
+            )
+    return modules
+
+
+def group_modules(modules, prefixes):
+    """Keep the modules under `prefixes`, with the package they belong to"""
+    grouped = {}
+    for name, timings in modules.items():
+        for prefix in prefixes:
+            if name == prefix or name.startswith(prefix + '.'):
+                grouped[name] = (prefix,) + timings
+                break
+    return grouped
+
+
+def find_regressions(report, baseline, tolerance, slack):
+    """
+    Phases slower than the baseline by more than `tolerance` (a fraction)
+    and `slack` seconds, as (phase, baseline, current) tuples.
+    """
+    regressions = []
+    for phase, seconds in report['phases'].items():
+        previous = baseline['phases'].get(phase)
+        if previous is None:
+            continue
+        if seconds > previous * (1 + tolerance) and \
+                seconds - previous > slack:
+            regressions.append((phase, previous, seconds))
+    return regressions
+
+
+if __name__ == '__main__':
+    json.dump(measure(), sys.stdout)
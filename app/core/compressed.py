@@ -0,0 +1,288 @@
+"""
+Text stored zlib-compressed, with preset dictionaries trained on the data.
+
+Short texts of the same kind share most of their vocabulary but are too
+small for zlib to find it within one value; a preset dictionary of the
+common substrings gives every value that context up front. Dictionaries
+are kept in CompressionDictionary rows and never change, each value
+recording the one it was compressed with, so a newly trained dictionary
+only applies to values written after it.
+
+Stored values start with a format byte:
+
+    0   the UTF-8 text as is, when compression does not pay off
+    1   raw deflate without a dictionary
+    2   the 4 byte id of a dictionary, then raw deflate using it
+"""
+import heapq
+import struct
+import time
+import zlib
+from collections import Counter
+
+from django.conf import settings
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+from django.db.models.signals import post_save
+
+STORED = 0
+DEFLATE = 1
+DEFLATE_DICTIONARY = 2
+
+DICTIONARY_ID = struct.Struct('>I')
+LEVEL = 9
+# Raw deflate streams, without the zlib header and checksum
+WBITS = -15
+
+_dictionaries = {}
+_current = {}
+
+
+def clear_dictionary_cache(**kwargs):
+    _dictionaries.clear()
+    _current.clear()
+
+
+def _dictionary_model():
+    from core.models import CompressionDictionary
+    return CompressionDictionary
+
+
+def dictionary_data(pk):
+    """Contents of a dictionary, read once per process"""
+    data = _dictionaries.get(pk)
+    if data is None:
+        data = bytes(
+            _dictionary_model().objects.values_list('data', flat=True)
+            .get(pk=pk)
+        )
+        _dictionaries[pk] = data
+    return data
+
+
+def current_dictionary(name):
+    """(id, data) of the latest dictionary called `name`, or None"""
+    cached = _current.get(name)
+    if cached is None or cached[0] <= time.monotonic():
+        row = _dictionary_model().objects.filter(name=name)\
+            .order_by('-id').values_list('pk', 'data').first()
+        dictionary = (row[0], bytes(row[1])) if row else None
+        if dictionary is not None:
+            _dictionaries[dictionary[0]] = dictionary[1]
+        cached = (
+            time.monotonic() + settings.COMPRESSION_DICTIONARY_REFRESH,
+            dictionary
+        )
+        _current[name] = cached
+    return cached[1]
+
+
+def compress_text(text, dictionary=None):
+    """Stored bytes of `text`, using a (id, data) dictionary if given"""
+    data = text.encode()
+    if dictionary is None:
+        compressor = zlib.compressobj(LEVEL, zlib.DEFLATED, WBITS)
+        header = bytes((DEFLATE,))
+    else:
+        compressor = zlib.compressobj(
+            LEVEL, zlib.DEFLATED, WBITS, zdict=dictionary[1]
+        )
+        header = bytes((DEFLATE_DICTIONARY,)) + \
+            DICTIONARY_ID.pack(dictionary[0])
+    compressed = header + compressor.compress(data) + compressor.flush()
+    if len(compressed) > len(data):
+        return bytes((STORED,)) + data
+    return compressed
+
+
+def decompress_text(value, dictionaries=None):
+    """Text of stored bytes, `dictionaries` mapping ids to their data"""
+    dictionaries = dictionaries or dictionary_data
+    value = memoryview(value)
+    kind = value[0]
+    if kind == STORED:
+        return bytes(value[1:]).decode()
+    if kind == DEFLATE:
+        decompressor = zlib.decompressobj(WBITS)
+        data = value[1:]
+    elif kind == DEFLATE_DICTIONARY:
+        pk, = DICTIONARY_ID.unpack(value[1:5])
+        decompressor = zlib.decompressobj(WBITS, zdict=dictionaries(pk))
+        data = value[5:]
+    else:
+        raise ValueError(f'Unknown compressed text format {kind}')
+    return (decompressor.decompress(data) + decompressor.flush()).decode()
+
+
+def train_dictionary(samples, size=None, segment=64, k=8):
+    """
+    Preset dictionary of the `segment` byte pieces of `samples` whose k byte
+    substrings recur in the most samples, after zstd's COVER algorithm.
+
+    Pieces are picked greedily, each one discounting the substrings it
+    covers, and the most useful are placed last, where zlib reaches them
+    with the shortest distances.
+    """
+    size = size or settings.COMPRESSION_DICTIONARY_SIZE
+    frequency = Counter()
+    for sample in samples:
+        frequency.update({
+            sample[start:start + k]
+            for start in range(len(sample) - k + 1)
+        })
+
+    def kmers(piece):
+        return {
+            piece[start:start + k] for start in range(len(piece) - k + 1)
+        }
+
+    def score(piece):
+        return sum(
+            frequency[kmer] for kmer in kmers(piece) if frequency[kmer] > 1
+        )
+
+    heap = []
+    for sample in samples:
+        for start in range(0, len(sample) - k + 1, segment):
+            piece = sample[start:start + segment]
+            heap.append((-score(piece), len(heap), piece))
+    heapq.heapify(heap)
+
+    chosen, total = [], 0
+    while heap and total < size:
+        negative, order, piece = heapq.heappop(heap)
+        current = score(piece)
+        if current <= 0:
+            continue
+        if heap and current < -heap[0][0]:
+            heapq.heappush(heap, (-current, order, piece))
+            continue
+        chosen.append(piece)
+        total += len(piece)
+        for kmer in kmers(piece):
+            frequency[kmer] = 0
+    return b''.join(reversed(chosen))[-size:]
+
+
+def sample_values(queryset, field, limit=None):
+    """UTF-8 values of `field` in the newest rows, up to `limit` bytes"""
+    limit = limit or settings.COMPRESSION_TRAINING_BYTES
+    samples, total = [], 0
+    for value in queryset.order_by('-pk').values_list(field, flat=True)\
+            .iterator():
+        if not value:
+            continue
+        sample = str(value).encode()
+        samples.append(sample)
+        total += len(sample)
+        if total >= limit:
+            break
+    return samples
+
+
+def train_field_dictionary(model, name):
+    """Train and save a new dictionary for a CompressedTextField"""
+    field = model._meta.get_field(name)
+    data = train_dictionary(sample_values(model._default_manager.all(), name))
+    if not data:
+        return None
+    return _dictionary_model().objects.create(
+        name=field.dictionary, data=data
+    )
+
+
+def recompress(queryset, name, batch_size=500):
+    """Compress the values of rows again, with the current dictionary"""
+    count, batch = 0, []
+    for obj in queryset.only('pk', name).iterator():
+        # Reading the value leaves the text to compress on save
+        getattr(obj, name)
+        batch.append(obj)
+        if len(batch) == batch_size:
+            queryset.model._default_manager.bulk_update(batch, [name])
+            count += len(batch)
+            batch = []
+    queryset.model._default_manager.bulk_update(batch, [name])
+    return count + len(batch)
+
+
+class CompressedText(bytes):
+    """Stored bytes of a CompressedTextField value, not decompressed yet"""
+
+    def __str__(self):
+        return decompress_text(self)
+
+
+class CompressedTextDescriptor(DeferredAttribute):
+    """Decompress the loaded value of the field on first access"""
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if isinstance(value, CompressedText):
+            value = str(value)
+            instance.__dict__[self.field.attname] = value
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
+class CompressedTextField(models.TextField):
+    """
+    TextField kept compressed in a binary column.
+
+    Values are compressed on save with the latest dictionary named
+    `dictionary`, when there is one, and decompressed when the attribute is
+    first read; rows saved without reading it keep their stored bytes.
+    Lookups other than isnull compare the compressed bytes, so do not filter
+    on the field.
+    """
+    descriptor_class = CompressedTextDescriptor
+
+    def __init__(self, *args, dictionary=None, **kwargs):
+        self.dictionary = dictionary
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.dictionary is not None:
+            kwargs['dictionary'] = self.dictionary
+        return name, path, args, kwargs
+
+    def get_internal_type(self):
+        return 'BinaryField'
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return CompressedText(value)
+
+    def to_python(self, value):
+        if isinstance(value, CompressedText):
+            return str(value)
+        return super().to_python(value)
+
+    def pre_save(self, model_instance, add):
+        value = model_instance.__dict__.get(self.attname)
+        if isinstance(value, CompressedText):
+            return value
+        return super().pre_save(model_instance, add)
+
+    def get_prep_value(self, value):
+        if value is None or isinstance(value, CompressedText):
+            return value
+        dictionary = None
+        if self.dictionary is not None:
+            dictionary = current_dictionary(self.dictionary)
+        return compress_text(str(value), dictionary)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super().get_db_prep_value(value, connection, prepared)
+        if value is not None:
+            return connection.Database.Binary(value)
+        return value
+
+
+post_save.connect(clear_dictionary_cache, sender='core.CompressionDictionary')
@@ -0,0 +1,67 @@
+"""
+Content-Encoding negotiation and the compressors behind it.
+
+Brotli is used when the `brotli` package is installed, gzip otherwise.
+Responses are compressed at a fast level; bodies compressed once at write
+time use the slowest, smallest levels since they are served many times.
+"""
+import gzip
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is an optional encoding
+    brotli = None
+
+GZIP = 'gzip'
+BROTLI = 'br'
+
+# Preferred first when a client accepts several equally
+ENCODINGS = (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+DYNAMIC_LEVELS = {GZIP: 6, BROTLI: 5}
+STATIC_LEVELS = {GZIP: 9, BROTLI: 11}
+
+
+def accepted_encodings(header):
+    """{coding: q} of an Accept-Encoding header"""
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def negotiate(header, available=ENCODINGS):
+    """Best of the `available` codings a client accepts, or None"""
+    accepted = accepted_encodings(header or '')
+    best, best_q = None, 0.0
+    for coding in available:
+        q = accepted.get(coding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(data, coding, levels=DYNAMIC_LEVELS):
+    if coding == BROTLI:
+        return brotli.compress(data, quality=levels[BROTLI])
+    # A fixed mtime keeps the output, and ETags derived from it, stable
+    return gzip.compress(data, compresslevel=levels[GZIP], mtime=0)
+
+
+def precompress(data):
+    """{coding: body} of `data` in every available coding"""
+    return {
+        coding: compress(data, coding, STATIC_LEVELS)
+        for coding in ENCODINGS
+    }
@@ -0,0 +1,149 @@
+from django.core.exceptions import (
+    FieldDoesNotExist,
+    ImproperlyConfigured,
+    ValidationError as DjangoValidationError,
+)
+
+from rest_framework import exceptions
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+
+def indexed_fields(model):
+    """
+    Names of the fields that lead an index of the model table.
+
+    Only a leading column lets the database seek or walk the index in
+    order; the other columns of a composite index do not.
+    """
+    opts = model._meta
+    fields = {opts.pk.name}
+    for field in opts.concrete_fields:
+        if field.db_index or field.unique:
+            fields.add(field.name)
+    for index in opts.indexes:
+        if index.fields:
+            fields.add(index.fields[0].lstrip('-'))
+    for together in list(opts.unique_together) + list(opts.index_together):
+        fields.add(together[0])
+    return fields
+
+
+def resolve_lookup(model, lookup):
+    """The model field a lookup path such as `hired_date__gte` filters on"""
+    field = None
+    for part in lookup.split('__'):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            break
+        if field.is_relation:
+            model = field.related_model
+    if field is None:
+        raise ImproperlyConfigured(
+            f'{lookup} is not a field lookup of {model.__name__}'
+        )
+    return field
+
+
+def check_indexed(model, filter_fields, ordering_fields):
+    """Fail loudly when a declared filter or sort key has no index"""
+    indexed = indexed_fields(model)
+    for lookup in filter_fields.values():
+        name = lookup.split('__')[0]
+        field = model._meta.get_field(name)
+        # Many to many joins go through the indexed keys of the through table
+        if not field.many_to_many and name not in indexed:
+            raise ImproperlyConfigured(
+                f'{model.__name__}.{name} is filtered without an index'
+            )
+    for name in ordering_fields:
+        if name not in indexed:
+            raise ImproperlyConfigured(
+                f'{model.__name__}.{name} is ordered without an index'
+            )
+
+
+class IndexedFilterMixin:
+    """Check the declared filters of a view against its model indexes once"""
+
+    def get_checked_model(self, view):
+        view_class = type(view)
+        model = view.get_queryset().model
+        if view_class.__dict__.get('_indexes_checked') is not model:
+            check_indexed(
+                model,
+                getattr(view, 'filter_fields', {}),
+                getattr(view, 'ordering_fields', ())
+            )
+            view_class._indexes_checked = model
+        return model
+
+
+class IndexedFilterBackend(IndexedFilterMixin, BaseFilterBackend):
+    """
+    Filter on the exact lookups a view declares in `filter_fields`.
+
+    `filter_fields` maps query parameters to lookups, e.g.
+    {'hired_after': 'hired_date__gte'}. Each lookup must start with an
+    indexed field; values are validated by the model field.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        filter_fields = getattr(view, 'filter_fields', {})
+        if not filter_fields:
+            return queryset
+        model = self.get_checked_model(view)
+
+        filters, errors = {}, {}
+        for param, lookup in filter_fields.items():
+            value = request.query_params.get(param)
+            if value in (None, ''):
+                continue
+            field = resolve_lookup(model, lookup)
+            if field.is_relation:
+                field = field.related_model._meta.pk
+            try:
+                filters[lookup] = field.to_python(value)
+            except DjangoValidationError as e:
+                errors[param] = e.messages
+        if errors:
+            raise exceptions.ValidationError(errors)
+        return queryset.filter(**filters)
+
+
+class IndexedOrderingFilter(IndexedFilterMixin, OrderingFilter):
+    """
+    OrderingFilter limited to indexed `ordering_fields`.
+
+    Unknown or unindexed sort keys are rejected instead of ignored, and
+    the primary key is appended so pages are stable.
+    """
+
+    def get_valid_fields(self, queryset, view, context={}):
+        return [(name, name) for name in getattr(view, 'ordering_fields', ())]
+
+    def get_ordering(self, request, queryset, view):
+        params = request.query_params.get(self.ordering_param)
+        if not params:
+            return self.get_default_ordering(view)
+        self.get_checked_model(view)
+
+        valid = getattr(view, 'ordering_fields', ())
+        ordering = [term.strip() for term in params.split(',')]
+        invalid = [term for term in ordering if term.lstrip('-') not in valid]
+        if invalid:
+            raise exceptions.ValidationError({self.ordering_param: [
+                f'Cannot order by {", ".join(invalid)}. '
+                f'Allowed: {", ".join(valid) or "none"}.'
+            ]})
+        return ordering
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if not ordering:
+            return queryset
+        pk_name = queryset.model._meta.pk.name
+        if ordering[-1].lstrip('-') != pk_name:
+            direction = '-' if ordering[-1].startswith('-') else ''
+            ordering = list(ordering) + [direction + pk_name]
+        return queryset.order_by(*ordering)
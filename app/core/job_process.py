@@ -0,0 +1,25 @@
+"""
+Entry points of job worker processes.
+
+Spawned processes unpickle these before Django is set up, so this module
+must not import models at import time.
+"""
+
+
+def init_process():
+    import django
+    from django.utils.module_loading import autodiscover_modules
+
+    django.setup()
+    autodiscover_modules('tasks')
+
+
+def execute_job(job_id):
+    from django.db import connections
+
+    from core.jobs import execute_job
+
+    try:
+        return execute_job(job_id)
+    finally:
+        connections.close_all()
@@ -0,0 +1,276 @@
+import datetime
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from core import job_process
+from core.models import Job
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+class Task:
+    """Function that can be queued to run in a job worker"""
+
+    def __init__(self, func, name, max_attempts, retry_delay):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return self.enqueue(args, kwargs)
+
+    def enqueue(self, args=(), kwargs=None, run_at=None, key=''):
+        return enqueue(
+            self.name, args, kwargs,
+            run_at=run_at, key=key, max_attempts=self.max_attempts
+        )
+
+
+def task(name=None, max_attempts=3, retry_delay=None):
+    """Register a function as a job, by default named by its import path"""
+    def decorator(func):
+        registered = Task(
+            func,
+            name or f'{func.__module__}.{func.__name__}',
+            max_attempts,
+            retry_delay if retry_delay is not None
+            else settings.JOB_RETRY_DELAY
+        )
+        registry[registered.name] = registered
+        return registered
+    return decorator
+
+
+def enqueue(name, args=(), kwargs=None, run_at=None, key='', max_attempts=3):
+    """
+    Write a job to the queue table.
+
+    The row belongs to the current transaction, so workers only see jobs of
+    committed work. With a `key`, nothing is queued while an unfinished job
+    has the same key, which a unique constraint enforces.
+    """
+    if key and Job.objects.filter(
+            key=key, status__in=(Job.QUEUED, Job.RUNNING)).exists():
+        return None
+    try:
+        with transaction.atomic():
+            return Job.objects.create(
+                name=name,
+                args=list(args),
+                kwargs=kwargs or {},
+                key=key,
+                run_at=run_at or timezone.now(),
+                max_attempts=max_attempts
+            )
+    except IntegrityError:
+        if not key:
+            raise
+        return None
+
+
+def claim(worker_id, limit):
+    """Lock up to `limit` due jobs, skipping rows other workers hold"""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.QUEUED, run_at__lte=now)
+            .order_by('run_at')
+            .values_list('pk', flat=True)[:limit]
+        )
+        Job.objects.filter(pk__in=ids).update(
+            status=Job.RUNNING,
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=F('attempts') + 1
+        )
+    return ids
+
+
+def requeue_stale(timeout):
+    """
+    Queue again running jobs whose worker stopped answering.
+
+    A job that used all its attempts is failed instead, so a job killing
+    its worker is not retried forever.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        locked_at__lt=now - datetime.timedelta(seconds=timeout)
+    )
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED,
+        locked_by='',
+        finished_at=now,
+        last_error='Worker stopped while running the job'
+    )
+    return stale.update(status=Job.QUEUED, locked_by='')
+
+
+def execute_job(job_id):
+    """
+    Run a claimed job, then mark it done, retried later or failed.
+
+    The outcome is only written while the claim still holds: a job queued
+    again as stale and claimed by another worker keeps the status of the
+    newer run.
+    """
+    job = Job.objects.get(pk=job_id)
+    claimed = Job.objects.filter(
+        pk=job.pk,
+        status=Job.RUNNING,
+        locked_by=job.locked_by,
+        attempts=job.attempts
+    )
+    registered = registry.get(job.name)
+    try:
+        if registered is None:
+            raise LookupError(f'Unknown job {job.name}')
+        registered.func(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            retry_delay = registered.retry_delay if registered \
+                else settings.JOB_RETRY_DELAY
+            delay = retry_delay * 2 ** (job.attempts - 1)
+            updated = claimed.update(
+                status=Job.QUEUED,
+                run_at=now + datetime.timedelta(seconds=delay),
+                locked_by='',
+                last_error=error
+            )
+            if updated:
+                logger.warning('Job %s failed, retrying in %ss', job, delay)
+        else:
+            updated = claimed.update(
+                status=Job.FAILED,
+                finished_at=now,
+                last_error=error
+            )
+            if updated:
+                logger.error('Job %s failed:\n%s', job, error)
+        if not updated:
+            logger.warning('Job %s lost its claim while running', job)
+        return False
+    if not claimed.update(status=Job.DONE, finished_at=timezone.now()):
+        logger.warning('Job %s lost its claim while running', job)
+    return True
+
+
+def _execute_and_close(job_id):
+    try:
+        return execute_job(job_id)
+    finally:
+        connections.close_all()
+
+
+class InlineExecutor(Executor):
+    """Run submitted jobs in the calling thread"""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+class Worker:
+    """
+    Claim due jobs and run them on a thread, process or inline executor.
+
+    Stopping lets the jobs in flight finish before the worker returns.
+    """
+
+    def __init__(self, executor='thread', concurrency=None,
+                 poll_interval=1.0):
+        self.executor = executor
+        self.concurrency = 1 if executor == 'inline' else \
+            concurrency or settings.JOB_WORKER_CONCURRENCY
+        self.poll_interval = poll_interval
+        self.id = f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = threading.Event()
+
+    def get_executor(self):
+        if self.executor == 'inline':
+            return InlineExecutor(), execute_job
+        if self.executor == 'process':
+            return ProcessPoolExecutor(
+                max_workers=self.concurrency,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=job_process.init_process
+            ), job_process.execute_job
+        return ThreadPoolExecutor(max_workers=self.concurrency), \
+            _execute_and_close
+
+    def run(self, burst=False):
+        """Process jobs until stopped, or until none are due with burst"""
+        autodiscover_modules('tasks')
+        executor, func = self.get_executor()
+        in_flight = set()
+        processed = 0
+        next_requeue = 0
+        with executor:
+            while not self.stopping.is_set():
+                free = self.concurrency - len(in_flight)
+                try:
+                    if time.monotonic() >= next_requeue:
+                        requeue_stale(settings.JOB_LOCK_TIMEOUT)
+                        next_requeue = time.monotonic() + \
+                            settings.JOB_LOCK_TIMEOUT / 2
+                    ids = claim(self.id, free) if free else []
+                except DatabaseError:
+                    logger.exception('Could not claim jobs')
+                    ids = []
+                    self.stopping.wait(self.poll_interval)
+                for job_id in ids:
+                    in_flight.add(executor.submit(func, job_id))
+                processed += len(ids)
+
+                if in_flight:
+                    done, in_flight = wait(
+                        in_flight,
+                        timeout=self.poll_interval,
+                        return_when=FIRST_COMPLETED
+                    )
+                    for future in done:
+                        if future.exception():
+                            logger.error(
+                                'Job worker error', exc_info=future.exception()
+                            )
+                elif burst and not ids:
+                    break
+                elif not ids:
+                    self.stopping.wait(self.poll_interval)
+        return processed
+
+    def stop(self):
+        self.stopping.set()
@@ -0,0 +1,89 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.compressed import (
+    compress_text,
+    decompress_text,
+    sample_values,
+    train_dictionary,
+)
+from university import models
+
+WORDS = (
+    'aula derivada integral função limite exemplo exercício teorema prova '
+    'variável gráfico equação solução resultado definição propriedade '
+    'conjunto número real contínua intervalo ponto valor calcule mostre '
+    'considere seja então portanto observe capítulo seção leitura vídeo'
+).split()
+
+
+def synthetic_lessons(count):
+    """Lesson bodies sharing a vocabulary and a markdown layout"""
+    generator = random.Random(0)
+    lessons = []
+    for number in range(count):
+        paragraphs = [
+            ' '.join(generator.choices(WORDS, k=generator.randint(30, 80)))
+            for paragraph in range(generator.randint(2, 6))
+        ]
+        lessons.append(
+            f'# Aula {number}\n\n## Objetivos\n\n'
+            + '\n\n'.join(paragraphs)
+            + '\n\n## Exercícios\n\n1. Calcule o limite.\n'
+        )
+    return lessons
+
+
+class Command(BaseCommand):
+    help = 'Compare the size and read time of compressed lesson content'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--synthetic',
+            type=int,
+            metavar='COUNT',
+            help='Use COUNT generated lessons instead of the database ones'
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if options['synthetic']:
+            texts = synthetic_lessons(options['synthetic'])
+        else:
+            texts = [
+                sample.decode() for sample in
+                sample_values(models.Lesson.objects.all(), 'textual_content')
+            ]
+        if len(texts) < 2:
+            raise CommandError('Not enough lessons, try --synthetic 1000')
+
+        # Train on half of the lessons and measure on the other half, as a
+        # dictionary meets lessons written after it was trained
+        training, measured = texts[::2], texts[1::2]
+        dictionary = train_dictionary([text.encode() for text in training])
+        codecs = (
+            ('text', lambda text: text.encode(), bytes.decode),
+            ('zlib', compress_text, decompress_text),
+            ('zlib+dict',
+             lambda text: compress_text(text, (0, dictionary)),
+             lambda value: decompress_text(value, lambda pk: dictionary)),
+        )
+        raw_size = sum(len(text.encode()) for text in measured)
+        self.stdout.write(
+            f'{len(measured)} lessons, {raw_size / len(measured):.0f} bytes '
+            f'on average, dictionary of {len(dictionary)} bytes'
+        )
+        repeat = options['repeat']
+        for name, encode, decode in codecs:
+            values = [encode(text) for text in measured]
+            size = sum(len(value) for value in values)
+            read_time = timeit.timeit(
+                lambda: [decode(value) for value in values], number=repeat
+            ) / repeat / len(values)
+            self.stdout.write(
+                f'{name:<10} {size / len(values):9.0f} bytes  '
+                f'ratio {raw_size / size:5.2f}  '
+                f'read {read_time * 1e6:7.1f} us'
+            )
@@ -0,0 +1,99 @@
+import datetime
+import io
+import timeit
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer, orjson
+from university import models
+from university.serializers import (
+    EmployeeSerializer,
+    LessonSerializer,
+    StudentSerializer,
+)
+
+
+def build_payloads(rows):
+    """Serialize in-memory rows shaped like our list endpoints"""
+    job = models.Job(name='Secretária')
+    course = models.Course(name='Engenharia de Computação')
+    subject = models.Subject(name='Cálculo I')
+    employees, students, lessons = [], [], []
+    for count in range(rows):
+        user = get_user_model()(
+            name=f'José da Silva {count}',
+            email=f'user{count}@email.com',
+            cpf='516.040.900-90',
+            phone='19 99999-9999',
+            street='Rua Antonia Maria das Neves Carvalhos',
+            state='PE',
+            city='Caruaru',
+            zip_code='55019-325',
+        )
+        employees.append(models.Employee(
+            user=user,
+            job=job,
+            salary=Decimal('1200.00') + count,
+            hired_date=datetime.date(2020, 1, 1)
+            + datetime.timedelta(days=count),
+        ))
+        students.append(models.Student(user=user, course=course))
+        lessons.append(models.Lesson(
+            title=f'Aula {count}',
+            textual_content='Conteúdo da aula ' * 50,
+            video_url='https://videos.example.com/aula',
+            subject=subject,
+        ))
+
+    return {
+        'employee': EmployeeSerializer(employees, many=True).data,
+        'student': StudentSerializer(students, many=True).data,
+        'lesson': LessonSerializer(lessons, many=True).data,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compare FastJSONRenderer/FastJSONParser with the DRF defaults'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        if orjson is None:
+            self.stdout.write('orjson is not installed, nothing to compare')
+
+        for name, data in build_payloads(options['rows']).items():
+            expected = JSONRenderer().render(data)
+            rendered = FastJSONRenderer().render(data)
+            if rendered != expected:
+                raise CommandError(f'{name}: rendered output differs')
+
+            timings = (
+                ('render', JSONRenderer().render, FastJSONRenderer().render,
+                 data),
+                ('parse',
+                 lambda body: JSONParser().parse(io.BytesIO(body)),
+                 lambda body: FastJSONParser().parse(io.BytesIO(body)),
+                 expected),
+            )
+            for operation, default, fast, argument in timings:
+                default_time = timeit.timeit(
+                    lambda: default(argument), number=repeat
+                ) / repeat
+                fast_time = timeit.timeit(
+                    lambda: fast(argument), number=repeat
+                ) / repeat
+                self.stdout.write(
+                    f'{name:<10} {operation:<7} {len(expected):>9} bytes '
+                    f'drf {default_time * 1000:8.2f} ms  '
+                    f'fast {fast_time * 1000:8.2f} ms  '
+                    f'x{default_time / fast_time:.1f}'
+                )
@@ -0,0 +1,58 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from core.outbox import Dispatcher
+
+
+class Command(BaseCommand):
+    help = 'Deliver outbox events to the registered webhooks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            help='Batches sent at once, WEBHOOK_CONCURRENCY by default'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Events per request, WEBHOOK_BATCH_SIZE by default'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait for new events when none are due'
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once no delivery is due instead of waiting for more'
+        )
+
+    def handle(self, *args, **options):
+        dispatcher = Dispatcher(
+            concurrency=options['concurrency'],
+            batch_size=options['batch_size'],
+            poll_interval=options['poll_interval']
+        )
+
+        def stop(signum, frame):
+            self.stdout.write('Finishing sending batches...')
+            dispatcher.stop()
+
+        previous = {
+            signum: signal.signal(signum, stop)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        self.stdout.write(
+            f'Webhook dispatcher started ({dispatcher.concurrency} at once, '
+            f'{dispatcher.batch_size} events per batch)'
+        )
+        try:
+            sent = dispatcher.run(burst=options['burst'])
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} deliveries'))
@@ -0,0 +1,149 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.coldstart import find_regressions, group_modules, parse_importtime
+
+
+class Command(BaseCommand):
+    help = 'Profile imports and startup phases of a fresh interpreter'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Interpreters to start, the fastest of each figure is kept'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=25,
+            help='Slowest modules and serializers to list'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the full report as JSON'
+        )
+        parser.add_argument(
+            '--save-baseline',
+            metavar='PATH',
+            help='Write the report to PATH to compare later runs with'
+        )
+        parser.add_argument(
+            '--baseline',
+            metavar='PATH',
+            help='Fail when a phase is slower than in this saved report'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.25,
+            help='Fraction a phase may grow over the baseline'
+        )
+        parser.add_argument(
+            '--slack-ms',
+            type=float,
+            default=20,
+            help='Milliseconds a phase may grow regardless of tolerance'
+        )
+
+    def run_interpreter(self):
+        env = os.environ.copy()
+        env['PYTHONPATH'] = os.pathsep.join(
+            filter(None, [str(settings.BASE_DIR), env.get('PYTHONPATH')])
+        )
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-m', 'core.coldstart'],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1])
+        report = json.loads(result.stdout)
+        report['modules'] = parse_importtime(result.stderr)
+        return report
+
+    def profile(self, repeat):
+        reports = [self.run_interpreter() for _ in range(max(1, repeat))]
+        prefixes = ['app', 'rest_framework'] + \
+            [config.name for config in apps.get_app_configs()]
+        modules = {}
+        for report in reports:
+            for name, timings in group_modules(
+                    report['modules'], prefixes).items():
+                if name not in modules or timings[1] < modules[name][1]:
+                    modules[name] = timings
+        return {
+            'phases': {
+                phase: min(report['phases'][phase] for report in reports)
+                for phase in reports[0]['phases']
+            },
+            'serializers': {
+                name: min(report['serializers'][name] for report in reports)
+                for name in reports[0]['serializers']
+            },
+            'packages': {
+                prefix: sum(
+                    timings[1] for timings in modules.values()
+                    if timings[0] == prefix
+                )
+                for prefix in prefixes
+            },
+            'modules': modules,
+        }
+
+    def write_table(self, title, rows, top):
+        self.stdout.write(f'\n{title}')
+        for name, seconds in sorted(rows, key=lambda row: -row[1])[:top]:
+            self.stdout.write(f'  {seconds * 1000:9.1f} ms  {name}')
+
+    def handle(self, *args, **options):
+        report = self.profile(options['repeat'])
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            top = options['top']
+            self.stdout.write('Startup phases')
+            for phase, seconds in report['phases'].items():
+                self.stdout.write(f'  {seconds * 1000:9.1f} ms  {phase}')
+            self.write_table(
+                'Import time by package (self)',
+                report['packages'].items(), top
+            )
+            self.write_table(
+                'Slowest modules (cumulative import)',
+                [(name, timings[2])
+                 for name, timings in report['modules'].items()], top
+            )
+            self.write_table(
+                'Serializer construction',
+                report['serializers'].items(), top
+            )
+
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as f:
+                json.dump({'phases': report['phases']}, f, indent=2)
+
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+            regressions = find_regressions(
+                report, baseline,
+                options['tolerance'], options['slack_ms'] / 1000
+            )
+            if regressions:
+                raise CommandError('Startup regressions: ' + ', '.join(
+                    f'{phase} {previous * 1000:.1f} -> '
+                    f'{seconds * 1000:.1f} ms'
+                    for phase, previous, seconds in regressions
+                ))
+            self.stdout.write(self.style.SUCCESS('No startup regressions'))
@@ -0,0 +1,59 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from core.jobs import Worker
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs from the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--executor',
+            choices=('thread', 'process', 'inline'),
+            default='thread',
+            help='Where jobs run: thread pool, process pool or this thread'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            help='Jobs run at once, JOB_WORKER_CONCURRENCY by default'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait for new jobs when the queue is empty'
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once no job is due instead of waiting for more'
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            executor=options['executor'],
+            concurrency=options['concurrency'],
+            poll_interval=options['poll_interval']
+        )
+
+        def stop(signum, frame):
+            self.stdout.write('Finishing running jobs...')
+            worker.stop()
+
+        previous = {
+            signum: signal.signal(signum, stop)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        self.stdout.write(
+            f'Job worker {worker.id} started '
+            f'({worker.executor}, {worker.concurrency} at once)'
+        )
+        try:
+            processed = worker.run(burst=options['burst'])
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} jobs'))
@@ -0,0 +1,51 @@
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+
+from core.compressed import (
+    CompressedTextField,
+    recompress,
+    train_field_dictionary,
+)
+
+
+class Command(BaseCommand):
+    help = 'Train a new compression dictionary for a compressed text field'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'field',
+            help='Field to train for, e.g. university.Lesson.textual_content'
+        )
+        parser.add_argument(
+            '--recompress',
+            action='store_true',
+            help='Rewrite the stored values with the new dictionary'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        try:
+            app_label, model_name, name = options['field'].split('.')
+            model = apps.get_model(app_label, model_name)
+            field = model._meta.get_field(name)
+        except (ValueError, LookupError, FieldDoesNotExist):
+            raise CommandError(f'Unknown field {options["field"]}')
+        if not isinstance(field, CompressedTextField) or \
+                field.dictionary is None:
+            raise CommandError(
+                f'{options["field"]} is not a compressed text field with a '
+                f'dictionary'
+            )
+
+        dictionary = train_field_dictionary(model, name)
+        if dictionary is None:
+            raise CommandError('Not enough data to train a dictionary')
+        self.stdout.write(
+            f'Trained {dictionary} of {len(dictionary.data)} bytes'
+        )
+        if options['recompress']:
+            count = recompress(
+                model._default_manager.all(), name, options['batch_size']
+            )
+            self.stdout.write(f'Compressed {count} rows again')
@@ -0,0 +1,159 @@
+"""
+Markdown to HTML for lesson content.
+
+Covers the subset lessons are written in: headings, paragraphs, lists,
+block quotes, fenced code, rules, emphasis, inline code and links. Raw
+HTML in the source is escaped and links are limited to safe schemes, so
+the output can be inserted into pages as is. Bump VERSION whenever the
+output changes, so cached renderings are rebuilt.
+"""
+import re
+from html import escape
+
+VERSION = 1
+
+HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+RULE = re.compile(r'^ {0,3}([-*_])( *\1){2,}\s*$')
+FENCE = re.compile(r'^ {0,3}(```|~~~)\s*([\w+-]*)\s*$')
+UNORDERED = re.compile(r'^ {0,3}[-*+]\s+(.*)$')
+ORDERED = re.compile(r'^ {0,3}(\d{1,9})[.)]\s+(.*)$')
+QUOTE = re.compile(r'^ {0,3}>\s?(.*)$')
+
+CODE_SPAN = re.compile(r'(`+)(.+?)\1', re.S)
+LINK = re.compile(r'\[([^\]]+)\]\(([^)\s]+)(?:\s+&quot;(.*?)&quot;)?\)')
+# Underscores only delimit emphasis outside of words, as in snake_case
+STRONG = re.compile(
+    r'(\*\*(?=\S)(.+?)(?<=\S)\*\*|(?<!\w)__(?=\S)(.+?)(?<=\S)__(?!\w))',
+    re.S
+)
+EMPHASIS = re.compile(
+    r'(\*(?=\S)(.+?)(?<=\S)\*|(?<!\w)_(?=\S)(.+?)(?<=\S)_(?!\w))', re.S
+)
+LINE_BREAK = re.compile(r' {2,}\n')
+SAFE_URL = re.compile(r'^(https?:|mailto:|/|#|[^:]*$)', re.I)
+
+
+def _link(match):
+    text, url, title = match.groups()
+    if not SAFE_URL.match(url):
+        return text
+    title = f' title="{title}"' if title else ''
+    return f'<a href="{url}"{title}>{text}</a>'
+
+
+def _tag(name):
+    def replace(match):
+        return f'<{name}>{match.group(2) or match.group(3)}</{name}>'
+    return replace
+
+
+def _inline_text(text):
+    text = LINK.sub(_link, text)
+    text = STRONG.sub(_tag('strong'), text)
+    text = EMPHASIS.sub(_tag('em'), text)
+    return LINE_BREAK.sub('<br>\n', text)
+
+
+def inline(text):
+    """HTML of the inline markup of `text`, everything else escaped"""
+    parts = []
+    position = 0
+    for match in CODE_SPAN.finditer(text):
+        parts.append(_inline_text(escape(text[position:match.start()])))
+        parts.append(f'<code>{escape(match.group(2).strip())}</code>')
+        position = match.end()
+    parts.append(_inline_text(escape(text[position:])))
+    return ''.join(parts)
+
+
+def _list(lines, start, pattern, tag):
+    items = []
+    index = start
+    while index < len(lines):
+        match = pattern.match(lines[index])
+        if match:
+            items.append([match.groups()[-1]])
+        elif lines[index].strip() and lines[index].startswith(' ') \
+                and items:
+            items[-1].append(lines[index].strip())
+        else:
+            break
+        index += 1
+    attributes = ''
+    if tag == 'ol':
+        first = int(pattern.match(lines[start]).group(1))
+        if first != 1:
+            attributes = f' start="{first}"'
+    body = ''.join(
+        f'<li>{inline(chr(10).join(item))}</li>\n' for item in items
+    )
+    return f'<{tag}{attributes}>\n{body}</{tag}>', index
+
+
+def _blocks(lines):
+    blocks = []
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        if not line.strip():
+            index += 1
+            continue
+
+        fence = FENCE.match(line)
+        if fence:
+            end = index + 1
+            while end < len(lines) and not lines[end].strip()\
+                    .startswith(fence.group(1)):
+                end += 1
+            language = fence.group(2)
+            attributes = f' class="language-{language}"' if language else ''
+            code = escape('\n'.join(lines[index + 1:end]))
+            blocks.append(f'<pre><code{attributes}>{code}</code></pre>')
+            index = end + 1
+            continue
+
+        heading = HEADING.match(line)
+        if heading:
+            level = len(heading.group(1))
+            blocks.append(f'<h{level}>{inline(heading.group(2))}</h{level}>')
+            index += 1
+            continue
+
+        if RULE.match(line):
+            blocks.append('<hr>')
+            index += 1
+            continue
+
+        if QUOTE.match(line):
+            quoted = []
+            while index < len(lines) and QUOTE.match(lines[index]):
+                quoted.append(QUOTE.match(lines[index]).group(1))
+                index += 1
+            blocks.append(
+                f'<blockquote>\n{_blocks(quoted)}\n</blockquote>'
+            )
+            continue
+
+        if UNORDERED.match(line):
+            block, index = _list(lines, index, UNORDERED, 'ul')
+            blocks.append(block)
+            continue
+        if ORDERED.match(line):
+            block, index = _list(lines, index, ORDERED, 'ol')
+            blocks.append(block)
+            continue
+
+        paragraph = []
+        while index < len(lines) and lines[index].strip() and not any(
+                pattern.match(lines[index])
+                for pattern in (HEADING, RULE, FENCE, QUOTE, UNORDERED)):
+            paragraph.append(lines[index])
+            index += 1
+        blocks.append(f'<p>{inline(chr(10).join(paragraph))}</p>')
+    return '\n'.join(blocks)
+
+
+def render(text):
+    """HTML of the markdown `text`"""
+    return _blocks(text.replace('\r\n', '\n').replace('\t', '    ')
+                   .split('\n'))
@@ -0,0 +1,24 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:32
+
+import core.compressed
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_compressiondictionary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenderedContent',
+            fields=[
+                ('content_hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('html', core.compressed.CompressedTextField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_renderedcontent'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(condition=models.Q(('dispatched', False)), fields=['aggregate_type', 'aggregate_id', 'id'], name='core_outbox_undispatched_agg'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.25 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+def drop_duplicate_keys(apps, schema_editor):
+    """Keep the oldest unfinished job of each key"""
+    Job = apps.get_model('core', 'Job')
+    active = Job.objects.filter(status__in=('queued', 'running'))\
+        .exclude(key='').order_by('key', 'created_at', 'pk')
+    seen = set()
+    duplicates = []
+    for pk, key in active.values_list('pk', 'key'):
+        if key in seen:
+            duplicates.append(pk)
+        seen.add(key)
+    Job.objects.filter(pk__in=duplicates).update(status='failed')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_outbox_aggregate_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_keys, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ('queued', 'running')), models.Q(('key', ''), _negated=True)), fields=('key',), name='core_job_active_key'),
+        ),
+    ]
@@ -0,0 +1,185 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+from core.compressed import CompressedTextField
+
+
+class Job(models.Model):
+    """Background job stored in the database queue"""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    name = models.CharField(max_length=255)
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    key = models.CharField(max_length=255, blank=True, db_index=True)
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=QUEUED
+    )
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    locked_by = models.CharField(max_length=255, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'run_at'])]
+        constraints = [
+            # One unfinished job per key
+            models.UniqueConstraint(
+                fields=['key'],
+                condition=models.Q(status__in=('queued', 'running'))
+                & ~models.Q(key=''),
+                name='core_job_active_key'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
+
+
+class AuditEntry(models.Model):
+    """Old and new value of an audited field of a row"""
+    model = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=64)
+    field = models.CharField(max_length=64)
+    old_value = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    new_value = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    actor_id = models.UUIDField(blank=True, null=True)
+    source = models.CharField(max_length=20, blank=True)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'object_id', 'changed_at']),
+            models.Index(fields=['changed_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.model} {self.object_id} {self.field}'
+
+
+class Webhook(models.Model):
+    """Partner endpoint that receives outbox events"""
+    url = models.URLField(max_length=500)
+    secret = models.CharField(max_length=255, blank=True)
+    # Event types delivered to the endpoint, every type when empty
+    events = models.JSONField(default=list, blank=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.url
+
+
+class OutboxEvent(models.Model):
+    """Domain event written in the transaction of the change it describes"""
+    event_type = models.CharField(max_length=100)
+    aggregate_type = models.CharField(max_length=100)
+    aggregate_id = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now)
+    dispatched = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['id'],
+                condition=models.Q(dispatched=False),
+                name='core_outbox_undispatched'
+            ),
+            models.Index(
+                fields=['aggregate_type', 'aggregate_id', 'id'],
+                condition=models.Q(dispatched=False),
+                name='core_outbox_undispatched_agg'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.event_type} {self.aggregate_id}'
+
+
+class WebhookDelivery(models.Model):
+    """Delivery of an outbox event to a webhook"""
+    PENDING = 'pending'
+    SENDING = 'sending'
+    DELIVERED = 'delivered'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (DELIVERED, 'Delivered'),
+        (FAILED, 'Failed'),
+    )
+
+    webhook = models.ForeignKey(
+        Webhook,
+        on_delete=models.CASCADE,
+        related_name='deliveries'
+    )
+    event = models.ForeignKey(
+        OutboxEvent,
+        on_delete=models.CASCADE,
+        related_name='deliveries'
+    )
+    # "<aggregate_type>:<aggregate_id>" of the event, the ordering key
+    aggregate = models.CharField(max_length=170)
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    delivered_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        unique_together = [('webhook', 'event')]
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+            models.Index(fields=['webhook', 'aggregate', 'event']),
+        ]
+
+    def __str__(self):
+        return f'{self.event} -> {self.webhook} ({self.status})'
+
+
+class CompressionDictionary(models.Model):
+    """Preset zlib dictionary trained on the values of a compressed field"""
+    name = models.CharField(max_length=100)
+    data = models.BinaryField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=['name', '-id'])]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
+
+
+class RenderedContent(models.Model):
+    """HTML rendering of a markdown body, addressed by content hash"""
+    content_hash = models.CharField(max_length=64, primary_key=True)
+    html = CompressedTextField()
+    created_at = models.DateTimeField(default=timezone.now)
+    # Refreshed at most every RENDER_CACHE_TOUCH_INTERVAL, for LRU eviction
+    used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return self.content_hash
@@ -0,0 +1,262 @@
+"""
+Transactional outbox and batched webhook delivery.
+
+`publish` writes an OutboxEvent in the transaction of the change it
+describes, so partners only hear about committed work and never miss it.
+The Dispatcher fans events out to one WebhookDelivery per subscribed
+webhook and POSTs them in batches, a limited number at once. Failed
+batches are retried with exponential backoff; a delivery waits while an
+earlier event of the same aggregate is still undelivered for its webhook,
+or not yet fanned out by any dispatcher.
+"""
+import datetime
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from core.models import OutboxEvent, Webhook, WebhookDelivery
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = 'X-Webhook-Signature'
+
+
+def publish(event_type, instance, data):
+    """Write an event about `instance` in the current transaction"""
+    return OutboxEvent.objects.create(
+        event_type=event_type,
+        aggregate_type=instance._meta.label_lower,
+        aggregate_id=str(instance.pk),
+        payload=data
+    )
+
+
+def fan_out(limit):
+    """Create the deliveries of undispatched events to their webhooks"""
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(dispatched=False)
+            .order_by('id')[:limit]
+        )
+        if not events:
+            return 0
+        webhooks = list(Webhook.objects.filter(is_active=True))
+        WebhookDelivery.objects.bulk_create([
+            WebhookDelivery(
+                webhook=webhook,
+                event=event,
+                aggregate=f'{event.aggregate_type}:{event.aggregate_id}'
+            )
+            for event in events
+            for webhook in webhooks
+            if not webhook.events or event.event_type in webhook.events
+        ], ignore_conflicts=True)
+        OutboxEvent.objects.filter(pk__in=[event.pk for event in events])\
+            .update(dispatched=True)
+    return len(events)
+
+
+def claim(limit):
+    """
+    Lock up to `limit` due deliveries, the first undelivered one of each
+    aggregate per webhook.
+
+    Dispatchers fan out disjoint ranges of events, so an earlier event of
+    the aggregate may still be waiting for its deliveries: those hold back
+    later deliveries too.
+    """
+    now = timezone.now()
+    earlier = WebhookDelivery.objects.filter(
+        webhook=OuterRef('webhook'),
+        aggregate=OuterRef('aggregate'),
+        event_id__lt=OuterRef('event_id'),
+        status__in=(WebhookDelivery.PENDING, WebhookDelivery.SENDING)
+    )
+    undispatched = OutboxEvent.objects.filter(
+        dispatched=False,
+        aggregate_type=OuterRef('event__aggregate_type'),
+        aggregate_id=OuterRef('event__aggregate_id'),
+        id__lt=OuterRef('event_id')
+    )
+    with transaction.atomic():
+        ids = list(
+            WebhookDelivery.objects.select_for_update(skip_locked=True)
+            .filter(
+                ~Exists(earlier),
+                ~Exists(undispatched),
+                status=WebhookDelivery.PENDING,
+                next_attempt_at__lte=now
+            )
+            .order_by('event_id')
+            .values_list('pk', flat=True)[:limit]
+        )
+        WebhookDelivery.objects.filter(pk__in=ids).update(
+            status=WebhookDelivery.SENDING,
+            locked_at=now,
+            attempts=F('attempts') + 1
+        )
+    return list(
+        WebhookDelivery.objects.filter(pk__in=ids)
+        .select_related('event', 'webhook')
+        .order_by('event_id')
+    )
+
+
+def requeue_stale(timeout):
+    """Retry deliveries whose dispatcher stopped answering"""
+    return WebhookDelivery.objects.filter(
+        status=WebhookDelivery.SENDING,
+        locked_at__lt=timezone.now() - datetime.timedelta(seconds=timeout)
+    ).update(status=WebhookDelivery.PENDING)
+
+
+def sign(secret, body):
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return f'sha256={digest}'
+
+
+def event_body(event):
+    return {
+        'id': event.pk,
+        'type': event.event_type,
+        'aggregate': {
+            'type': event.aggregate_type,
+            'id': event.aggregate_id,
+        },
+        'created_at': event.created_at,
+        'data': event.payload,
+    }
+
+
+def send_batch(webhook, deliveries):
+    """POST the events of `deliveries`; the error message, or None"""
+    body = json.dumps(
+        {'events': [event_body(delivery.event) for delivery in deliveries]},
+        cls=DjangoJSONEncoder
+    ).encode()
+    request = urllib.request.Request(
+        webhook.url,
+        data=body,
+        method='POST',
+        headers={
+            'Content-Type': 'application/json',
+            SIGNATURE_HEADER: sign(webhook.secret, body),
+        }
+    )
+    try:
+        with urllib.request.urlopen(
+                request, timeout=settings.WEBHOOK_TIMEOUT) as response:
+            response.read()
+    except Exception as e:
+        return f'{type(e).__name__}: {e}'
+    return None
+
+
+def retry_delay(attempts):
+    return min(
+        settings.WEBHOOK_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.WEBHOOK_MAX_RETRY_DELAY
+    )
+
+
+def complete(deliveries, error):
+    """Mark sent deliveries delivered, or schedule their next attempt"""
+    now = timezone.now()
+    if error is None:
+        WebhookDelivery.objects.filter(
+            pk__in=[delivery.pk for delivery in deliveries]
+        ).update(
+            status=WebhookDelivery.DELIVERED,
+            delivered_at=now,
+            last_error=''
+        )
+        return
+    for delivery in deliveries:
+        if delivery.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+            changes = {'status': WebhookDelivery.FAILED}
+            logger.error('Delivery %s failed: %s', delivery, error)
+        else:
+            changes = {
+                'status': WebhookDelivery.PENDING,
+                'next_attempt_at': now + datetime.timedelta(
+                    seconds=retry_delay(delivery.attempts)
+                ),
+            }
+        WebhookDelivery.objects.filter(pk=delivery.pk).update(
+            last_error=error, **changes
+        )
+
+
+class Dispatcher:
+    """
+    Deliver outbox events to webhooks until stopped.
+
+    Database work happens in the calling thread; only the HTTP requests run
+    on the pool, `concurrency` at once, each carrying up to `batch_size`
+    events of one webhook.
+    """
+
+    def __init__(self, concurrency=None, batch_size=None,
+                 poll_interval=1.0):
+        self.concurrency = concurrency or settings.WEBHOOK_CONCURRENCY
+        self.batch_size = batch_size or settings.WEBHOOK_BATCH_SIZE
+        self.poll_interval = poll_interval
+        self.stopping = threading.Event()
+
+    def batches(self, deliveries):
+        by_webhook = {}
+        for delivery in deliveries:
+            by_webhook.setdefault(delivery.webhook, []).append(delivery)
+        for webhook, pending in by_webhook.items():
+            for start in range(0, len(pending), self.batch_size):
+                yield webhook, pending[start:start + self.batch_size]
+
+    def run_once(self, executor):
+        """Send one round of due deliveries; the number sent"""
+        limit = self.batch_size * self.concurrency
+        fan_out(limit)
+        deliveries = claim(limit)
+        futures = {
+            executor.submit(send_batch, webhook, batch): batch
+            for webhook, batch in self.batches(deliveries)
+        }
+        for future in as_completed(futures):
+            complete(futures[future], future.result())
+        return len(deliveries)
+
+    def run(self, burst=False):
+        """Dispatch until stopped, or until nothing is due with burst"""
+        sent = 0
+        next_requeue = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while not self.stopping.is_set():
+                try:
+                    if time.monotonic() >= next_requeue:
+                        requeue_stale(settings.WEBHOOK_LOCK_TIMEOUT)
+                        next_requeue = time.monotonic() + \
+                            settings.WEBHOOK_LOCK_TIMEOUT / 2
+                    count = self.run_once(executor)
+                except DatabaseError:
+                    logger.exception('Could not dispatch webhooks')
+                    count = 0
+                sent += count
+                if not count:
+                    if burst:
+                        break
+                    self.stopping.wait(self.poll_interval)
+        return sent
+
+    def stop(self):
+        self.stopping.set()
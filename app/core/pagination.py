@@ -0,0 +1,186 @@
+import hashlib
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, \
+    Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+COUNT_CACHE_KEY = 'core:count:%s'
+
+
+def planner_estimate(queryset):
+    """
+    Row count PostgreSQL expects for a queryset, or None elsewhere.
+
+    Unfiltered tables read pg_class.reltuples, other querysets the row
+    estimate of their EXPLAIN plan. Neither scans the table.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    queryset = queryset.order_by()
+    with connection.cursor() as cursor:
+        if not queryset.query.where and not queryset.query.distinct:
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+            # Tables never vacuumed or analyzed report -1
+            if row and row[0] >= 0:
+                return int(row[0])
+            return None
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_with_estimate(queryset, threshold=None):
+    """
+    (count, approximate) of a queryset.
+
+    Querysets the planner expects to reach `threshold` rows get its
+    estimate, flagged approximate; smaller ones are counted exactly.
+    """
+    if threshold is None:
+        threshold = settings.ESTIMATED_COUNT_THRESHOLD
+    estimate = planner_estimate(queryset)
+    if estimate is None or estimate < threshold:
+        return queryset.count(), False
+    return estimate, True
+
+
+def estimated_count(queryset, threshold=None):
+    """Planner estimate for large querysets, exact count for small ones"""
+    return count_with_estimate(queryset, threshold)[0]
+
+
+def cached_count(queryset, timeout, threshold=None):
+    """count_with_estimate kept in the cache for `timeout` seconds"""
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.md5(
+        f'{queryset.db}:{sql}:{params!r}'.encode()
+    ).hexdigest()
+    key = COUNT_CACHE_KEY % digest
+    result = cache.get(key)
+    if result is None:
+        result = count_with_estimate(queryset, threshold)
+        cache.set(key, result, timeout)
+    return tuple(result)
+
+
+class EstimatedCountPage(Page):
+    """Page that knows whether rows follow it without the paginator count"""
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that does not COUNT(*) tables past the estimate threshold.
+
+    The count is only reported: pages are validated, and `has_next` is
+    answered, by reading one row past the page, so an estimate that is
+    off never hides or invents pages.
+    """
+    count_threshold = None
+    count_cache_timeout = None
+
+    @cached_property
+    def counted(self):
+        if self.count_cache_timeout:
+            return cached_count(
+                self.object_list,
+                self.count_cache_timeout,
+                self.count_threshold
+            )
+        return count_with_estimate(self.object_list, self.count_threshold)
+
+    @cached_property
+    def count(self):
+        return self.counted[0]
+
+    @property
+    def count_is_approximate(self):
+        return self.counted[1]
+
+    def validate_number(self, number):
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(_('That page contains no results'))
+        return EstimatedCountPage(
+            rows[:self.per_page], number, self, len(rows) > self.per_page
+        )
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Page number pagination whose count may be a planner estimate.
+
+    Pages are served when the client sends `page_size` (or PAGE_SIZE is
+    set). The response flags estimated counts with `count_is_approximate`;
+    `count_cache_timeout` (PAGINATION_COUNT_CACHE_TIMEOUT by default) keeps
+    counts in the cache for that many seconds.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    count_threshold = None
+    count_cache_timeout = None
+
+    def django_paginator_class(self, object_list, per_page):
+        paginator = EstimatedCountPaginator(object_list, per_page)
+        paginator.count_threshold = self.count_threshold
+        paginator.count_cache_timeout = self.count_cache_timeout
+        if paginator.count_cache_timeout is None:
+            paginator.count_cache_timeout = \
+                settings.PAGINATION_COUNT_CACHE_TIMEOUT
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # Pages of an unordered queryset are not stable between requests
+        if not queryset.ordered:
+            queryset = queryset.order_by(queryset.model._meta.pk.name)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        paginator = self.page.paginator
+        return Response(OrderedDict([
+            ('count', paginator.count),
+            ('count_is_approximate', paginator.count_is_approximate),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema['properties']['count_is_approximate'] = {'type': 'boolean'}
+        return schema
@@ -0,0 +1,37 @@
+import io
+
+from django.conf import settings
+
+from rest_framework.parsers import JSONParser
+
+from core.renderers import FastJSONRenderer, orjson
+
+# orjson turns integers outside the int64 and uint64 ranges into floats,
+# the stdlib keeps them as int. Negative ones can have 19 digits, so
+# bodies with a run of 19+ digits go through the stdlib.
+DIGITS_AS_ZERO = bytes.maketrans(b'123456789', b'000000000')
+WIDE_INTEGER = b'0' * 19
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSON parser backed by orjson when it is installed.
+
+    Bodies orjson rejects are parsed again by the DRF JSONParser, so
+    errors and non-strict constants behave exactly as before.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if WIDE_INTEGER not in body.translate(DIGITS_AS_ZERO):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,195 @@
+"""
+In-process publish/subscribe with a cross-process notification channel.
+
+Messages are sent through a transport once the publishing transaction
+commits: PostgreSQL NOTIFY between processes, or a local stand-in that
+delivers inside this process for tests and other databases. Each process
+then fans them out to the asyncio subscriptions of its channels.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """Queue of the messages of some channels, read from one event loop"""
+
+    def __init__(self, broker, channels, maxsize):
+        self.broker = broker
+        self.channels = frozenset(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+    def put(self, channel, message):
+        """Queue a message from any thread"""
+        self.loop.call_soon_threadsafe(self._put, channel, message)
+
+    def _put(self, channel, message):
+        try:
+            self.queue.put_nowait((channel, message))
+        except asyncio.QueueFull:
+            # A reader this far behind resubscribes rather than lag forever
+            self.overflowed = True
+
+    async def get(self, timeout=None):
+        """Next (channel, message), None on timeout"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalTransport:
+    """Stand-in transport delivering to this process only"""
+
+    def __init__(self):
+        self.deliver = None
+
+    def send(self, channel, message):
+        if self.deliver is None:
+            return
+        # Round trip through JSON so subscribers see what NOTIFY would carry
+        message = json.loads(json.dumps(message, cls=DjangoJSONEncoder))
+        transaction.on_commit(lambda: self.deliver(channel, message))
+
+    def listen(self, deliver):
+        self.deliver = deliver
+
+
+class PostgresTransport:
+    """
+    Transport over PostgreSQL LISTEN/NOTIFY on one database channel.
+
+    NOTIFY is transactional, so listeners only hear about committed work.
+    A daemon thread holds a dedicated connection LISTENing for the process.
+    """
+
+    def __init__(self, channel, using='default'):
+        self.channel = channel
+        self.using = using
+        self.deliver = None
+
+    def send(self, channel, message):
+        payload = json.dumps(
+            {'channel': channel, 'message': message}, cls=DjangoJSONEncoder
+        )
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_notify(%s, %s)', [self.channel, payload]
+            )
+
+    def listen(self, deliver):
+        self.deliver = deliver
+        threading.Thread(
+            target=self._run, name='pubsub-listen', daemon=True
+        ).start()
+
+    def _connect(self):
+        import psycopg2
+        import psycopg2.extensions
+
+        db = connections[self.using]
+        conn = psycopg2.connect(**db.get_connection_params())
+        conn.set_isolation_level(
+            psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT
+        )
+        with conn.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        return conn
+
+    def _run(self):
+        delay = 1
+        while True:
+            try:
+                conn = self._connect()
+                delay = 1
+                while True:
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        data = json.loads(notify.payload)
+                        self.deliver(data['channel'], data['message'])
+            except Exception:
+                logger.exception('Lost the LISTEN connection, reconnecting')
+                time.sleep(delay)
+                delay = min(delay * 2, 60)
+
+
+class Broker:
+    """Channels of this process and the transport that feeds them"""
+
+    def __init__(self, transport):
+        self.transport = transport
+        self.subscriptions = {}
+        self.lock = threading.Lock()
+        self.listening = False
+
+    def publish(self, channel, message):
+        """Send a JSON message to a channel when the transaction commits"""
+        self.transport.send(channel, message)
+
+    def subscribe(self, channels, maxsize=None):
+        """Subscription of the running event loop to `channels`"""
+        subscription = Subscription(
+            self, channels, maxsize or settings.PUBSUB_QUEUE_SIZE
+        )
+        with self.lock:
+            if not self.listening:
+                self.transport.listen(self.deliver)
+                self.listening = True
+            for channel in subscription.channels:
+                self.subscriptions.setdefault(channel, set()).add(
+                    subscription
+                )
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            for channel in subscription.channels:
+                subscribers = self.subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self.subscriptions[channel]
+
+    def deliver(self, channel, message):
+        """Hand a message from the transport to the channel subscribers"""
+        with self.lock:
+            subscribers = list(self.subscriptions.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(channel, message)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Broker of this process, on the PUBSUB_TRANSPORT transport"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            transport = settings.PUBSUB_TRANSPORT
+            if transport is None:
+                transport = 'postgres' \
+                    if connection.vendor == 'postgresql' else 'local'
+            if transport == 'postgres':
+                _broker = Broker(PostgresTransport(settings.PUBSUB_CHANNEL))
+            else:
+                _broker = Broker(LocalTransport())
+        return _broker
@@ -0,0 +1,104 @@
+from django.core.exceptions import ValidationError
+from django.db import router, transaction
+from django.db.models.signals import m2m_changed
+
+from rest_framework.relations import (
+    MANY_RELATION_KWARGS,
+    ManyRelatedField,
+    PrimaryKeyRelatedField,
+)
+
+
+class BulkManyRelatedField(ManyRelatedField):
+    """Resolve every submitted primary key with a single IN query"""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        child = self.child_relation
+        queryset = child.get_queryset()
+        pk_field = queryset.model._meta.pk
+        pks = []
+        for item in data:
+            if child.pk_field is not None:
+                item = child.pk_field.to_internal_value(item)
+            try:
+                if isinstance(item, bool):
+                    raise TypeError
+                pks.append(pk_field.to_python(item))
+            except (TypeError, ValueError, ValidationError):
+                child.fail('incorrect_type', data_type=type(item).__name__)
+
+        objects = queryset.in_bulk(pks)
+        for pk in pks:
+            if pk not in objects:
+                child.fail('does_not_exist', pk_value=pk)
+        return [objects[pk] for pk in pks]
+
+
+class BulkPrimaryKeyRelatedField(PrimaryKeyRelatedField):
+    """PrimaryKeyRelatedField whose many=True form is BulkManyRelatedField"""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+
+def set_many_related(instance, field_name, related_objects):
+    """
+    Make a many to many field hold exactly `related_objects`.
+
+    The current through rows are read once, then the removed rows are
+    dropped with one DELETE and the new ones written with one bulk INSERT.
+    The m2m_changed signals are sent as related manager add/remove would.
+    Returns the (added, removed) sets of related pks.
+    """
+    field = instance._meta.get_field(field_name)
+    through = field.remote_field.through
+    source = field.m2m_field_name()
+    target = field.m2m_reverse_field_name()
+    db = router.db_for_write(through, instance=instance)
+
+    wanted = {obj.pk for obj in related_objects}
+    current = set(
+        through._default_manager.using(db)
+        .filter(**{source: instance.pk})
+        .values_list(f'{target}_id', flat=True)
+    )
+    removed = current - wanted
+    added = wanted - current
+
+    def send(action, pk_set):
+        m2m_changed.send(
+            sender=through,
+            action=action,
+            instance=instance,
+            reverse=False,
+            model=field.related_model,
+            pk_set=pk_set,
+            using=db,
+        )
+
+    with transaction.atomic(using=db):
+        if removed:
+            send('pre_remove', removed)
+            through._default_manager.using(db).filter(**{
+                source: instance.pk,
+                f'{target}__in': removed,
+            }).delete()
+            send('post_remove', removed)
+        if added:
+            send('pre_add', added)
+            through._default_manager.using(db).bulk_create([
+                through(**{f'{source}_id': instance.pk, f'{target}_id': pk})
+                for pk in added
+            ])
+            send('post_add', added)
+    return added, removed
@@ -0,0 +1,84 @@
+import math
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+
+def has_non_finite(data):
+    """Whether `data` holds a NaN or infinite float"""
+    pending = [data]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            pending.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            pending.extend(value)
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson when it is installed.
+
+    The output is byte-identical to the DRF JSONRenderer. Indented output,
+    non-string keys and integers wider than 64 bits go through the stdlib
+    encoder, datetimes through the DRF encoder's default. The one known
+    difference is float exponent notation (1e16 instead of 1e+16), which
+    serializers never produce since decimals are rendered as strings.
+    orjson writes NaN and infinities as null, so output holding nulls is
+    checked for them and rendered by the DRF encoder, which rejects them
+    under STRICT_JSON.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None\
+                or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'null' in ret and has_non_finite(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same strict javascript subset escaping as the DRF renderer
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028')\
+                .replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class TextRenderer(BaseRenderer):
+    """Text bodies as they are, and the message of error responses"""
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict) and 'detail' in data:
+            data = data['detail']
+        return str(data).encode(self.charset)
+
+
+class MarkdownRenderer(TextRenderer):
+    media_type = 'text/markdown'
+    format = 'md'
+
+
+class HTMLRenderer(TextRenderer):
+    media_type = 'text/html'
+    format = 'html'
@@ -0,0 +1,139 @@
+"""
+HTML renderings of markdown bodies, rendered once per distinct body.
+
+Renderings are addressed by the hash of the body and the renderer version.
+Each process keeps the most recently used ones in memory; all of them are
+stored in the RenderedContent table shared by every node. A body missing
+from both is rendered under a lock on its hash, a PostgreSQL advisory lock
+held until the rendering is committed, so concurrent requests on any node
+wait for the first rendering instead of repeating it. The table is kept
+to RENDER_CACHE_MAX_ENTRIES rows by evicting the least recently used,
+in a job queued whenever a rendering is stored.
+"""
+import datetime
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core import markdown
+from core.models import RenderedContent
+from core.tasks import evict_rendered_content
+
+EVICT_JOB_KEY = 'rendered-content-evict'
+
+
+class LRUCache:
+    """Thread-safe mapping keeping its `max_size` most recently used keys"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+local_cache = LRUCache(settings.RENDER_CACHE_LOCAL_SIZE)
+_render_lock = threading.Lock()
+
+
+def content_hash(text):
+    digest = hashlib.sha256(f'{markdown.VERSION}:'.encode())
+    digest.update(text.encode())
+    return digest.hexdigest()
+
+
+@contextmanager
+def render_lock(key):
+    """Hold the rendering of `key` until the current transaction ends"""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_advisory_xact_lock(%s)',
+                [int(key[:15], 16)]
+            )
+        yield
+    else:
+        with _render_lock:
+            yield
+
+
+def _touch(key, used_at):
+    if timezone.now() - used_at > datetime.timedelta(
+            seconds=settings.RENDER_CACHE_TOUCH_INTERVAL):
+        RenderedContent.objects.filter(pk=key).update(used_at=timezone.now())
+
+
+def rendered(text):
+    """
+    (html, created) of the markdown `text`, rendering it if needed.
+
+    Storing a new rendering queues an eviction of the table.
+    """
+    key = content_hash(text)
+    html = local_cache.get(key)
+    if html is not None:
+        return html, False
+
+    created = False
+    row = RenderedContent.objects.filter(pk=key)\
+        .values_list('html', 'used_at').first()
+    if row is not None:
+        html = str(row[0])
+        _touch(key, row[1])
+    else:
+        with transaction.atomic(), render_lock(key):
+            html = RenderedContent.objects.filter(pk=key)\
+                .values_list('html', flat=True).first()
+            if html is None:
+                html = markdown.render(text)
+                RenderedContent.objects.create(content_hash=key, html=html)
+                evict_rendered_content.enqueue(key=EVICT_JOB_KEY)
+                created = True
+            html = str(html)
+    local_cache.set(key, html)
+    return html, created
+
+
+def render_html(text):
+    """HTML of the markdown `text`, rendered at most once"""
+    return rendered(text)[0]
+
+
+def evict(max_entries=None):
+    """Delete the least recently used renderings past `max_entries`"""
+    max_entries = max_entries or settings.RENDER_CACHE_MAX_ENTRIES
+    cutoff = RenderedContent.objects.order_by('-used_at', '-pk')\
+        .values_list('used_at', 'pk')[max_entries:max_entries + 1].first()
+    if cutoff is None:
+        return 0
+    used_at, pk = cutoff
+    deleted, _ = RenderedContent.objects.filter(
+        Q(used_at__lt=used_at) | Q(used_at=used_at, pk__lte=pk)
+    ).delete()
+    return deleted
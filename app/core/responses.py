@@ -0,0 +1,106 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.http import http_date
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """
+    File object limited to `length` bytes from its current position.
+
+    Django streams it in blocks, while WSGI servers with sendfile support
+    read `fileno()`, the current offset and the Content-Length header to
+    send the same bytes without copying them through Python.
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        return self.file.seek(offset, whence)
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    Return the (start, end) bytes of a single range Range header.
+
+    None means the whole file should be sent, ValueError that the range
+    cannot be satisfied. Multiple ranges are answered with the whole file.
+    """
+    match = RANGE_RE.match(header.replace(' ', '')) if header else None
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if not start:
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    if start > end or start >= size:
+        raise ValueError('Range not satisfiable')
+    return start, end
+
+
+def ranged_file_response(request, path, name, content_type=None):
+    """
+    Serve the file at `path` honouring a single range Range header.
+
+    With MEDIA_ACCEL_REDIRECT set the file, addressed by its storage
+    `name`, is handed to the front proxy through X-Accel-Redirect, which
+    then answers ranges itself.
+    """
+    content_type = content_type or \
+        mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    accel_prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT', None)
+    if accel_prefix:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + name
+        return response
+
+    file = open(path, 'rb')
+    stat = os.fstat(file.fileno())
+    size = stat.st_size
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size)
+    except ValueError:
+        file.close()
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    response = FileResponse(
+        FileRange(file, start, end - start + 1),
+        status=206 if byte_range else 200,
+        content_type=content_type,
+        filename=os.path.basename(name)
+    )
+    response['Content-Length'] = end - start + 1
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    return response
@@ -0,0 +1,232 @@
+import datetime
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.relations import ManyRelatedField
+from rest_framework.settings import api_settings
+
+from core.batch import SAFE_METHODS
+from core.compressed import CompressedTextField
+
+NESTED = object()
+# Converters calling a field's to_representation, which may read the
+# serializer context, and so are bound to the fields of each instance
+BIND = object()
+
+
+def _date_converter(field):
+    output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+    if output_format is None:
+        return None
+    if output_format.lower() == ISO_8601:
+        return datetime.date.isoformat
+    return field.to_representation
+
+
+def _converter(field):
+    """Cheapest callable giving the same output as field.to_representation"""
+    if isinstance(field, serializers.RelatedField):
+        if getattr(field, 'pk_field', None) is not None:
+            return field.pk_field.to_representation
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            return None
+    elif isinstance(field, serializers.UUIDField):
+        if field.uuid_format == 'hex_verbose':
+            return str
+    elif isinstance(field, serializers.CharField):
+        return None
+    elif isinstance(field, serializers.DateField):
+        return _date_converter(field)
+    elif isinstance(field, serializers.ReadOnlyField):
+        return None
+    elif isinstance(field, (serializers.SerializerMethodField,
+                            serializers.HiddenField)):
+        raise ImproperlyConfigured(
+            f'{type(field).__name__} cannot be read from QuerySet.values()'
+        )
+    return field.to_representation
+
+
+def _model_field(serializer, field):
+    model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+    if model is None or '.' in field.source:
+        return None
+    try:
+        return model._meta.get_field(field.source)
+    except FieldDoesNotExist:
+        return None
+
+
+class ValuesSerializer:
+    """
+    Read-only mode of a ModelSerializer built on QuerySet.values_list().
+
+    The readable fields of `serializer_class` are compiled once into
+    values() lookups and converters, so listing rows skips model
+    instantiation and per-field attribute lookups. Nested serializers and
+    primary key related fields (many=True included) are supported and the
+    output matches `serializer_class(queryset, many=True, context=context)
+    .data`.
+    """
+    _compiled = {}
+
+    def __init__(self, serializer_class, context=None):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        compiled = self._compiled.get(serializer_class)
+        if compiled is None:
+            compiled = self._compile()
+            self._compiled[serializer_class] = compiled
+        self.lookups, layout, self.many_fields, bound = compiled
+        if bound:
+            layout = self._bind(
+                layout, serializer_class(context=context or {})
+            )
+        self.layout = layout
+
+    @classmethod
+    def _bind(cls, layout, serializer):
+        """Layout calling the fields of the `serializer` instance"""
+        ret = []
+        for name, position, convert in layout:
+            if convert is NESTED:
+                position = cls._bind(position, serializer.fields[name])
+            elif convert is BIND:
+                convert = serializer.fields[name].to_representation
+            ret.append((name, position, convert))
+        return ret
+
+    def _compile(self):
+        lookups = ['pk']
+        many_fields = []
+        bound = False
+
+        def compile_fields(serializer, prefix):
+            nonlocal bound
+            layout = []
+            for name, field in serializer.fields.items():
+                if field.write_only:
+                    continue
+                if field.source == '*':
+                    raise ImproperlyConfigured(
+                        f"{name}: source='*' cannot be read from values()"
+                    )
+                lookup = prefix + field.source.replace('.', '__')
+                if isinstance(field, serializers.ListSerializer):
+                    raise ImproperlyConfigured(
+                        f'{name}: nested many=True serializers are not '
+                        f'supported'
+                    )
+                if isinstance(field, serializers.BaseSerializer):
+                    layout.append(
+                        (name, compile_fields(field, lookup + '__'), NESTED)
+                    )
+                elif isinstance(field, ManyRelatedField):
+                    if prefix:
+                        raise ImproperlyConfigured(
+                            f'{name}: nested many related fields are not '
+                            f'supported'
+                        )
+                    many_fields.append(
+                        (field.source, _converter(field.child_relation))
+                    )
+                    layout.append((name, field.source, ManyRelatedField))
+                else:
+                    lookups.append(lookup)
+                    convert = _converter(field)
+                    if isinstance(_model_field(serializer, field),
+                                  CompressedTextField):
+                        convert = str
+                    elif getattr(convert, '__self__', None) is field:
+                        convert = BIND
+                        bound = True
+                    layout.append((name, len(lookups) - 1, convert))
+            return layout
+
+        layout = compile_fields(self.serializer_class(), '')
+        return tuple(lookups), layout, many_fields, bound
+
+    def get_rows(self, queryset):
+        """Narrow a queryset of the model to the tuples the output needs"""
+        return queryset.values_list(*self.lookups)
+
+    def _fetch_many(self, rows):
+        """Load every many related field with one through-table query"""
+        pks = [row[0] for row in rows]
+        related = {}
+        for source, convert in self.many_fields:
+            model_field = self.model._meta.get_field(source)
+            through = model_field.remote_field.through
+            from_field = model_field.m2m_field_name()
+            to_field = model_field.m2m_reverse_field_name()
+            ordering = [
+                f'-{to_field}__{name[1:]}' if name.startswith('-')
+                else f'{to_field}__{name}'
+                for name in model_field.related_model._meta.ordering
+            ]
+            values = {}
+            pairs = through.objects.filter(**{f'{from_field}__in': pks})\
+                .order_by(*ordering)\
+                .values_list(f'{from_field}_id', f'{to_field}_id')
+            for pk, related_pk in pairs:
+                if convert is not None:
+                    related_pk = convert(related_pk)
+                values.setdefault(pk, []).append(related_pk)
+            related[source] = values
+        return related
+
+    def _build(self, layout, row, related):
+        ret = {}
+        for name, position, convert in layout:
+            if convert is NESTED:
+                ret[name] = self._build(position, row, related)
+            elif convert is ManyRelatedField:
+                ret[name] = related[position].get(row[0], [])
+            else:
+                value = row[position]
+                if value is not None and convert is not None:
+                    value = convert(value)
+                ret[name] = value
+        return ret
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        related = self._fetch_many(rows) if self.many_fields else {}
+        return [self._build(self.layout, row, related) for row in rows]
+
+    def serialize(self, queryset):
+        return self.to_representation(self.get_rows(queryset))
+
+
+class BatchItemSerializer(serializers.Serializer):
+    id = serializers.CharField(required=False, max_length=100)
+    method = serializers.ChoiceField(
+        choices=('GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE'),
+        default='GET'
+    )
+    url = serializers.RegexField(r'^/', max_length=2000)
+    body = serializers.JSONField(required=False)
+
+
+class BatchSerializer(serializers.Serializer):
+    """Sub-requests of a batch, reads only when run in parallel"""
+    requests = BatchItemSerializer(many=True, allow_empty=False)
+    parallel = serializers.BooleanField(default=False)
+
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                f'At most {settings.BATCH_MAX_REQUESTS} requests per batch'
+            )
+        return value
+
+    def validate(self, attrs):
+        if attrs['parallel'] and any(
+                item['method'] not in SAFE_METHODS
+                for item in attrs['requests']):
+            raise serializers.ValidationError(
+                'Only batches of reads can run in parallel'
+            )
+        return attrs
@@ -0,0 +1,69 @@
+"""
+Sizing and warm-up helpers for the production server.
+
+This module is imported by the gunicorn config before Django is set up,
+so it only depends on the standard library at import time.
+"""
+import gc
+import os
+
+CGROUP_MEMORY_LIMITS = (
+    '/sys/fs/cgroup/memory.max',
+    '/sys/fs/cgroup/memory/memory.limit_in_bytes',
+)
+
+
+def cpu_count():
+    """CPUs this process may run on, honouring affinity and cgroup quotas"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def memory_limit():
+    """Bytes of memory available to the container, or None if unknown"""
+    for path in CGROUP_MEMORY_LIMITS:
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        # cgroup v1 reports an unlimited group as a huge number
+        if value != 'max' and int(value) < 1 << 60:
+            return int(value)
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def worker_count(cpus, memory, worker_memory):
+    """2 * CPUs + 1 workers, as many as fit in memory and at least one"""
+    workers = cpus * 2 + 1
+    if memory:
+        workers = min(workers, memory // worker_memory)
+    return max(1, workers)
+
+
+def warm_up():
+    """
+    Import every view and serializer, then freeze the heap.
+
+    Run in the master after the app is preloaded, so the workers forked
+    from it share these pages copy-on-write instead of each loading them.
+    Freezing keeps the garbage collector from writing to the shared objects.
+    """
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+    gc.collect()
+    gc.freeze()
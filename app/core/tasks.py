@@ -0,0 +1,9 @@
+from core.jobs import task
+
+
+@task()
+def evict_rendered_content():
+    """Trim the rendering table to RENDER_CACHE_MAX_ENTRIES rows"""
+    from core.rendering import evict
+
+    evict()
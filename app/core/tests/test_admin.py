@@ -1,6 +1,12 @@
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from core.pagination import EstimatedCountPaginator, estimated_count
 from core.utils import HelperTest
+from university import models
 
 
 class AdminSiteTests(TestCase):
@@ -39,3 +45,63 @@ class AdminSiteTests(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        return len(queries)
+
+    def create_profiles(self, counts, course, subject):
+        for count in counts:
+            user = HelperTest.create_user(
+                email=f'profile{count}@email.com', password='password'
+            )
+            HelperTest.create_employee(
+                user=user,
+                salary='1000.00',
+                job=models.Job.objects.create(name=f'Job {count}')
+            )
+            models.Teacher.objects.create(user=user, salary='1000.00')
+            models.Student.objects.create(user=user, course=course)
+            models.Lesson.objects.create(
+                title=f'Lesson {count}', textual_content='Text',
+                subject=subject
+            )
+
+    def test_profile_changelists_constant_queries(self):
+        """Test that profile changelists do not query per row"""
+        course = models.Course.objects.create(name='Course')
+        subject = models.Subject.objects.create(name='Subject')
+        urls = [
+            reverse(f'admin:university_{name}_changelist')
+            for name in ('employee', 'teacher', 'student', 'lesson')
+        ]
+        self.create_profiles(range(1), course, subject)
+        queries = [self.changelist_queries(url) for url in urls]
+
+        self.create_profiles(range(1, 4), course, subject)
+        for url, expected in zip(urls, queries):
+            with self.subTest(url=url):
+                self.assertEqual(self.changelist_queries(url), expected)
+
+    def test_search_by_email(self):
+        """Test that users are searched by their exact email"""
+        url = reverse('admin:accounts_user_changelist')
+        res = self.client.get(url, {'q': 'TEST@gbmsolucoesweb.com'})
+
+        self.assertContains(res, self.user.name)
+        self.assertEqual(res.context['cl'].result_count, 1)
+
+    def test_estimated_count(self):
+        """Test that small or non PostgreSQL querysets are counted"""
+        queryset = models.Subject.objects.all()
+        models.Subject.objects.create(name='Subject')
+        self.assertEqual(estimated_count(queryset), 1)
+
+        with mock.patch(
+                'core.pagination.planner_estimate', return_value=50000):
+            self.assertEqual(estimated_count(queryset), 50000)
+            self.assertEqual(EstimatedCountPaginator(queryset, 10).count,
+                             50000)
+            self.assertEqual(estimated_count(queryset, threshold=10 ** 6), 1)
@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+
+from core.audit import AuditLog
+from core.models import AuditEntry
+
+
+def entries(count):
+    return [
+        AuditEntry(
+            model='university.employee',
+            object_id=str(number),
+            field='salary',
+            old_value='1000.00',
+            new_value='1100.00'
+        )
+        for number in range(count)
+    ]
+
+
+class AuditLogTests(TestCase):
+    """Tests for the buffered audit log writer"""
+    def setUp(self):
+        self.log = AuditLog()
+
+    def test_flush_in_batches(self):
+        """Test that buffered entries are written with bulk inserts"""
+        self.log.add(entries(5))
+
+        with override_settings(AUDIT_BATCH_SIZE=2), \
+                self.assertNumQueries(3):
+            self.assertEqual(self.log.flush(), 5)
+        self.assertEqual(len(self.log), 0)
+        self.assertEqual(AuditEntry.objects.count(), 5)
+
+    def test_flush_keeps_entries_on_error(self):
+        """Test that entries survive a failed write for the next flush"""
+        self.log.add(entries(2))
+
+        with mock.patch.object(
+                AuditEntry.objects, 'bulk_create', side_effect=DatabaseError):
+            with self.assertLogs('core.audit', 'ERROR'):
+                self.assertEqual(self.log.flush(), 0)
+        self.assertEqual(len(self.log), 2)
+        self.assertEqual(self.log.flush(), 2)
+
+    def test_flush_due(self):
+        """Test that requests only flush full or stale buffers"""
+        self.log.add(entries(2))
+
+        with override_settings(AUDIT_BATCH_SIZE=3, AUDIT_FLUSH_INTERVAL=60):
+            self.log.flush_due()
+            self.assertEqual(len(self.log), 2)
+        with override_settings(AUDIT_BATCH_SIZE=2):
+            self.log.flush_due()
+        self.assertEqual(len(self.log), 0)
+
+    def test_stop_flushes(self):
+        """Test that stopping the writer thread flushes the buffer"""
+        with mock.patch.object(self.log, 'flush') as flush:
+            self.log.start()
+            self.log.add(entries(1))
+            self.log.stop()
+
+        self.assertTrue(flush.called)
+        self.assertIsNone(self.log._thread)
@@ -0,0 +1,192 @@
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from university import models
+from core.utils import HelperTest
+
+BATCH_URL = reverse('batch')
+ME_URL = reverse('accounts:me')
+SIGNED_TOKEN_URL = reverse('accounts:signed_token')
+
+
+def watch_course_url(course_id):
+    return reverse('university:watch_course', kwargs={'pk': course_id})
+
+
+def lesson_content_url(lesson_id):
+    return reverse('university:lesson_content', kwargs={'pk': lesson_id})
+
+
+def watch_lesson_url(lesson_id):
+    return reverse('university:watch_lesson', kwargs={'pk': lesson_id})
+
+
+def create_student(email):
+    user = HelperTest.create_user(email=email, password='password')
+    subject = models.Subject.objects.create(name='Subject')
+    course = models.Course.objects.create(name='Course')
+    course.subjects.add(subject)
+    models.Student.objects.create(user=user, course=course)
+    lessons = [
+        models.Lesson.objects.create(
+            title=f'Lesson {number}',
+            textual_content='Content',
+            subject=subject
+        )
+        for number in range(3)
+    ]
+    return user, course, lessons
+
+
+class BatchAPITest(TestCase):
+    """Tests for running many API requests in one"""
+    def setUp(self):
+        self.client = APIClient()
+        self.user, self.course, self.lessons = \
+            create_student('student@email.com')
+        self.client.force_authenticate(self.user)
+
+    def startup_requests(self):
+        return [{'id': 'me', 'url': ME_URL},
+                {'id': 'course', 'url': watch_course_url(self.course.id)}] + [
+            {'id': str(lesson.id), 'url': watch_lesson_url(lesson.id)}
+            for lesson in self.lessons
+        ]
+
+    def test_batch_responses(self):
+        """Test that every sub-request is answered in order"""
+        res = self.client.post(
+            BATCH_URL, {'requests': self.startup_requests()}, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        responses = res.data['responses']
+        self.assertEqual(
+            [response['id'] for response in responses],
+            ['me', 'course'] + [str(lesson.id) for lesson in self.lessons]
+        )
+        self.assertTrue(all(
+            response['status'] == status.HTTP_200_OK for response in responses
+        ))
+        self.assertEqual(responses[0]['body']['email'], self.user.email)
+        self.assertEqual(responses[2]['body']['title'], 'Lesson 0')
+        self.assertEqual(
+            responses[2]['headers']['Content-Type'], 'application/json'
+        )
+
+    def test_groups_loaded_once(self):
+        """Test that permission checks share the groups of the user"""
+        requests = self.startup_requests()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(BATCH_URL, {'requests': requests}, format='json')
+
+        group_queries = [
+            query for query in queries.captured_queries
+            if 'auth_group' in query['sql']
+        ]
+        self.assertEqual(len(group_queries), 1)
+
+    def test_token_authenticates_batch(self):
+        """Test that sub-requests run as the user of the batch token"""
+        client = APIClient()
+        tokens = client.post(
+            SIGNED_TOKEN_URL,
+            {'email': 'student@email.com', 'password': 'password'}
+        ).data
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens["access"]}')
+
+        res = client.post(
+            BATCH_URL, {'requests': [{'url': ME_URL}]}, format='json'
+        )
+
+        self.assertEqual(res.data['responses'][0]['status'],
+                         status.HTTP_200_OK)
+        self.assertEqual(res.data['responses'][0]['body']['email'],
+                         self.user.email)
+
+    def test_encoded_batch(self):
+        """Test that sub-responses are not encoded for the batch client"""
+        res = self.client.post(BATCH_URL, {'requests': [
+            {'url': lesson_content_url(self.lessons[0].id)},
+        ]}, format='json', HTTP_ACCEPT_ENCODING='gzip')
+
+        response = res.data['responses'][0]
+        self.assertEqual(response['status'], status.HTTP_200_OK)
+        self.assertEqual(response['body'], 'Content')
+
+    def test_sub_request_errors(self):
+        """Test that failed sub-requests do not fail the batch"""
+        other_course = models.Course.objects.create(name='Other')
+        res = self.client.post(BATCH_URL, {'requests': [
+            {'url': '/api/unknown/'},
+            {'url': BATCH_URL},
+            {'url': watch_course_url(other_course.id)},
+            {'url': ME_URL},
+        ]}, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [response['status'] for response in res.data['responses']],
+            [404, 404, status.HTTP_403_FORBIDDEN, status.HTTP_200_OK]
+        )
+
+    def test_authentication_required(self):
+        """Test that batches need an authenticated user"""
+        res = APIClient().post(
+            BATCH_URL, {'requests': [{'url': ME_URL}]}, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_invalid_batches(self):
+        """Test that oversized batches and parallel writes are refused"""
+        too_many = {'requests': [{'url': ME_URL}] * 3}
+        parallel_write = {'parallel': True, 'requests': [
+            {'url': ME_URL},
+            {'method': 'PATCH', 'url': ME_URL, 'body': {'name': 'New'}},
+        ]}
+        relative = {'requests': [{'url': 'api/accounts/me/'}]}
+
+        for payload in (too_many, parallel_write, relative):
+            res = self.client.post(BATCH_URL, payload, format='json')
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_write_request(self):
+        """Test that sequential batches can write"""
+        res = self.client.post(BATCH_URL, {'requests': [
+            {'method': 'PATCH', 'url': ME_URL, 'body': {'name': 'New'}},
+            {'url': ME_URL},
+        ]}, format='json')
+
+        self.assertEqual(res.data['responses'][0]['status'],
+                         status.HTTP_200_OK)
+        self.assertEqual(res.data['responses'][1]['body']['name'], 'New')
+
+
+class ParallelBatchAPITest(TransactionTestCase):
+    """Tests for batches of reads run in parallel"""
+    def test_parallel_reads(self):
+        """Test that parallel reads return the sequential responses"""
+        user, course, lessons = create_student('student@email.com')
+        client = APIClient()
+        client.force_authenticate(user)
+        requests = [{'url': watch_course_url(course.id)}] + [
+            {'url': watch_lesson_url(lesson.id)} for lesson in lessons
+        ]
+
+        sequential = client.post(
+            BATCH_URL, {'requests': requests}, format='json'
+        )
+        parallel = client.post(
+            BATCH_URL, {'requests': requests, 'parallel': True}, format='json'
+        )
+
+        self.assertEqual(parallel.status_code, status.HTTP_200_OK)
+        self.assertEqual(parallel.data, sequential.data)
@@ -0,0 +1,63 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from core.coldstart import find_regressions, group_modules, parse_importtime
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       150 |        150 |     rest_framework.compat
+import time:      1200 |       1350 |   rest_framework.serializers
+import time:       300 |        300 |   university.images
+import time:        50 |       1700 | university.models
+"""
+
+
+class ColdStartTests(SimpleTestCase):
+    """Tests for the startup profile"""
+    def test_parse_importtime(self):
+        """Test that self and cumulative times are read in seconds"""
+        modules = parse_importtime(IMPORTTIME_OUTPUT)
+
+        self.assertEqual(len(modules), 4)
+        self.assertEqual(modules['university.models'], (0.00005, 0.0017))
+
+    def test_group_modules(self):
+        """Test that only modules of the given packages are kept"""
+        grouped = group_modules(
+            parse_importtime(IMPORTTIME_OUTPUT), ['university', 'rest']
+        )
+
+        self.assertEqual(
+            set(grouped), {'university.images', 'university.models'}
+        )
+        self.assertEqual(grouped['university.images'][0], 'university')
+
+    def test_find_regressions(self):
+        """Test that phases must exceed both tolerance and slack"""
+        baseline = {'phases': {'settings': 0.1, 'url_resolver': 0.1}}
+        report = {'phases': {'settings': 0.2, 'url_resolver': 0.115,
+                             'serializers': 1}}
+
+        self.assertEqual(
+            find_regressions(report, baseline, 0.1, 0.02),
+            [('settings', 0.1, 0.2)]
+        )
+
+    def test_profile_startup_command(self):
+        """Test that a fresh interpreter is profiled"""
+        out = StringIO()
+        call_command('profile_startup', repeat=1, json=True, stdout=out)
+        report = json.loads(out.getvalue())
+
+        self.assertEqual(
+            set(report['phases']),
+            {'settings', 'app_registry', 'url_resolver', 'serializers',
+             'total'}
+        )
+        self.assertIn('university.views', report['modules'])
+        self.assertIn(
+            'university.serializers.LessonSerializer', report['serializers']
+        )
@@ -0,0 +1,143 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from core.compressed import (
+    DEFLATE,
+    DEFLATE_DICTIONARY,
+    STORED,
+    CompressedText,
+    clear_dictionary_cache,
+    compress_text,
+    decompress_text,
+    train_dictionary,
+    train_field_dictionary,
+)
+from core.models import CompressionDictionary
+from core.serializers import ValuesSerializer
+from university import models
+from university.serializers import LessonSerializer
+
+BODY = 'In this lesson we study limits, derivatives and integrals. '
+
+
+def stored_value(lesson):
+    return models.Lesson.objects.values_list('textual_content', flat=True)\
+        .get(pk=lesson.pk)
+
+
+class CompressedTextTests(TestCase):
+    """Tests for compressed text storage"""
+    def setUp(self):
+        clear_dictionary_cache()
+        self.addCleanup(clear_dictionary_cache)
+        self.subject = models.Subject.objects.create(name='Subject')
+
+    def create_lesson(self, text):
+        return models.Lesson.objects.create(
+            title='Lesson', textual_content=text, subject=self.subject
+        )
+
+    def test_formats(self):
+        """Test that every stored format reads back the same text"""
+        dictionary = (1, BODY.encode())
+        short = compress_text('Hi')
+        plain = compress_text(BODY * 10)
+        trained = compress_text(BODY * 2, dictionary)
+
+        self.assertEqual(short[0], STORED)
+        self.assertEqual(plain[0], DEFLATE)
+        self.assertEqual(trained[0], DEFLATE_DICTIONARY)
+        self.assertLess(len(trained), len(compress_text(BODY * 2)))
+        self.assertEqual(decompress_text(short), 'Hi')
+        self.assertEqual(decompress_text(plain), BODY * 10)
+        self.assertEqual(
+            decompress_text(trained, {1: BODY.encode()}.get), BODY * 2
+        )
+
+    def test_train_dictionary(self):
+        """Test that a trained dictionary holds the common substrings"""
+        samples = [
+            f'{BODY} Exercise {number}: compute it.'.encode()
+            for number in range(20)
+        ]
+
+        dictionary = train_dictionary(samples, size=256)
+
+        self.assertLessEqual(len(dictionary), 256)
+        self.assertIn(b'derivatives', dictionary)
+        self.assertLess(
+            len(compress_text(samples[0].decode(), (1, dictionary))),
+            len(compress_text(samples[0].decode()))
+        )
+
+    def test_decompressed_on_access(self):
+        """Test that loaded values are only decompressed when read"""
+        lesson = self.create_lesson(BODY * 10)
+        self.assertLess(len(stored_value(lesson)), len(BODY * 10))
+
+        lesson = models.Lesson.objects.get(pk=lesson.pk)
+        self.assertIsInstance(lesson.__dict__['textual_content'],
+                              CompressedText)
+        self.assertEqual(lesson.textual_content, BODY * 10)
+        self.assertEqual(lesson.__dict__['textual_content'], BODY * 10)
+
+    def test_unread_value_saved_as_is(self):
+        """Test that saving a row without reading the text keeps its bytes"""
+        lesson = self.create_lesson(BODY * 10)
+        stored = stored_value(lesson)
+
+        lesson = models.Lesson.objects.get(pk=lesson.pk)
+        lesson.title = 'New title'
+        lesson.save(update_fields=['title', 'textual_content'])
+
+        self.assertEqual(stored_value(lesson), stored)
+        self.assertIsInstance(lesson.__dict__['textual_content'],
+                              CompressedText)
+
+    def test_values_serializer(self):
+        """Test that lists built on values() return the text"""
+        self.create_lesson(BODY)
+
+        rows = ValuesSerializer(LessonSerializer).serialize(
+            models.Lesson.objects.all()
+        )
+
+        self.assertEqual(rows[0]['textual_content'], BODY)
+
+    def test_trained_dictionary_used(self):
+        """Test that values written after training use the dictionary"""
+        for number in range(10):
+            self.create_lesson(f'{BODY} Lesson {number}.')
+
+        dictionary = train_field_dictionary(models.Lesson, 'textual_content')
+        lesson = self.create_lesson(f'{BODY} Lesson 10.')
+
+        self.assertEqual(dictionary.name, 'university.lesson')
+        self.assertEqual(stored_value(lesson)[0], DEFLATE_DICTIONARY)
+        clear_dictionary_cache()
+        self.assertEqual(
+            models.Lesson.objects.get(pk=lesson.pk).textual_content,
+            f'{BODY} Lesson 10.'
+        )
+
+    def test_train_command(self):
+        """Test that the command trains a dictionary and recompresses"""
+        lessons = [
+            self.create_lesson(f'{BODY} Lesson {number}.')
+            for number in range(10)
+        ]
+        out = StringIO()
+
+        call_command(
+            'train_dictionary', 'university.Lesson.textual_content',
+            recompress=True, stdout=out
+        )
+
+        self.assertEqual(CompressionDictionary.objects.count(), 1)
+        self.assertIn('Compressed 10 rows again', out.getvalue())
+        self.assertEqual(stored_value(lessons[0])[0], DEFLATE_DICTIONARY)
+        with self.assertRaises(CommandError):
+            call_command('train_dictionary', 'university.Lesson.title')
@@ -0,0 +1,21 @@
+from django.test import TestCase
+
+from core.compression import GZIP, accepted_encodings, negotiate
+
+
+class NegotiationTests(TestCase):
+    """Tests for Accept-Encoding negotiation"""
+    def test_accepted_encodings(self):
+        self.assertEqual(
+            accepted_encodings('gzip;q=0.5, br, *;q=0'),
+            {'gzip': 0.5, 'br': 1.0, '*': 0.0}
+        )
+
+    def test_negotiate(self):
+        self.assertEqual(negotiate('gzip, deflate', (GZIP,)), GZIP)
+        self.assertEqual(negotiate('br;q=0.5, gzip', ('br', GZIP)), GZIP)
+        self.assertEqual(negotiate('gzip, br', ('br', GZIP)), 'br')
+        self.assertEqual(negotiate('*', (GZIP,)), GZIP)
+        self.assertIsNone(negotiate('gzip;q=0', (GZIP,)))
+        self.assertIsNone(negotiate('deflate', (GZIP,)))
+        self.assertIsNone(negotiate(None, (GZIP,)))
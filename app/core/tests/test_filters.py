@@ -0,0 +1,49 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+from django.urls import get_resolver
+
+from core.filters import check_indexed, indexed_fields
+from university import models
+
+
+def list_views(patterns):
+    for pattern in patterns:
+        if hasattr(pattern, 'url_patterns'):
+            yield from list_views(pattern.url_patterns)
+            continue
+        view_class = getattr(pattern.callback, 'cls', None)
+        if getattr(view_class, 'filter_fields', None) or \
+                getattr(view_class, 'ordering_fields', None):
+            yield view_class
+
+
+class IndexedFiltersTests(SimpleTestCase):
+    """Tests for index-backed filter and ordering declarations"""
+    def test_indexed_fields(self):
+        """Test that only leading index columns count as indexed"""
+        fields = indexed_fields(models.Employee)
+
+        self.assertTrue({'id', 'job', 'hired_date', 'salary'} <= fields)
+        self.assertNotIn(
+            'textual_content', indexed_fields(models.Lesson)
+        )
+
+    def test_reject_unindexed_declarations(self):
+        """Test that unindexed filters and sort keys are refused"""
+        with self.assertRaises(ImproperlyConfigured):
+            check_indexed(models.Job, {}, ('name',))
+        with self.assertRaises(ImproperlyConfigured):
+            check_indexed(models.Lesson, {'text': 'textual_content'}, ())
+        check_indexed(models.Teacher, {'subject': 'subjects'}, ())
+
+    def test_list_views_index_backed(self):
+        """Test that every declared list filter and sort key is indexed"""
+        views = list(list_views(get_resolver().url_patterns))
+
+        self.assertGreaterEqual(len(views), 6)
+        for view_class in views:
+            check_indexed(
+                view_class.queryset.model,
+                getattr(view_class, 'filter_fields', {}),
+                getattr(view_class, 'ordering_fields', ())
+            )
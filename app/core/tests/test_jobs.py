@@ -0,0 +1,162 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.jobs import (
+    Worker,
+    claim,
+    enqueue,
+    execute_job,
+    requeue_stale,
+    task,
+)
+from core.models import Job
+
+calls = []
+
+
+@task(name='tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task(name='tests.stolen')
+def stolen():
+    """Run while the job is queued again and claimed by another worker"""
+    Job.objects.update(
+        locked_at=timezone.now() - datetime.timedelta(minutes=5)
+    )
+    requeue_stale(60)
+    claim('other', 10)
+
+
+@task(name='tests.fail', max_attempts=2, retry_delay=10)
+def fail():
+    raise RuntimeError('Job failed')
+
+
+class JobQueueTests(TestCase):
+    """Tests for the database job queue"""
+    def setUp(self):
+        calls.clear()
+
+    def run_worker(self):
+        return Worker(executor='inline').run(burst=True)
+
+    def test_run_queued_jobs(self):
+        """Test that queued jobs run once and are marked done"""
+        record.delay('a')
+        record.enqueue(('b',))
+
+        self.assertEqual(self.run_worker(), 2)
+        self.assertEqual(sorted(calls), ['a', 'b'])
+        self.assertFalse(Job.objects.exclude(status=Job.DONE).exists())
+        self.assertEqual(self.run_worker(), 0)
+
+    def test_scheduled_job(self):
+        """Test that jobs wait for their run_at"""
+        record.enqueue(
+            ('later',), run_at=timezone.now() + datetime.timedelta(hours=1)
+        )
+
+        self.assertEqual(self.run_worker(), 0)
+        self.assertEqual(calls, [])
+
+    def test_retry_then_fail(self):
+        """Test that failed jobs are retried with backoff, then failed"""
+        job = fail.delay()
+        with self.assertLogs('core.jobs', 'WARNING'):
+            self.run_worker()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('Job failed', job.last_error)
+        self.assertGreater(
+            job.run_at, timezone.now() + datetime.timedelta(seconds=5)
+        )
+
+        Job.objects.update(run_at=timezone.now())
+        with self.assertLogs('core.jobs', 'ERROR'):
+            self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_unknown_job(self):
+        """Test that jobs without a registered task fail"""
+        job = enqueue('tests.missing', max_attempts=1)
+        with self.assertLogs('core.jobs', 'ERROR'):
+            self.run_worker()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+
+    def test_job_key(self):
+        """Test that a key queues a single unfinished job"""
+        self.assertIsNotNone(record.enqueue(('a',), key='record'))
+        self.assertIsNone(record.enqueue(('a',), key='record'))
+        self.run_worker()
+        self.assertIsNotNone(record.enqueue(('a',), key='record'))
+
+    @override_settings(JOB_LOCK_TIMEOUT=60)
+    def test_claim_and_requeue_stale(self):
+        """Test that claimed jobs are skipped until their worker is stale"""
+        job = record.delay('a')
+        self.assertEqual(claim('worker', 10), [job.pk])
+        self.assertEqual(claim('worker', 10), [])
+
+        self.assertEqual(requeue_stale(60), 0)
+        Job.objects.update(
+            locked_at=timezone.now() - datetime.timedelta(minutes=5)
+        )
+        self.assertEqual(requeue_stale(60), 1)
+        self.assertEqual(claim('worker', 10), [job.pk])
+
+    def test_stale_job_out_of_attempts(self):
+        """Test that stale jobs without attempts left are failed"""
+        job = record.enqueue(('a',))
+        Job.objects.filter(pk=job.pk).update(max_attempts=1)
+        claim('worker', 10)
+        Job.objects.update(
+            locked_at=timezone.now() - datetime.timedelta(minutes=5)
+        )
+
+        self.assertEqual(requeue_stale(60), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(claim('worker', 10), [])
+
+    def test_stale_worker_keeps_newer_run(self):
+        """Test that a worker that lost its claim leaves the job alone"""
+        job = stolen.delay()
+        claim('worker', 10)
+
+        self.assertTrue(execute_job(job.pk))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.RUNNING)
+        self.assertEqual(job.locked_by, 'other')
+        self.assertEqual(job.attempts, 2)
+
+    def test_enqueue_key_constraint(self):
+        """Test that the database keeps one unfinished job per key"""
+        record.enqueue(('a',), key='record')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Job.objects.create(name='tests.record', key='record')
+        Job.objects.update(status=Job.DONE)
+        self.assertIsNotNone(record.enqueue(('a',), key='record'))
+
+    def test_runjobs_command(self):
+        """Test that the command processes the queue in burst mode"""
+        record.delay('a')
+        out = StringIO()
+        call_command('runjobs', executor='inline', burst=True, stdout=out)
+
+        self.assertEqual(calls, ['a'])
+        self.assertIn('Processed 1 jobs', out.getvalue())
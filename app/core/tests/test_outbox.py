@@ -0,0 +1,228 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import OutboxEvent, Webhook, WebhookDelivery
+from core.outbox import (
+    SIGNATURE_HEADER,
+    Dispatcher,
+    claim,
+    fan_out,
+    publish,
+    sign,
+)
+from core.utils import HelperTest
+from university import models
+
+
+class WebhookStandIn(ThreadingHTTPServer):
+    """Local HTTP server recording webhook requests"""
+
+    def __init__(self):
+        self.requests = []
+        self.statuses = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.release = threading.Event()
+        self.release.set()
+        super().__init__(('127.0.0.1', 0), WebhookHandler)
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/hook'
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        server.release.wait(5)
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        with server.lock:
+            server.requests.append((dict(self.headers), body))
+            status = server.statuses.pop(0) if server.statuses else 200
+            server.in_flight -= 1
+        self.send_response(status)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class OutboxTests(TestCase):
+    """Tests for outbox events and their webhook delivery"""
+    def setUp(self):
+        self.server = WebhookStandIn()
+        self.addCleanup(self.server.stop)
+        self.webhook = Webhook.objects.create(
+            url=self.server.url, secret='secret'
+        )
+        self.subject = models.Subject.objects.create(name='Subject')
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(self.executor.shutdown)
+
+    def events(self):
+        return [
+            event
+            for headers, body in self.server.requests
+            for event in json.loads(body)['events']
+        ]
+
+    def create_lessons(self, count):
+        return [
+            models.Lesson.objects.create(
+                title=f'Lesson {number}',
+                textual_content='Some Text',
+                subject=self.subject
+            )
+            for number in range(count)
+        ]
+
+    def test_domain_events_written(self):
+        """Test that hires, lessons and enrollments write outbox events"""
+        course = models.Course.objects.create(name='Course')
+        models.Student.objects.create(
+            user=HelperTest.create_user(email='student@email.com'),
+            course=course
+        )
+        HelperTest.create_employee(
+            user=HelperTest.create_user(email='employee@email.com'),
+            salary='1000.00',
+            job=models.Job.objects.create(name='Secretary')
+        )
+        self.create_lessons(1)
+
+        self.assertEqual(
+            sorted(OutboxEvent.objects.values_list('event_type', flat=True)),
+            ['employee.hired', 'lesson.published', 'student.enrolled']
+        )
+        event = OutboxEvent.objects.get(event_type='student.enrolled')
+        self.assertEqual(event.payload['course'], str(course.id))
+
+    def test_event_rolled_back_with_change(self):
+        """Test that events of rolled back changes are never written"""
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.create_lessons(1)
+            raise RuntimeError
+
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_batched_signed_delivery(self):
+        """Test that events are posted in signed batches"""
+        self.create_lessons(5)
+
+        sent = Dispatcher(concurrency=3, batch_size=2).run_once(self.executor)
+
+        self.assertEqual(sent, 5)
+        self.assertEqual(len(self.server.requests), 3)
+        headers, body = self.server.requests[0]
+        self.assertEqual(headers[SIGNATURE_HEADER], sign('secret', body))
+        self.assertEqual(
+            {event['type'] for event in self.events()}, {'lesson.published'}
+        )
+        self.assertEqual(
+            WebhookDelivery.objects.filter(
+                status=WebhookDelivery.DELIVERED
+            ).count(), 5
+        )
+
+    def test_concurrency_limit(self):
+        """Test that no more batches than the concurrency run at once"""
+        self.create_lessons(6)
+        self.server.release.clear()
+        threading.Timer(0.3, self.server.release.set).start()
+
+        Dispatcher(concurrency=2, batch_size=1).run_once(
+            ThreadPoolExecutor(max_workers=2)
+        )
+
+        self.assertEqual(self.server.max_in_flight, 2)
+
+    @override_settings(WEBHOOK_RETRY_DELAY=30, WEBHOOK_MAX_ATTEMPTS=2)
+    def test_retry_with_backoff(self):
+        """Test that failed batches are retried later, then given up"""
+        self.create_lessons(1)
+        self.server.statuses = [500, 500]
+        dispatcher = Dispatcher(concurrency=1, batch_size=10)
+
+        dispatcher.run_once(self.executor)
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual(delivery.status, WebhookDelivery.PENDING)
+        self.assertIn('500', delivery.last_error)
+        delay = (delivery.next_attempt_at - timezone.now()).total_seconds()
+        self.assertAlmostEqual(delay, 30, delta=5)
+
+        self.assertEqual(dispatcher.run_once(self.executor), 0)
+        WebhookDelivery.objects.update(next_attempt_at=timezone.now())
+        with self.assertLogs('core.outbox', 'ERROR'):
+            dispatcher.run_once(self.executor)
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.status, WebhookDelivery.FAILED)
+        self.assertEqual(delivery.attempts, 2)
+
+    def test_ordering_per_aggregate(self):
+        """Test that later events of an aggregate wait for earlier ones"""
+        lesson, other = self.create_lessons(2)
+        publish('lesson.updated', lesson, {'lesson': lesson.pk})
+        fan_out(10)
+
+        claimed = claim(10)
+        self.assertEqual(
+            [delivery.event.aggregate_id for delivery in claimed],
+            [str(lesson.id), str(other.id)]
+        )
+        self.assertEqual(claim(10), [])
+
+        WebhookDelivery.objects.filter(pk=claimed[0].pk).update(
+            status=WebhookDelivery.DELIVERED
+        )
+        self.assertEqual(
+            [delivery.event.event_type for delivery in claim(10)],
+            ['lesson.updated']
+        )
+
+    def test_ordering_across_fan_outs(self):
+        """Test that events fanned out early wait for earlier events"""
+        lesson = self.create_lessons(1)[0]
+        OutboxEvent.objects.update(dispatched=True)
+        first = publish('lesson.updated', lesson, {'lesson': lesson.pk})
+        second = publish('lesson.updated', lesson, {'lesson': lesson.pk})
+        # Another dispatcher fanned out the second event first
+        WebhookDelivery.objects.create(
+            webhook=self.webhook,
+            event=second,
+            aggregate=f'{second.aggregate_type}:{second.aggregate_id}'
+        )
+        OutboxEvent.objects.filter(pk=second.pk).update(dispatched=True)
+
+        self.assertEqual(claim(10), [])
+
+        fan_out(10)
+        self.assertEqual(
+            [delivery.event_id for delivery in claim(10)], [first.pk]
+        )
+
+    def test_subscribed_events_only(self):
+        """Test that webhooks only receive the event types they listen to"""
+        self.webhook.events = ['employee.hired']
+        self.webhook.save()
+        self.create_lessons(1)
+
+        Dispatcher(concurrency=1).run(burst=True)
+
+        self.assertEqual(self.server.requests, [])
+        self.assertTrue(OutboxEvent.objects.get().dispatched)
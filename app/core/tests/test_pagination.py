@@ -0,0 +1,102 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.pagination import cached_count, count_with_estimate
+from core.utils import HelperTest
+from university import models
+
+CREATE_SUBJECT_URL = reverse('university:create_subject')
+
+
+class EstimatedCountPaginationTests(TestCase):
+    """Tests for list pages with exact, estimated and cached counts"""
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            HelperTest.create_superuser('admin@email.com', 'password')
+        )
+        self.subjects = [
+            models.Subject.objects.create(name=f'Subject {count}')
+            for count in range(5)
+        ]
+
+    def test_unpaginated_without_page_size(self):
+        """Test that lists stay plain arrays unless a page is asked for"""
+        res = self.client.get(CREATE_SUBJECT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.json()), 5)
+
+    def test_exact_count_below_threshold(self):
+        """Test that small lists are paginated with an exact count"""
+        res = self.client.get(
+            CREATE_SUBJECT_URL, {'page_size': 2, 'ordering': 'name'}
+        )
+
+        data = res.json()
+        self.assertEqual(data['count'], 5)
+        self.assertFalse(data['count_is_approximate'])
+        self.assertEqual(
+            [row['name'] for row in data['results']],
+            ['Subject 0', 'Subject 1']
+        )
+        self.assertIsNotNone(data['next'])
+
+    def test_estimated_count_above_threshold(self):
+        """Test that planner estimates are flagged as approximate"""
+        with mock.patch(
+                'core.pagination.planner_estimate', return_value=2000000):
+            res = self.client.get(CREATE_SUBJECT_URL, {'page_size': 2})
+
+        data = res.json()
+        self.assertEqual(data['count'], 2000000)
+        self.assertTrue(data['count_is_approximate'])
+        self.assertEqual(len(data['results']), 2)
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=1)
+    def test_pages_past_underestimate(self):
+        """Test that pages past a low estimate are served and linked"""
+        with mock.patch('core.pagination.planner_estimate', return_value=2):
+            pages = [
+                self.client.get(
+                    CREATE_SUBJECT_URL, {'page_size': 2, 'page': page}
+                )
+                for page in (2, 3, 4)
+            ]
+
+        self.assertEqual(pages[0].status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(pages[0].json()['next'])
+        self.assertEqual(len(pages[1].json()['results']), 1)
+        self.assertIsNone(pages[1].json()['next'])
+        self.assertEqual(pages[2].status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(PAGINATION_COUNT_CACHE_TIMEOUT=60)
+    def test_cached_count(self):
+        """Test that counts are reused while the cache entry lives"""
+        self.client.get(CREATE_SUBJECT_URL, {'page_size': 2})
+        models.Subject.objects.create(name='Subject 5')
+
+        res = self.client.get(CREATE_SUBJECT_URL, {'page_size': 2})
+        self.assertEqual(res.json()['count'], 5)
+
+        cache.clear()
+        res = self.client.get(CREATE_SUBJECT_URL, {'page_size': 2})
+        self.assertEqual(res.json()['count'], 6)
+
+    def test_cached_count_per_query(self):
+        """Test that filtered querysets have their own cached counts"""
+        queryset = models.Subject.objects.all()
+        self.assertEqual(cached_count(queryset, 60), (5, False))
+
+        with self.assertNumQueries(0):
+            cached_count(queryset, 60)
+        filtered = queryset.filter(name='Subject 0')
+        self.assertEqual(cached_count(filtered, 60), (1, False))
+        self.assertEqual(count_with_estimate(filtered), (1, False))
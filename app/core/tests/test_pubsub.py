@@ -0,0 +1,41 @@
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+
+from core.pubsub import Broker, LocalTransport
+
+
+class BrokerTests(TestCase):
+    """Tests for the in-process fan-out of pub/sub messages"""
+    def setUp(self):
+        self.broker = Broker(LocalTransport())
+
+    @sync_to_async
+    def publish(self, channel, message):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.broker.publish(channel, message)
+
+    async def test_fan_out_to_channel_subscribers(self):
+        """Test that messages reach the subscribers of their channel only"""
+        first = self.broker.subscribe(['a', 'b'])
+        second = self.broker.subscribe(['b'])
+
+        await self.publish('a', {'n': 1})
+        await self.publish('b', {'n': 2})
+
+        self.assertEqual(await first.get(1), ('a', {'n': 1}))
+        self.assertEqual(await first.get(1), ('b', {'n': 2}))
+        self.assertEqual(await second.get(1), ('b', {'n': 2}))
+        self.assertIsNone(await second.get(0.05))
+
+        second.close()
+        self.assertEqual(set(self.broker.subscriptions['b']), {first})
+
+    async def test_overflow(self):
+        """Test that a subscriber falling too far behind is flagged"""
+        subscription = self.broker.subscribe(['a'], maxsize=1)
+
+        await self.publish('a', 1)
+        await self.publish('a', 2)
+        await subscription.get(1)
+
+        self.assertTrue(subscription.overflowed)
@@ -0,0 +1,81 @@
+import uuid
+
+from django.db import connection
+from django.db.models.signals import m2m_changed
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework import serializers
+
+from core.relations import BulkPrimaryKeyRelatedField, set_many_related
+from university import models
+
+
+class SubjectsSerializer(serializers.Serializer):
+    subjects = BulkPrimaryKeyRelatedField(
+        many=True,
+        queryset=models.Subject.objects.all()
+    )
+
+
+class BulkRelationsTests(TestCase):
+    """Tests for single query many related fields and diff updates"""
+    def setUp(self):
+        self.subjects = [
+            models.Subject.objects.create(name=f'Subject {count}')
+            for count in range(5)
+        ]
+        self.course = models.Course.objects.create(name='Test Course')
+
+    def test_resolve_pks_single_query(self):
+        """Test that all submitted pks are resolved with one query"""
+        ids = [str(subject.id) for subject in self.subjects]
+        serializer = SubjectsSerializer(data={'subjects': ids})
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.validated_data['subjects'], self.subjects)
+
+    def test_resolve_missing_pk(self):
+        """Test that an unknown pk is reported as not existing"""
+        missing = uuid.uuid4()
+        serializer = SubjectsSerializer(
+            data={'subjects': [str(self.subjects[0].id), str(missing)]}
+        )
+        self.assertFalse(serializer.is_valid())
+        self.assertIn(str(missing), str(serializer.errors['subjects']))
+
+    def test_resolve_invalid_pk(self):
+        """Test that a malformed pk is reported as an incorrect type"""
+        serializer = SubjectsSerializer(data={'subjects': ['not-a-uuid']})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('Incorrect type', str(serializer.errors['subjects']))
+
+    def test_set_many_related_diff(self):
+        """Test that only the difference is deleted and inserted"""
+        self.course.subjects.set(self.subjects[:3])
+        actions = []
+
+        def receiver(action, pk_set, **kwargs):
+            actions.append((action, pk_set))
+
+        m2m_changed.connect(receiver, sender=models.Course.subjects.through)
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                set_many_related(self.course, 'subjects', self.subjects[2:])
+        finally:
+            m2m_changed.disconnect(
+                receiver, sender=models.Course.subjects.through
+            )
+
+        through_queries = [
+            query['sql'].split(' ')[0] for query in queries.captured_queries
+            if 'university_course_subjects' in query['sql']
+        ]
+        self.assertEqual(through_queries, ['SELECT', 'DELETE', 'INSERT'])
+        self.assertEqual(
+            set(self.course.subjects.all()), set(self.subjects[2:])
+        )
+        removed = {subject.id for subject in self.subjects[:2]}
+        added = {subject.id for subject in self.subjects[3:]}
+        self.assertIn(('post_remove', removed), actions)
+        self.assertIn(('post_add', added), actions)
@@ -0,0 +1,103 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+
+class FastJSONRendererTests(TestCase):
+    """Tests for the orjson backed renderer and parser"""
+    def setUp(self):
+        self.payload = [{
+            'id': uuid.uuid4(),
+            'salary': Decimal('1200.50'),
+            'ratio': 0.25,
+            'hired_date': datetime.date(2022, 1, 20),
+            'created': datetime.datetime(
+                2022, 1, 20, 10, 30, 15, 123456, tzinfo=timezone.utc
+            ),
+            'name': 'João Conceição',
+            'separators': 'line\u2028paragraph\u2029end',
+            'nested': {'count': 3, 'empty': None, 'flags': [True, False]},
+        }]
+
+    def test_render_byte_identical(self):
+        """Test that the output matches the DRF JSONRenderer"""
+        self.assertEqual(
+            FastJSONRenderer().render(self.payload),
+            JSONRenderer().render(self.payload)
+        )
+
+    def test_render_indented_byte_identical(self):
+        """Test that indented output matches the DRF JSONRenderer"""
+        media_type = 'application/json; indent=4'
+        self.assertEqual(
+            FastJSONRenderer().render(self.payload, media_type),
+            JSONRenderer().render(self.payload, media_type)
+        )
+
+    def test_render_wide_integer(self):
+        """Test that integers wider than 64 bits fall back to the stdlib"""
+        payload = {'big': 2 ** 70}
+        self.assertEqual(
+            FastJSONRenderer().render(payload),
+            JSONRenderer().render(payload)
+        )
+
+    def test_render_non_finite_floats(self):
+        """Test that NaN and infinities are rejected like the DRF renderer"""
+        for value in (float('nan'), float('inf'), float('-inf')):
+            payload = {'values': [{'ratio': value}], 'empty': None}
+            with self.assertRaises(ValueError):
+                JSONRenderer().render(payload)
+            with self.assertRaises(ValueError):
+                FastJSONRenderer().render(payload)
+
+    def test_render_without_orjson(self):
+        """Test that the renderer works when orjson is not installed"""
+        with mock.patch('core.renderers.orjson', None):
+            self.assertEqual(
+                FastJSONRenderer().render(self.payload),
+                JSONRenderer().render(self.payload)
+            )
+
+    def test_parse_same_as_drf(self):
+        """Test that the parser returns the same data as the DRF parser"""
+        body = JSONRenderer().render(self.payload) + b' '
+        body = body.replace(b'"count":3', b'"count":123456789012345678901234')
+        self.assertEqual(
+            FastJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body))
+        )
+
+    def test_parse_wide_negative_integer(self):
+        """Test that 19 digit integers below int64 stay integers"""
+        body = b'{"low": -9999999999999999999, "high": 9999999999999999999}'
+        data = FastJSONParser().parse(io.BytesIO(body))
+
+        self.assertEqual(data, JSONParser().parse(io.BytesIO(body)))
+        self.assertEqual(data['low'], -9999999999999999999)
+        self.assertIsInstance(data['low'], int)
+
+    def test_parse_error(self):
+        """Test that invalid bodies raise the DRF parse error"""
+        parser = FastJSONParser()
+        with self.assertRaisesMessage(Exception, 'JSON parse error'):
+            parser.parse(io.BytesIO(b'{"name": NaN}'))
+
+    def test_benchmark_command(self):
+        """Test that the benchmark command compares the renderers"""
+        out = io.StringIO()
+        call_command('benchmark_json', rows=5, repeat=1, stdout=out)
+        self.assertIn('employee', out.getvalue())
+        self.assertIn('lesson', out.getvalue())
@@ -0,0 +1,132 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import markdown
+from core.jobs import Worker
+from core.models import Job, RenderedContent
+from core.rendering import (
+    LRUCache,
+    content_hash,
+    evict,
+    local_cache,
+    render_html,
+    rendered,
+)
+
+
+class MarkdownTests(TestCase):
+    """Tests for the lesson markdown renderer"""
+    def test_blocks(self):
+        html = markdown.render(
+            '# Title\n\nSome text\nmore text\n\n- one\n- two\n\n'
+            '2. second\n\n> quote\n\n```python\na < b\n```\n\n---'
+        )
+
+        self.assertEqual(html, '\n'.join([
+            '<h1>Title</h1>',
+            '<p>Some text\nmore text</p>',
+            '<ul>\n<li>one</li>\n<li>two</li>\n</ul>',
+            '<ol start="2">\n<li>second</li>\n</ol>',
+            '<blockquote>\n<p>quote</p>\n</blockquote>',
+            '<pre><code class="language-python">a &lt; b</code></pre>',
+            '<hr>',
+        ]))
+
+    def test_inline(self):
+        self.assertEqual(
+            markdown.inline(
+                '**bold** *em* snake_case `<b>` [site](https://a.org?x=1&y=2)'
+            ),
+            '<strong>bold</strong> <em>em</em> snake_case <code>&lt;b&gt;'
+            '</code> <a href="https://a.org?x=1&amp;y=2">site</a>'
+        )
+
+    def test_unsafe_markup_escaped(self):
+        html = markdown.render('<script>x</script> [a](javascript:x)')
+
+        self.assertEqual(html, '<p>&lt;script&gt;x&lt;/script&gt; a</p>')
+
+
+class RenderingTests(TestCase):
+    """Tests for the content-addressed HTML rendering cache"""
+    def setUp(self):
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+
+    def test_lru_cache(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(len(cache), 2)
+
+    def test_rendered_once(self):
+        """Test that a body is rendered once, then read from the caches"""
+        with mock.patch('core.markdown.render', return_value='<p>x</p>') \
+                as render:
+            self.assertEqual(rendered('x'), ('<p>x</p>', True))
+            self.assertEqual(rendered('x'), ('<p>x</p>', False))
+            local_cache.clear()
+            self.assertEqual(render_html('x'), '<p>x</p>')
+
+        render.assert_called_once_with('x')
+        self.assertEqual(
+            RenderedContent.objects.get().content_hash, content_hash('x')
+        )
+
+    def test_hash_covers_renderer_version(self):
+        """Test that renderer changes address new renderings"""
+        key = content_hash('x')
+        with mock.patch('core.markdown.VERSION', markdown.VERSION + 1):
+            self.assertNotEqual(content_hash('x'), key)
+
+    def test_evict_least_recently_used(self):
+        """Test that eviction keeps the most recently used renderings"""
+        now = timezone.now()
+        for age, text in enumerate(['new', 'old', 'older']):
+            render_html(text)
+            RenderedContent.objects.filter(pk=content_hash(text)).update(
+                used_at=now - datetime.timedelta(days=age)
+            )
+
+        self.assertEqual(evict(max_entries=1), 2)
+        self.assertEqual(
+            list(RenderedContent.objects.values_list('pk', flat=True)),
+            [content_hash('new')]
+        )
+        self.assertEqual(evict(max_entries=1), 0)
+
+    @override_settings(RENDER_CACHE_MAX_ENTRIES=1)
+    def test_evicted_after_render(self):
+        """Test that storing renderings queues one eviction of the table"""
+        render_html('old')
+        RenderedContent.objects.update(
+            used_at=timezone.now() - datetime.timedelta(days=1)
+        )
+        render_html('new')
+        self.assertEqual(Job.objects.count(), 1)
+
+        Worker(executor='inline').run(burst=True)
+
+        self.assertEqual(
+            list(RenderedContent.objects.values_list('pk', flat=True)),
+            [content_hash('new')]
+        )
+
+    def test_use_refreshed(self):
+        """Test that reads from the table refresh stale last-use times"""
+        render_html('x')
+        stale = timezone.now() - datetime.timedelta(days=2)
+        RenderedContent.objects.update(used_at=stale)
+        local_cache.clear()
+
+        render_html('x')
+
+        self.assertGreater(RenderedContent.objects.get().used_at, stale)
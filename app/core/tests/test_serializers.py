@@ -0,0 +1,91 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+
+from rest_framework import serializers
+
+from core.serializers import ValuesSerializer
+from core.utils import HelperTest
+from university import models
+from university.serializers import (
+    CourseSerializer,
+    EmployeeSerializer,
+    LessonSerializer,
+    StudentSerializer,
+    SubjectSerializer,
+    TeacherSerializer,
+)
+
+
+class ValuesSerializerTests(TestCase):
+    """Tests for the read-only values() serializer mode"""
+    def setUp(self):
+        HelperTest.create_multiples_employee(2)
+        self.subjects = [
+            models.Subject.objects.create(name='Subject 1'),
+            models.Subject.objects.create(name='Subject 2'),
+        ]
+        course = models.Course.objects.create(name='Test Course')
+        course.subjects.set(self.subjects)
+        models.Course.objects.create(name='Empty Course')
+        teacher = models.Teacher.objects.create(
+            user=HelperTest.create_user(
+                email='teacher@email.com',
+                password='password',
+                complement='Apartment 3'
+            ),
+            salary='3500.10'
+        )
+        teacher.subjects.set(self.subjects[:1])
+        models.Student.objects.create(
+            user=HelperTest.create_user(
+                email='student@email.com',
+                password='password'
+            ),
+            course=course
+        )
+        models.Lesson.objects.create(
+            title='Lesson',
+            textual_content='Some Text',
+            subject=self.subjects[0]
+        )
+
+    def assertSameRepresentation(self, serializer_class):
+        queryset = serializer_class.Meta.model.objects.order_by('pk')
+        expected = serializer_class(queryset, many=True).data
+        data = ValuesSerializer(serializer_class).serialize(queryset)
+        self.assertEqual(len(data), len(expected))
+        for item, expected_item in zip(data, expected):
+            if 'subjects' in item:
+                item['subjects'].sort()
+                expected_item['subjects'].sort()
+            self.assertEqual(item, dict(expected_item))
+
+    def test_same_representation(self):
+        """Test that the output matches the model serializers"""
+        for serializer_class in (
+                EmployeeSerializer,
+                TeacherSerializer,
+                StudentSerializer,
+                CourseSerializer,
+                LessonSerializer,
+                SubjectSerializer):
+            with self.subTest(serializer=serializer_class.__name__):
+                self.assertSameRepresentation(serializer_class)
+
+    def test_many_related_queries(self):
+        """Test that many related fields cost a single extra query"""
+        serializer = ValuesSerializer(CourseSerializer)
+        with self.assertNumQueries(2):
+            serializer.serialize(models.Course.objects.all())
+
+    def test_unsupported_field(self):
+        """Test that fields not backed by a column are rejected"""
+        class NamedSubjectSerializer(serializers.ModelSerializer):
+            label = serializers.SerializerMethodField()
+
+            class Meta:
+                model = models.Subject
+                fields = ('id', 'label')
+
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesSerializer(NamedSubjectSerializer)
@@ -0,0 +1,29 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core import serving
+
+MB = 1024 * 1024
+
+
+class ServingTests(SimpleTestCase):
+    """Tests for the production server sizing"""
+    def test_worker_count(self):
+        """Test that workers follow CPUs, bounded by memory"""
+        self.assertEqual(serving.worker_count(2, None, 160 * MB), 5)
+        self.assertEqual(serving.worker_count(4, 4096 * MB, 160 * MB), 9)
+        self.assertEqual(serving.worker_count(4, 512 * MB, 160 * MB), 3)
+        self.assertEqual(serving.worker_count(4, 64 * MB, 160 * MB), 1)
+
+    def test_cgroup_memory_limit(self):
+        """Test that the container memory limit is preferred"""
+        with mock.patch(
+                'builtins.open', mock.mock_open(read_data='536870912\n')):
+            self.assertEqual(serving.memory_limit(), 512 * MB)
+
+    def test_unlimited_cgroup(self):
+        """Test that unlimited groups fall back to the physical memory"""
+        with mock.patch('builtins.open', mock.mock_open(read_data='max')):
+            self.assertGreater(serving.memory_limit(), 0)
+        self.assertGreaterEqual(serving.cpu_count(), 1)
@@ -0,0 +1,43 @@
+from rest_framework import generics
+from rest_framework.response import Response
+
+from core.batch import run_batch
+from core.serializers import BatchSerializer, ValuesSerializer
+
+
+class ValuesListMixin:
+    """Serve list requests from QuerySet.values() rows of the queryset"""
+
+    def list(self, request, *args, **kwargs):
+        serializer = ValuesSerializer(
+            self.get_serializer_class(), self.get_serializer_context()
+        )
+        rows = serializer.get_rows(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                serializer.to_representation(page)
+            )
+        return Response(serializer.to_representation(rows))
+
+
+class BatchAPIView(generics.GenericAPIView):
+    """
+    Run a list of API requests as the authenticated user and return every
+    response at once, saving a round trip per request.
+    """
+    serializer_class = BatchSerializer
+    # Batches cannot contain batches
+    batchable = False
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({
+            'responses': run_batch(
+                request,
+                serializer.validated_data['requests'],
+                serializer.validated_data['parallel']
+            )
+        })
@@ -0,0 +1,35 @@
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from university import models
+from university.cache import STUDENT_ACCESS_CACHE_KEY
+
+StudentAccess = namedtuple('StudentAccess', ['courses', 'subjects'])
+
+
+def build_student_access(user_id):
+    """Courses a user is enrolled in and their subjects, in one query"""
+    courses, subjects = set(), set()
+    for course_id, subject_id in models.Student.courses.through.objects\
+            .filter(student__user_id=user_id)\
+            .values_list('course_id', 'course__subjects'):
+        courses.add(course_id)
+        if subject_id is not None:
+            subjects.add(subject_id)
+    return StudentAccess(frozenset(courses), frozenset(subjects))
+
+
+def get_student_access(user_id):
+    """
+    Cached StudentAccess of a user, rebuilt after enrollment changes.
+
+    Access checks are then set membership tests without a query.
+    """
+    key = STUDENT_ACCESS_CACHE_KEY % user_id
+    access = cache.get(key)
+    if access is None:
+        access = build_student_access(user_id)
+        cache.set(key, access, settings.STUDENT_ACCESS_TIMEOUT)
+    return access
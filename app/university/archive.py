@@ -0,0 +1,192 @@
+import datetime
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from rest_framework.authtoken.models import Token
+
+from accounts.models import ArchivedUser, RefreshToken
+from accounts.tokens import revoke_user_access_tokens
+from university import models
+
+
+class RestoreError(Exception):
+    pass
+
+
+def inactive_users(days=None):
+    """
+    Users to archive: deactivated ones, and students idle for `days`.
+
+    Staff, employees and teachers are never archived, nor users whose
+    email is already taken in the archive.
+    """
+    if days is None:
+        days = settings.ARCHIVE_INACTIVE_DAYS
+    cutoff = timezone.now() - datetime.timedelta(days=days)
+    idle_student = Q(last_login__lt=cutoff, student__isnull=False)
+    return get_user_model().objects\
+        .filter(Q(is_active=False) | idle_student)\
+        .exclude(Q(is_staff=True) | Q(is_superuser=True))\
+        .exclude(employee__isnull=False)\
+        .exclude(teacher__isnull=False)\
+        .exclude(email__in=ArchivedUser.objects.values('email'))\
+        .distinct()
+
+
+def _user_data(user):
+    return {
+        field.attname: field.value_from_object(user)
+        for field in user._meta.concrete_fields
+        if field.attname not in ('id', 'email')
+    }
+
+
+def _archive_batch(queryset, user_ids):
+    user_model = get_user_model()
+    locked = list(
+        user_model.objects.select_for_update()
+        .filter(pk__in=user_ids)
+        .values_list('pk', flat=True)
+    )
+    # Match the locked rows against `queryset` again: users who logged in
+    # since the batch was picked stay live. FOR UPDATE cannot take the
+    # DISTINCT of `queryset`, so this is a second query under the lock.
+    users = list(
+        queryset.filter(pk__in=locked)
+        .exclude(email__in=ArchivedUser.objects.values('email'))
+    )
+    user_ids = [user.pk for user in users]
+
+    groups, tokens, refresh_tokens = {}, {}, {}
+    for user_id, name in user_model.groups.through.objects\
+            .filter(user_id__in=user_ids)\
+            .values_list('user_id', 'group__name'):
+        groups.setdefault(user_id, []).append(name)
+    for user_id, key in Token.objects.filter(user_id__in=user_ids)\
+            .values_list('user_id', 'key'):
+        tokens[user_id] = key
+    for token in RefreshToken.objects.filter(
+            user_id__in=user_ids,
+            revoked_at__isnull=True,
+            expires_at__gt=timezone.now()
+            ).values('user_id', 'token_hash', 'created_at', 'expires_at'):
+        refresh_tokens.setdefault(token.pop('user_id'), []).append(token)
+
+    courses = {}
+    for student_id, course_id in models.Student.courses.through.objects\
+            .filter(student__user_id__in=user_ids)\
+            .values_list('student_id', 'course_id'):
+        courses.setdefault(student_id, []).append(str(course_id))
+    students = models.Student.objects.filter(user_id__in=user_ids)
+
+    ArchivedUser.objects.bulk_create([
+        ArchivedUser(
+            id=user.pk,
+            email=user.email,
+            data=_user_data(user),
+            groups=groups.get(user.pk, []),
+            auth_token=tokens.get(user.pk, ''),
+            refresh_tokens=refresh_tokens.get(user.pk, [])
+        )
+        for user in users
+    ])
+    models.ArchivedStudent.objects.bulk_create([
+        models.ArchivedStudent(
+            id=student_id,
+            user_id=user_id,
+            course_id=course_id,
+            courses=courses.get(student_id, [])
+        )
+        for student_id, user_id, course_id in
+        students.values_list('id', 'user_id', 'course_id')
+    ])
+    students.delete()
+    user_model.objects.filter(pk__in=user_ids).delete()
+    return user_ids
+
+
+def archive_users(queryset, batch_size=None):
+    """
+    Move the users of `queryset` to the archive tables.
+
+    Each batch of users, with their groups, tokens and student rows, is
+    copied and deleted in its own transaction so locks stay short. Users
+    whose email is already archived are skipped. Returns the number of
+    archived users.
+    """
+    if batch_size is None:
+        batch_size = settings.ARCHIVE_BATCH_SIZE
+    archived = 0
+    skipped = set()
+    while True:
+        picked = list(
+            queryset.exclude(pk__in=skipped)
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not picked:
+            return archived
+        with transaction.atomic():
+            user_ids = _archive_batch(queryset, picked)
+        skipped.update(set(picked) - set(user_ids))
+        for user_id in user_ids:
+            revoke_user_access_tokens(user_id)
+        archived += len(user_ids)
+
+
+@transaction.atomic
+def restore_user(user_id):
+    """Move an archived user and its student rows back to the live tables"""
+    archived = ArchivedUser.objects.select_for_update().get(pk=user_id)
+    user_model = get_user_model()
+    if user_model.objects.filter(email=archived.email).exists():
+        raise RestoreError(
+            f'Another user already uses the email {archived.email}'
+        )
+
+    students = list(archived.students.all())
+    course_ids = {str(course_id) for course_id in models.Course.objects
+                  .filter(pk__in={
+                      course_id
+                      for student in students
+                      for course_id in student.courses + [student.course_id]
+                  }).values_list('pk', flat=True)}
+    for student in students:
+        if str(student.course_id) not in course_ids:
+            raise RestoreError(
+                f'The course {student.course_id} of the student no longer '
+                f'exists'
+            )
+
+    user = user_model(id=archived.pk, email=archived.email)
+    for field in user_model._meta.concrete_fields:
+        if field.attname in archived.data:
+            setattr(user, field.attname,
+                    field.to_python(archived.data[field.attname]))
+    user.save(force_insert=True)
+    user.groups.set(Group.objects.filter(name__in=archived.groups))
+    if archived.auth_token:
+        Token.objects.create(user=user, key=archived.auth_token)
+    RefreshToken.objects.bulk_create([
+        RefreshToken(user=user, **token)
+        for token in archived.refresh_tokens
+        if RefreshToken._meta.get_field('expires_at')
+        .to_python(token['expires_at']) > timezone.now()
+    ])
+    for student in students:
+        restored = models.Student.objects.create(
+            id=student.id,
+            user=user,
+            course_id=student.course_id
+        )
+        restored.courses.add(*(
+            course_id for course_id in student.courses
+            if course_id in course_ids
+        ))
+
+    archived.delete()
+    return user
@@ -0,0 +1,87 @@
+from django.db import connection, transaction
+from django.db.models import DecimalField, F, Value
+from django.db.models.functions import Cast
+
+from core.audit import record_snapshots, snapshot
+from university.cache import invalidate_payroll_report
+
+
+def adjust_salaries(queryset, percentage=None, salary=None, dry_run=False,
+                    actor=None):
+    """
+    Set or raise the salary of every row with one UPDATE statement.
+
+    The audited fields of the rows are read before and after the update,
+    so audit entries hold the salaries the database computed.
+    """
+    if dry_run:
+        return queryset.count()
+
+    if salary is not None:
+        new_salary = Value(salary)
+    else:
+        salary_field = queryset.model._meta.get_field('salary')
+        new_salary = Cast(
+            F('salary') * Value(1 + percentage / 100),
+            output_field=DecimalField(
+                max_digits=salary_field.max_digits,
+                decimal_places=salary_field.decimal_places
+            )
+        )
+
+    with transaction.atomic():
+        before = snapshot(queryset.select_for_update())
+        count = queryset.update(salary=new_salary)
+        after = snapshot(queryset.model.objects.filter(pk__in=list(before)))
+        record_snapshots(queryset.model, before, after, actor, 'bulk')
+    invalidate_payroll_report()
+    return count
+
+
+def _delete(queryset):
+    """Delete the rows of `queryset` with one DELETE statement"""
+    model = queryset.model
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table} WHERE {column} IN ({sql})', params
+        )
+        return cursor.rowcount
+
+
+def bulk_delete(queryset, dry_run=False, actor=None):
+    """
+    Delete every row with one DELETE statement per table.
+
+    The rows are locked and their primary keys read first, so the many to
+    many rows and then the rows themselves are deleted by key, even when
+    the filter goes through a many to many relation. The deletes skip the
+    per-row collection and delete signals. Audit entries are written for
+    the rows found gone after the deletes.
+    """
+    if dry_run:
+        return queryset.count()
+
+    model = queryset.model
+    with transaction.atomic():
+        pks = list(
+            queryset.select_for_update().values_list('pk', flat=True)
+        )
+        locked = model.objects.filter(pk__in=pks)
+        before = snapshot(locked)
+        for field in model._meta.many_to_many:
+            _delete(field.remote_field.through.objects.filter(**{
+                f'{field.m2m_field_name()}__in': pks
+            }))
+        count = _delete(locked)
+        remaining = set(
+            model.objects.filter(pk__in=pks).values_list('pk', flat=True)
+        )
+        record_snapshots(model, {
+            pk: values for pk, values in before.items()
+            if pk not in remaining
+        }, {}, actor, 'bulk_delete')
+    invalidate_payroll_report()
+    return count
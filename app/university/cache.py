@@ -0,0 +1,38 @@
+import time
+
+from django.core.cache import cache
+
+PAYROLL_REPORT_CACHE_KEY = 'university:payroll_report:%s'
+PAYROLL_REPORT_GENERATION_KEY = 'university:payroll_report:generation'
+
+
+def _new_generation():
+    # Starting from the clock keeps a lost counter from reusing an old key
+    cache.add(PAYROLL_REPORT_GENERATION_KEY, time.time_ns(), None)
+    return cache.get(PAYROLL_REPORT_GENERATION_KEY)
+
+
+def payroll_report_cache_key():
+    """Key of the payroll report of the current generation"""
+    generation = cache.get(PAYROLL_REPORT_GENERATION_KEY)
+    if generation is None:
+        generation = _new_generation()
+    return PAYROLL_REPORT_CACHE_KEY % generation
+
+
+def invalidate_payroll_report():
+    """Start a new report generation so the next read rebuilds it"""
+    try:
+        cache.incr(PAYROLL_REPORT_GENERATION_KEY)
+    except ValueError:
+        _new_generation()
+
+
+STUDENT_ACCESS_CACHE_KEY = 'university:student_access:%s'
+
+
+def invalidate_student_access(user_ids):
+    """Drop the cached courses and subjects the given users can access"""
+    cache.delete_many(
+        [STUDENT_ACCESS_CACHE_KEY % user_id for user_id in user_ids]
+    )
@@ -0,0 +1,41 @@
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from core.renderers import FastJSONRenderer
+from university import models
+from university.serializers import CourseCatalogSerializer
+
+
+def build_course_catalog(course_id):
+    """Serialize a course tree with one prefetch for subjects and lessons"""
+    lessons = models.Lesson.objects.only('id', 'title', 'subject_id')\
+        .order_by('title')
+    subjects = models.Subject.objects.order_by('name')\
+        .prefetch_related(Prefetch('lesson_set', queryset=lessons))
+    course = models.Course.objects\
+        .prefetch_related(Prefetch('subjects', queryset=subjects))\
+        .get(pk=course_id)
+    data = CourseCatalogSerializer(course).data
+    return FastJSONRenderer().render(data).decode('utf-8')
+
+
+def get_course_catalog(course_id):
+    """Return the stored catalog JSON, regenerating it when stale"""
+    row = models.CourseCatalog.objects.filter(course_id=course_id)\
+        .values_list('content', 'version').first()
+    if row is None:
+        if not models.Course.objects.filter(pk=course_id).exists():
+            raise models.Course.DoesNotExist
+        # The row holds the version invalidations bump while building
+        catalog, created = models.CourseCatalog.objects.get_or_create(
+            course_id=course_id
+        )
+        content, version = catalog.content, catalog.version
+    else:
+        content, version = row
+    if content is None:
+        content = build_course_catalog(course_id)
+        models.CourseCatalog.objects.filter(
+            course_id=course_id, version=version
+        ).update(content=content, updated_at=timezone.now())
+    return content
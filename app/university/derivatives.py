@@ -0,0 +1,25 @@
+import hashlib
+
+
+def content_hash(file):
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def apply_derivatives(image_hash, variants):
+    """Attach rendered variants to every lesson with the same image"""
+    from university.models import Lesson
+
+    Lesson.objects.filter(featured_image_hash=image_hash)\
+        .update(featured_image_variants=variants)
+
+
+def best_fit(variants, width):
+    """Name of the smallest variant at least `width` wide, or the largest"""
+    if not variants:
+        return None
+    widths = sorted(int(key) for key in variants)
+    fit = next((w for w in widths if w >= width), widths[-1])
+    return variants[str(fit)]
@@ -0,0 +1,15 @@
+from core.pubsub import get_broker
+
+SUBJECT_CHANNEL = 'university:subject:%s'
+
+
+def publish_lesson_event(event_type, lesson):
+    """Tell the streams of the lesson subject once the change commits"""
+    get_broker().publish(SUBJECT_CHANNEL % lesson.subject_id, {
+        'event': event_type,
+        'data': {
+            'lesson': lesson.pk,
+            'subject': lesson.subject_id,
+            'title': lesson.title,
+        },
+    })
@@ -0,0 +1,53 @@
+"""
+Image derivative rendering.
+
+This module only depends on Pillow so it can run in worker processes
+that never set Django up.
+"""
+import os
+import tempfile
+
+from PIL import Image, ImageOps
+
+DERIVATIVES_DIR = 'public/images'
+
+
+def derivative_name(content_hash, width):
+    """Storage name of a derivative, addressed by the source content hash"""
+    return f'{DERIVATIVES_DIR}/{content_hash[:2]}/{content_hash}/{width}.webp'
+
+
+def target_widths(source_width, widths):
+    """Requested widths that do not upscale, or the source width itself"""
+    return [width for width in sorted(widths) if width < source_width] \
+        or [source_width]
+
+
+def render_derivatives(source_path, media_root, content_hash, widths,
+                       quality=80):
+    """
+    Write resized WebP copies of an image and return {width: name}.
+
+    Files that already exist are kept, and new ones are moved in place
+    atomically, so the same content is never rendered twice.
+    """
+    variants = {}
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'A' in image.getbands()
+                                  else 'RGB')
+        for width in target_widths(image.width, widths):
+            name = derivative_name(content_hash, width)
+            path = os.path.join(media_root, name)
+            variants[str(width)] = name
+            if os.path.exists(path):
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as output:
+                resized.save(output, 'WEBP', quality=quality)
+            os.replace(tmp_path, path)
+    return variants
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import ArchivedUser
+from university.archive import (
+    RestoreError,
+    archive_users,
+    inactive_users,
+    restore_user,
+)
+
+
+class Command(BaseCommand):
+    help = 'Move inactive users and their students to the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Days without login before a student is archived, '
+                 'ARCHIVE_INACTIVE_DAYS by default'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Users moved per transaction, ARCHIVE_BATCH_SIZE by default'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the users that would be archived'
+        )
+        parser.add_argument(
+            '--restore',
+            metavar='EMAIL',
+            help='Restore the archived user with this email instead'
+        )
+
+    def handle(self, *args, **options):
+        if options['restore']:
+            archived = ArchivedUser.objects.filter(
+                email=options['restore']
+            ).first()
+            if archived is None:
+                raise CommandError(
+                    f'No archived user with email {options["restore"]}'
+                )
+            try:
+                restore_user(archived.pk)
+            except RestoreError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f'Restored {archived.email}')
+            return
+
+        queryset = inactive_users(options['days'])
+        if options['dry_run']:
+            self.stdout.write(f'{queryset.count()} users would be archived')
+            return
+        count = archive_users(queryset, options['batch_size'])
+        self.stdout.write(f'Archived {count} users')
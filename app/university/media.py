@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+
+LESSON_MEDIA_SALT = 'university.media.lesson'
+
+
+def sign_lesson_media(lesson, field_name='pdf'):
+    """Short-lived download URL of a lesson file"""
+    token = signing.dumps(
+        {'l': str(lesson.pk), 'n': getattr(lesson, field_name).name},
+        salt=LESSON_MEDIA_SALT
+    )
+    return reverse('university:lesson_media', args=[token])
+
+
+def load_lesson_media(token):
+    """
+    Storage name of the file a signed URL grants, without a database hit.
+
+    Raises signing.BadSignature when the token was changed or expired.
+    """
+    payload = signing.loads(
+        token,
+        salt=LESSON_MEDIA_SALT,
+        max_age=settings.LESSON_MEDIA_URL_LIFETIME
+    )
+    return payload['n']
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-19 12:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('university', '0006_student'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseCatalog',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='university.course')),
+                ('content', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.25 on 2026-10-19 12:46
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('university', '0007_course_catalog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='pdf',
+            field=models.FileField(blank=True, upload_to='lessons/pdf/%Y/%m', validators=[django.core.validators.FileExtensionValidator(['pdf'])]),
+        ),
+    ]
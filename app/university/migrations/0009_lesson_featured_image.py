@@ -0,0 +1,28 @@
+# Generated by Django 3.2.25 on 2026-10-19 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('university', '0008_lesson_pdf'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='featured_image',
+            field=models.ImageField(blank=True, upload_to='images/%Y/%m'),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='featured_image_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='featured_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 3.2.25 on 2026-10-19 12:58
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('university', '0009_lesson_featured_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['hired_date', 'id'], name='university__hired_d_559be4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['subject', 'title'], name='university__subject_e9b78a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(django.db.models.functions.text.Upper('title'), name='university_lesson_title_upper'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['course', 'id'], name='university__course__d8d7a9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teacher',
+            index=models.Index(fields=['hired_date', 'id'], name='university__hired_d_f0d0f8_idx'),
+        ),
+    ]
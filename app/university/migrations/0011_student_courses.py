@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:00
+
+from django.db import migrations, models
+
+
+def enroll_in_main_course(apps, schema_editor):
+    Student = apps.get_model('university', 'Student')
+    Enrollment = Student.courses.through
+    Enrollment.objects.bulk_create([
+        Enrollment(student_id=student_id, course_id=course_id)
+        for student_id, course_id in
+        Student.objects.values_list('pk', 'course_id').iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('university', '0010_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='courses',
+            field=models.ManyToManyField(blank=True, related_name='enrolled_students', to='university.Course'),
+        ),
+        migrations.RunPython(enroll_in_main_course, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_archiveduser'),
+        ('university', '0012_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedStudent',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('course_id', models.UUIDField()),
+                ('courses', models.JSONField(default=list)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='students', to='accounts.archiveduser')),
+            ],
+        ),
+    ]
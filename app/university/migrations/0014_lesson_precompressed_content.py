@@ -0,0 +1,44 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:24
+
+from django.db import migrations, models
+
+from core.compression import BROTLI, GZIP, precompress
+
+
+def precompress_lessons(apps, schema_editor):
+    Lesson = apps.get_model('university', 'Lesson')
+    lessons = []
+    for lesson in Lesson.objects.only('id', 'textual_content').iterator():
+        variants = precompress(lesson.textual_content.encode())
+        lesson.textual_content_gzip = variants.get(GZIP, b'')
+        lesson.textual_content_br = variants.get(BROTLI, b'')
+        lessons.append(lesson)
+        if len(lessons) == 500:
+            Lesson.objects.bulk_update(
+                lessons, ['textual_content_gzip', 'textual_content_br']
+            )
+            lessons = []
+    Lesson.objects.bulk_update(
+        lessons, ['textual_content_gzip', 'textual_content_br']
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('university', '0013_archivedstudent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='textual_content_br',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='textual_content_gzip',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.RunPython(precompress_lessons, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 3.2.25 on 2026-10-19 13:28
+
+import core.compressed
+from django.db import migrations
+
+from core.compressed import (
+    CompressedText,
+    clear_dictionary_cache,
+    compress_text,
+    sample_values,
+    train_dictionary,
+)
+
+
+def compress_lessons(apps, schema_editor):
+    Lesson = apps.get_model('university', 'Lesson')
+    CompressionDictionary = apps.get_model('core', 'CompressionDictionary')
+    dictionary = None
+    data = train_dictionary(
+        sample_values(Lesson.objects.all(), 'textual_content')
+    )
+    if data:
+        dictionary = (
+            CompressionDictionary.objects.create(
+                name='university.lesson', data=data
+            ).pk,
+            data
+        )
+    clear_dictionary_cache()
+
+    lessons = []
+    for lesson in Lesson.objects.only('id', 'textual_content').iterator():
+        lesson.compressed_textual_content = CompressedText(
+            compress_text(lesson.textual_content, dictionary)
+        )
+        lessons.append(lesson)
+        if len(lessons) == 500:
+            Lesson.objects.bulk_update(
+                lessons, ['compressed_textual_content']
+            )
+            lessons = []
+    Lesson.objects.bulk_update(lessons, ['compressed_textual_content'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_compressiondictionary'),
+        ('university', '0014_lesson_precompressed_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='compressed_textual_content',
+            field=core.compressed.CompressedTextField(dictionary='university.lesson', null=True),
+        ),
+        migrations.RunPython(compress_lessons),
+        migrations.RemoveField(
+            model_name='lesson',
+            name='textual_content',
+        ),
+        migrations.RenameField(
+            model_name='lesson',
+            old_name='compressed_textual_content',
+            new_name='textual_content',
+        ),
+        migrations.AlterField(
+            model_name='lesson',
+            name='textual_content',
+            field=core.compressed.CompressedTextField(dictionary='university.lesson'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-19 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('university', '0015_compress_lesson_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coursecatalog',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='coursecatalog',
+            name='content',
+            field=models.TextField(null=True),
+        ),
+    ]
@@ -2,9 +2,29 @@ import uuid
 import datetime
 
 from django.db import models
+from django.db.models.functions import Upper
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
 from django.contrib.auth.models import Group
+from django.core.validators import FileExtensionValidator
+
+from core.compressed import CompressedText, CompressedTextField
+from core.compression import BROTLI, GZIP, precompress
+from core.outbox import publish
+from core.rendering import content_hash as rendering_hash
+from university.cache import (
+    invalidate_payroll_report,
+    invalidate_student_access,
+)
+from university.derivatives import content_hash
+from university.events import publish_lesson_event
+from university.tasks import render_lesson_content, render_lesson_image
 
 
 class Employee(models.Model):
@@ -25,6 +45,15 @@ class Employee(models.Model):
     salary = models.DecimalField(max_digits=10, decimal_places=2)
     job = models.ForeignKey('Job', on_delete=models.PROTECT)
 
+    audit_fields = ('salary',)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['hired_date', 'id']),
+            models.Index(fields=['job', 'hired_date', 'id']),
+            models.Index(fields=['salary', 'id']),
+        ]
+
     def __str__(self):
         return self.user.name
 
@@ -57,6 +86,14 @@ class Teacher(models.Model):
     salary = models.DecimalField(max_digits=10, decimal_places=2)
     subjects = models.ManyToManyField('Subject', blank=True)
 
+    audit_fields = ('salary',)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['hired_date', 'id']),
+            models.Index(fields=['salary', 'id']),
+        ]
+
     def __str__(self):
         return self.user.name
 
@@ -69,6 +106,9 @@ class Subject(models.Model):
         )
     name = models.CharField(max_length=255)
 
+    class Meta:
+        indexes = [models.Index(fields=['name', 'id'])]
+
     def __str__(self):
         return self.name
 
@@ -82,6 +122,9 @@ class Course(models.Model):
     name = models.CharField(max_length=255)
     subjects = models.ManyToManyField(Subject, blank=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['name', 'id'])]
+
     def __str__(self):
         return self.name
 
@@ -93,11 +136,41 @@ class Lesson(models.Model):
         editable=False
         )
     title = models.CharField(max_length=255)
-    textual_content = models.TextField()
+    textual_content = CompressedTextField(dictionary='university.lesson')
     video_url = models.URLField(blank=True)
     subject = models.ForeignKey(Subject, on_delete=models.CASCADE)
-    # pdf = models.FileField(blank=True)
-    # featured_image = models.ImageField(upload_to='images/%Y/%m')
+    pdf = models.FileField(
+        blank=True,
+        upload_to='lessons/pdf/%Y/%m',
+        validators=[FileExtensionValidator(['pdf'])]
+    )
+    featured_image = models.ImageField(blank=True, upload_to='images/%Y/%m')
+    featured_image_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        editable=False
+    )
+    featured_image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False
+    )
+    textual_content_gzip = models.BinaryField(default=b'', editable=False)
+    textual_content_br = models.BinaryField(default=b'', editable=False)
+
+    # textual_content compressed once per Content-Encoding on save
+    precompressed_fields = {
+        BROTLI: 'textual_content_br',
+        GZIP: 'textual_content_gzip',
+    }
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['subject', 'title']),
+            models.Index(fields=['title', 'id']),
+            models.Index(Upper('title'), name='university_lesson_title_upper'),
+        ]
 
     def __str__(self):
         return self.title
@@ -114,11 +187,67 @@ class Student(models.Model):
         on_delete=models.CASCADE
         )
     course = models.ForeignKey(Course, on_delete=models.PROTECT)
+    courses = models.ManyToManyField(
+        Course,
+        blank=True,
+        related_name='enrolled_students'
+    )
+
+    audit_fields = ('course',)
+
+    class Meta:
+        indexes = [models.Index(fields=['course', 'id'])]
 
     def __str__(self):
         return self.user.name
 
 
+class ArchivedStudent(models.Model):
+    """Student row of an archived user, restored together with it"""
+    id = models.UUIDField(primary_key=True, editable=False)
+    user = models.ForeignKey(
+        'accounts.ArchivedUser',
+        on_delete=models.CASCADE,
+        related_name='students'
+        )
+    course_id = models.UUIDField()
+    courses = models.JSONField(default=list)
+
+    def __str__(self):
+        return str(self.id)
+
+
+class CourseCatalog(models.Model):
+    """
+    Pre-serialized course -> subjects -> lessons tree of a course.
+
+    Invalidations clear `content` and bump `version`, so a tree built from
+    data read before an invalidation is not saved over it.
+    """
+    course = models.OneToOneField(
+        Course,
+        on_delete=models.CASCADE,
+        primary_key=True
+        )
+    content = models.TextField(null=True)
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.course.name
+
+
+def invalidate_course_catalogs(course_ids=None, subject_ids=None):
+    """Clear the stored catalogs of the given courses or subjects' courses"""
+    stale = {'content': None, 'version': models.F('version') + 1}
+    if course_ids:
+        CourseCatalog.objects.filter(course_id__in=course_ids).update(**stale)
+    if subject_ids:
+        CourseCatalog.objects.filter(
+            course__subjects__in=subject_ids
+        ).update(**stale)
+
+
 # Signals
 def add_employee_to_group(sender, instance, created, **kwargs):
     if created:
@@ -150,3 +279,231 @@ def add_student_to_group(sender, instance, created, **kwargs):
 post_save.connect(add_employee_to_group, sender=Employee)
 post_save.connect(add_teacher_to_group, sender=Teacher)
 post_save.connect(add_student_to_group, sender=Student)
+
+
+def invalidate_payroll_report_cache(sender, **kwargs):
+    invalidate_payroll_report()
+
+
+post_save.connect(invalidate_payroll_report_cache, sender=Employee)
+post_save.connect(invalidate_payroll_report_cache, sender=Teacher)
+post_save.connect(invalidate_payroll_report_cache, sender=Job)
+post_delete.connect(invalidate_payroll_report_cache, sender=Employee)
+post_delete.connect(invalidate_payroll_report_cache, sender=Teacher)
+post_delete.connect(invalidate_payroll_report_cache, sender=Job)
+
+
+def invalidate_course_catalog_on_course(sender, instance, **kwargs):
+    invalidate_course_catalogs(course_ids=[instance.pk])
+
+
+def invalidate_course_catalog_on_subject(sender, instance, **kwargs):
+    invalidate_course_catalogs(subject_ids=[instance.pk])
+
+
+def invalidate_course_catalog_on_course_subjects(
+        sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        invalidate_course_catalogs(course_ids=[instance.pk])
+    elif pk_set:
+        invalidate_course_catalogs(course_ids=pk_set)
+    else:
+        invalidate_course_catalogs(subject_ids=[instance.pk])
+
+
+def invalidate_course_catalog_on_lesson(sender, instance, **kwargs):
+    invalidate_course_catalogs(subject_ids=[instance.subject_id])
+
+
+def invalidate_course_catalog_on_lesson_move(sender, instance, **kwargs):
+    """Invalidate the courses of the subject a lesson is moved away from"""
+    if instance._state.adding:
+        return
+    previous_subject_ids = Lesson.objects.filter(pk=instance.pk)\
+        .exclude(subject_id=instance.subject_id)\
+        .values_list('subject_id', flat=True)
+    invalidate_course_catalogs(subject_ids=list(previous_subject_ids))
+
+
+post_save.connect(invalidate_course_catalog_on_course, sender=Course)
+post_save.connect(invalidate_course_catalog_on_subject, sender=Subject)
+pre_delete.connect(invalidate_course_catalog_on_subject, sender=Subject)
+m2m_changed.connect(
+    invalidate_course_catalog_on_course_subjects,
+    sender=Course.subjects.through
+)
+pre_save.connect(invalidate_course_catalog_on_lesson_move, sender=Lesson)
+post_save.connect(invalidate_course_catalog_on_lesson, sender=Lesson)
+post_delete.connect(invalidate_course_catalog_on_lesson, sender=Lesson)
+
+
+def delete_lesson_files(sender, instance, **kwargs):
+    if instance.pdf:
+        instance.pdf.delete(save=False)
+    if instance.featured_image:
+        instance.featured_image.delete(save=False)
+
+
+def hash_lesson_featured_image(sender, instance, **kwargs):
+    """Address a new featured image by content, reusing known variants"""
+    image = instance.featured_image
+    if not image:
+        instance.featured_image_hash = ''
+        instance.featured_image_variants = {}
+    elif not image._committed:
+        instance.featured_image_hash = content_hash(image)
+        instance.featured_image_variants = Lesson.objects.filter(
+            featured_image_hash=instance.featured_image_hash
+        ).exclude(featured_image_variants={})\
+            .values_list('featured_image_variants', flat=True)\
+            .first() or {}
+
+
+def render_lesson_featured_image(sender, instance, **kwargs):
+    image_hash = instance.featured_image_hash
+    if image_hash and not instance.featured_image_variants:
+        render_lesson_image.enqueue(
+            (image_hash, instance.featured_image.path),
+            key=f'lesson-image:{image_hash}'
+        )
+
+
+def precompress_lesson_content(sender, instance, update_fields, **kwargs):
+    if update_fields is not None and 'textual_content' not in update_fields:
+        return
+    # Content loaded and never read is unchanged, and so are its variants
+    if isinstance(instance.__dict__.get('textual_content'), CompressedText):
+        return
+    variants = precompress(instance.textual_content.encode())
+    for coding, field in Lesson.precompressed_fields.items():
+        setattr(instance, field, variants.get(coding, b''))
+
+
+def prerender_lesson_content(sender, instance, update_fields, **kwargs):
+    if update_fields is not None and 'textual_content' not in update_fields:
+        return
+    if isinstance(instance.__dict__.get('textual_content'), CompressedText):
+        return
+    render_lesson_content.enqueue(
+        (str(instance.pk),),
+        key=f'lesson-html:{rendering_hash(instance.textual_content)}'
+    )
+
+
+post_delete.connect(delete_lesson_files, sender=Lesson)
+pre_save.connect(hash_lesson_featured_image, sender=Lesson)
+pre_save.connect(precompress_lesson_content, sender=Lesson)
+post_save.connect(prerender_lesson_content, sender=Lesson)
+post_save.connect(render_lesson_featured_image, sender=Lesson)
+
+
+def enroll_student_in_course(sender, instance, **kwargs):
+    """Keep the main course of a student among its enrolled courses"""
+    instance.courses.add(instance.course_id)
+
+
+def invalidate_student_access_on_student(sender, instance, **kwargs):
+    invalidate_student_access([instance.user_id])
+
+
+def invalidate_student_access_on_enrollment(
+        sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        invalidate_student_access([instance.user_id])
+        return
+    students = Student.objects.all()
+    if action == 'pre_clear':
+        students = students.filter(courses=instance)
+    else:
+        students = students.filter(pk__in=pk_set)
+    invalidate_student_access(students.values_list('user_id', flat=True))
+
+
+def invalidate_student_access_on_course_subjects(
+        sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        course_ids = [instance.pk]
+    elif pk_set:
+        course_ids = pk_set
+    else:
+        course_ids = instance.course_set.values_list('pk', flat=True)
+    invalidate_student_access(
+        Student.courses.through.objects
+        .filter(course_id__in=list(course_ids))
+        .values_list('student__user_id', flat=True)
+    )
+
+
+post_save.connect(enroll_student_in_course, sender=Student)
+post_delete.connect(invalidate_student_access_on_student, sender=Student)
+m2m_changed.connect(
+    invalidate_student_access_on_enrollment,
+    sender=Student.courses.through
+)
+m2m_changed.connect(
+    invalidate_student_access_on_course_subjects,
+    sender=Course.subjects.through
+)
+
+
+# Outbox events, written in the transaction of the change
+def publish_employee_hired(sender, instance, created, **kwargs):
+    if created:
+        publish('employee.hired', instance, {
+            'employee': instance.pk,
+            'user': instance.user_id,
+            'job': instance.job_id,
+            'hired_date': instance.hired_date,
+        })
+
+
+def publish_lesson_published(sender, instance, created, **kwargs):
+    if created:
+        publish('lesson.published', instance, {
+            'lesson': instance.pk,
+            'subject': instance.subject_id,
+            'title': instance.title,
+        })
+
+
+def publish_student_enrolled(
+        sender, instance, action, reverse, pk_set, **kwargs):
+    if action != 'post_add' or not pk_set:
+        return
+    if reverse:
+        pairs = [
+            (student, instance.pk)
+            for student in Student.objects.filter(pk__in=pk_set)
+        ]
+    else:
+        pairs = [(instance, course_id) for course_id in pk_set]
+    for student, course_id in pairs:
+        publish('student.enrolled', student, {
+            'student': student.pk,
+            'user': student.user_id,
+            'course': course_id,
+        })
+
+
+post_save.connect(publish_employee_hired, sender=Employee)
+post_save.connect(publish_lesson_published, sender=Lesson)
+m2m_changed.connect(
+    publish_student_enrolled,
+    sender=Student.courses.through
+)
+
+
+# Lesson events pushed to the streams of students following the subject
+def stream_lesson_event(sender, instance, created, **kwargs):
+    publish_lesson_event(
+        'lesson.created' if created else 'lesson.updated', instance
+    )
+
+
+post_save.connect(stream_lesson_event, sender=Lesson)
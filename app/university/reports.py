@@ -0,0 +1,163 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Aggregate, Avg, Count, F, FloatField, Sum
+from django.db.models.functions import ExtractYear
+
+from university import models
+from university.cache import payroll_report_cache_key
+from university.serializers import PayrollReportSerializer
+
+PERCENTILES = (('median', 0.5), ('p90', 0.9))
+
+
+class PercentileCont(Aggregate):
+    """Postgres ordered-set aggregate percentile_cont"""
+    function = 'PERCENTILE_CONT'
+    name = 'PercentileCont'
+    output_field = FloatField()
+    template = (
+        '%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+    )
+
+    def __init__(self, expression, percentile, **extra):
+        super().__init__(expression, percentile=float(percentile), **extra)
+
+
+def _salary_aggregates():
+    aggregates = {
+        'headcount': Count('id'),
+        'total': Sum('salary'),
+        'mean': Avg('salary'),
+    }
+    if connection.vendor == 'postgresql':
+        for name, fraction in PERCENTILES:
+            aggregates[name] = PercentileCont('salary', fraction)
+    return aggregates
+
+
+def _interpolate(salaries, fraction):
+    """Same linear interpolation percentile_cont does on postgres"""
+    if not salaries:
+        return None
+    position = (len(salaries) - 1) * Decimal(str(fraction))
+    lower = int(position)
+    upper = min(lower + 1, len(salaries) - 1)
+    weight = position - lower
+    return salaries[lower] + (salaries[upper] - salaries[lower]) * weight
+
+
+def _add_percentiles(queryset, group_by, rows):
+    """Compute percentiles for backends without ordered-set aggregates"""
+    salaries = {}
+    ordered = queryset.values_list(*group_by, 'salary')\
+        .order_by(*group_by, 'salary')
+    for values in ordered:
+        salaries.setdefault(values[:-1], []).append(values[-1])
+
+    for row in rows:
+        group = salaries.get(tuple(row[field] for field in group_by), [])
+        for name, fraction in PERCENTILES:
+            row[name] = _interpolate(group, fraction)
+
+
+def _group(queryset, *group_by):
+    rows = list(
+        queryset.values(*group_by)
+        .annotate(**_salary_aggregates())
+        .order_by(*group_by)
+    )
+    if connection.vendor != 'postgresql':
+        _add_percentiles(queryset, group_by, rows)
+    return rows
+
+
+def _overall(queryset):
+    row = queryset.aggregate(**_salary_aggregates())
+    if connection.vendor != 'postgresql':
+        salaries = list(
+            queryset.order_by('salary').values_list('salary', flat=True)
+        )
+        for name, fraction in PERCENTILES:
+            row[name] = _interpolate(salaries, fraction)
+    return row
+
+
+def _union_percentiles(querysets):
+    """Percentiles of the salaries of every queryset taken together"""
+    if connection.vendor == 'postgresql':
+        subqueries = [
+            queryset.order_by().values('salary').query.sql_with_params()
+            for queryset in querysets
+        ]
+        columns = ', '.join(
+            f'PERCENTILE_CONT({fraction}) WITHIN GROUP (ORDER BY salary)'
+            for name, fraction in PERCENTILES
+        )
+        union = ' UNION ALL '.join(f'({sql})' for sql, params in subqueries)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT {columns} FROM ({union}) AS staff',
+                [param for sql, params in subqueries for param in params]
+            )
+            values = cursor.fetchone()
+        return dict(zip((name for name, fraction in PERCENTILES), values))
+
+    salaries = sorted(
+        salary for queryset in querysets
+        for salary in queryset.values_list('salary', flat=True)
+    )
+    return {
+        name: _interpolate(salaries, fraction)
+        for name, fraction in PERCENTILES
+    }
+
+
+def build_payroll_report():
+    """Aggregate salaries by staff type, job and hire-year cohort"""
+    staff_querysets = (
+        ('employees', models.Employee.objects.all()),
+        ('teachers', models.Teacher.objects.all()),
+    )
+
+    staff = []
+    hire_years = []
+    for name, queryset in staff_querysets:
+        staff.append({'staff': name, **_overall(queryset)})
+        cohorts = queryset.annotate(year=ExtractYear('hired_date'))
+        for row in _group(cohorts, 'year'):
+            hire_years.append({'staff': name, **row})
+
+    headcount = sum(row['headcount'] for row in staff)
+    total = sum(row.get('total') or 0 for row in staff)
+    staff.append({
+        'staff': 'all',
+        'headcount': headcount,
+        'total': total if headcount else None,
+        'mean': total / headcount if headcount else None,
+        **_union_percentiles(
+            [queryset for name, queryset in staff_querysets]
+        ),
+    })
+
+    jobs = _group(
+        models.Employee.objects.annotate(job_name=F('job__name')),
+        'job',
+        'job_name',
+    )
+
+    return {'staff': staff, 'jobs': jobs, 'hire_years': hire_years}
+
+
+def get_payroll_report():
+    """Return the serialized payroll report, building it on a cache miss"""
+    # Reports built while an invalidation lands are stored under the
+    # previous generation, which is never read again
+    key = payroll_report_cache_key()
+    report = cache.get(key)
+    if report is None:
+        report = PayrollReportSerializer(build_payroll_report()).data
+        cache.set(key, report, settings.PAYROLL_REPORT_TIMEOUT)
+    return report
@@ -1,13 +1,29 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import transaction
 
 from rest_framework import serializers
 
 from university import models
+from university.cache import invalidate_payroll_report
+from university.derivatives import best_fit
 
 from accounts.serializers import UserSerializer
+from core.audit import record_many_related, record_update
+from core.relations import BulkPrimaryKeyRelatedField, set_many_related
 
 
-class EmployeeSerializer(serializers.ModelSerializer):
+class AuditedSerializerMixin:
+    """Serializer whose updates are audited as done by the request user"""
+
+    @property
+    def actor(self):
+        return getattr(self.context.get('request'), 'user', None)
+
+
+class EmployeeSerializer(AuditedSerializerMixin,
+                         serializers.ModelSerializer):
     job = serializers.PrimaryKeyRelatedField(queryset=models.Job.objects.all())
     user = UserSerializer()
 
@@ -16,6 +32,7 @@ class EmployeeSerializer(serializers.ModelSerializer):
         fields = ('id', 'user', 'hired_date', 'salary', 'job')
         extra_kwargs = {'id': {'read_only': True}}
 
+    @transaction.atomic
     def create(self, validated_data):
         user_data = validated_data.pop('user')
         user = get_user_model().objects.create_user(**user_data)
@@ -38,13 +55,15 @@ class EmployeeSerializer(serializers.ModelSerializer):
         models.Employee.objects.filter(
             id=instance.id
         ).update(**validated_data)
+        record_update(instance, validated_data, self.actor, 'api')
+        invalidate_payroll_report()
 
         return instance
 
 
-class TeacherSerializer(serializers.ModelSerializer):
+class TeacherSerializer(AuditedSerializerMixin, serializers.ModelSerializer):
     user = UserSerializer()
-    subjects = serializers.PrimaryKeyRelatedField(
+    subjects = BulkPrimaryKeyRelatedField(
         many=True,
         queryset=models.Subject.objects.all()
     )
@@ -59,7 +78,7 @@ class TeacherSerializer(serializers.ModelSerializer):
         subjects = validated_data.pop('subjects')
         user = get_user_model().objects.create_user(**user_data)
         teacher = models.Teacher.objects.create(**validated_data, user=user)
-        teacher.subjects.set(subjects)
+        set_many_related(teacher, 'subjects', subjects)
         return teacher
 
     def update(self, instance, validated_data):
@@ -80,16 +99,17 @@ class TeacherSerializer(serializers.ModelSerializer):
         models.Teacher.objects.filter(
             id=instance.id
         ).update(**validated_data)
+        record_update(instance, validated_data, self.actor, 'api')
+        invalidate_payroll_report()
 
         if subjects:
-            instance.subjects.set(subjects)
-            instance.save()
+            set_many_related(instance, 'subjects', subjects)
 
         return instance
 
 
 class CourseSerializer(serializers.ModelSerializer):
-    subjects = serializers.PrimaryKeyRelatedField(
+    subjects = BulkPrimaryKeyRelatedField(
         many=True,
         queryset=models.Subject.objects.all()
     )
@@ -99,6 +119,20 @@ class CourseSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'subjects')
         extra_kwargs = {'id': {'read_only': True}}
 
+    def create(self, validated_data):
+        subjects = validated_data.pop('subjects', None)
+        course = models.Course.objects.create(**validated_data)
+        if subjects is not None:
+            set_many_related(course, 'subjects', subjects)
+        return course
+
+    def update(self, instance, validated_data):
+        subjects = validated_data.pop('subjects', None)
+        instance = super().update(instance, validated_data)
+        if subjects is not None:
+            set_many_related(instance, 'subjects', subjects)
+        return instance
+
 
 class SubjectFilteredPrimaryKeyRelatedField(
         serializers.PrimaryKeyRelatedField):
@@ -114,15 +148,40 @@ class SubjectFilteredPrimaryKeyRelatedField(
         return queryset
 
 
+class ImageVariantField(serializers.Field):
+    """URL of the image variant that best fits the `image_width` param"""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, variants):
+        width = settings.LESSON_IMAGE_DEFAULT_WIDTH
+        request = self.context.get('request')
+        if request is not None:
+            try:
+                width = int(request.query_params.get('image_width', width))
+            except ValueError:
+                pass
+        name = best_fit(variants, width)
+        return default_storage.url(name) if name else None
+
+
 class LessonSerializer(serializers.ModelSerializer):
     subject = SubjectFilteredPrimaryKeyRelatedField(
         queryset=models.Subject.objects.all()
     )
+    featured_image_url = ImageVariantField(source='featured_image_variants')
 
     class Meta:
         model = models.Lesson
-        fields = ('id', 'title', 'textual_content', 'video_url', 'subject')
-        extra_kwargs = {'id': {'read_only': True}}
+        fields = ('id', 'title', 'textual_content', 'video_url', 'subject',
+                  'pdf', 'featured_image', 'featured_image_url')
+        extra_kwargs = {
+            'id': {'read_only': True},
+            'pdf': {'write_only': True},
+            'featured_image': {'write_only': True},
+        }
 
     def validate(self, attrs):
         request = self.context.get('request', None)
@@ -139,24 +198,44 @@ class LessonSerializer(serializers.ModelSerializer):
                 )
         return super().validate(attrs)
 
+    @transaction.atomic
+    def create(self, validated_data):
+        # The lesson and its outbox event are committed together
+        return super().create(validated_data)
+
 
-class StudentSerializer(serializers.ModelSerializer):
+class StudentSerializer(AuditedSerializerMixin, serializers.ModelSerializer):
     user = UserSerializer()
     course = serializers.PrimaryKeyRelatedField(
         queryset=models.Course.objects.all()
     )
+    courses = BulkPrimaryKeyRelatedField(
+        many=True,
+        required=False,
+        queryset=models.Course.objects.all()
+    )
 
     class Meta:
         model = models.Student
-        fields = ('id', 'user', 'course')
+        fields = ('id', 'user', 'course', 'courses')
         extra_kwargs = {'id': {'read_only': True}}
 
+    @transaction.atomic
     def create(self, validated_data):
         user_data = validated_data.pop('user')
+        courses = validated_data.pop('courses', None)
         user = get_user_model().objects.create_user(**user_data)
         student = models.Student.objects.create(**validated_data, user=user)
+        if courses:
+            added, removed = set_many_related(
+                student, 'courses', set(courses) | {student.course}
+            )
+            record_many_related(
+                student, 'courses', added, removed, self.actor, 'api'
+            )
         return student
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         user_data = validated_data.pop('user', None)
         if user_data:
@@ -170,9 +249,24 @@ class StudentSerializer(serializers.ModelSerializer):
                 user.save()
             validated_data['user'] = user
 
+        courses = validated_data.pop('courses', None)
         models.Student.objects.filter(
             id=instance.id
         ).update(**validated_data)
+        record_update(instance, validated_data, self.actor, 'api')
+
+        # The main course is always one of the enrolled courses
+        course = validated_data.get('course')
+        if courses is None and course is not None \
+                and course.pk != instance.course_id:
+            courses = instance.courses.exclude(pk=instance.course_id)
+        if courses is not None:
+            added, removed = set_many_related(
+                instance, 'courses', set(courses) | {course or instance.course}
+            )
+            record_many_related(
+                instance, 'courses', added, removed, self.actor, 'api'
+            )
 
         return instance
 
@@ -182,3 +276,153 @@ class SubjectSerializer(serializers.ModelSerializer):
         model = models.Subject
         fields = ('id', 'name')
         extra_kwargs = {'id': {'read_only': True}}
+
+
+class PayrollFiguresSerializer(serializers.Serializer):
+    """Salary aggregates shared by every payroll report group"""
+    headcount = serializers.IntegerField()
+    total = serializers.DecimalField(
+        max_digits=14, decimal_places=2, allow_null=True
+    )
+    mean = serializers.DecimalField(
+        max_digits=14, decimal_places=2, allow_null=True
+    )
+    median = serializers.DecimalField(
+        max_digits=14, decimal_places=2, allow_null=True, default=None
+    )
+    p90 = serializers.DecimalField(
+        max_digits=14, decimal_places=2, allow_null=True, default=None
+    )
+
+
+class PayrollStaffSerializer(PayrollFiguresSerializer):
+    staff = serializers.CharField()
+
+
+class PayrollJobSerializer(PayrollFiguresSerializer):
+    job = serializers.UUIDField()
+    job_name = serializers.CharField()
+
+
+class PayrollHireYearSerializer(PayrollFiguresSerializer):
+    staff = serializers.CharField()
+    year = serializers.IntegerField()
+
+
+class PayrollReportSerializer(serializers.Serializer):
+    staff = PayrollStaffSerializer(many=True)
+    jobs = PayrollJobSerializer(many=True)
+    hire_years = PayrollHireYearSerializer(many=True)
+
+
+class CatalogLessonSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.Lesson
+        fields = ('id', 'title')
+
+
+class CatalogSubjectSerializer(serializers.ModelSerializer):
+    lessons = CatalogLessonSerializer(many=True, source='lesson_set')
+
+    class Meta:
+        model = models.Subject
+        fields = ('id', 'name', 'lessons')
+
+
+class CourseCatalogSerializer(serializers.ModelSerializer):
+    subjects = CatalogSubjectSerializer(many=True)
+
+    class Meta:
+        model = models.Course
+        fields = ('id', 'name', 'subjects')
+
+
+class BulkFilterSerializer(serializers.Serializer):
+    """Rows targeted by a bulk operation, at least one filter required"""
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        allow_empty=False
+    )
+    dry_run = serializers.BooleanField(default=False)
+
+    filter_fields = ('ids',)
+
+    def validate(self, attrs):
+        if not any(attrs.get(name) for name in self.filter_fields):
+            raise serializers.ValidationError(
+                'Provide at least one of: ' + ', '.join(self.filter_fields)
+            )
+        return attrs
+
+    def filter_queryset(self, queryset):
+        ids = self.validated_data.get('ids')
+        if ids:
+            queryset = queryset.filter(pk__in=ids)
+        return queryset
+
+
+class EmployeeBulkFilterSerializer(BulkFilterSerializer):
+    job = serializers.PrimaryKeyRelatedField(
+        queryset=models.Job.objects.all(),
+        required=False
+    )
+
+    filter_fields = ('ids', 'job')
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        job = self.validated_data.get('job')
+        if job:
+            queryset = queryset.filter(job=job)
+        return queryset
+
+
+class TeacherBulkFilterSerializer(BulkFilterSerializer):
+    subject = serializers.PrimaryKeyRelatedField(
+        queryset=models.Subject.objects.all(),
+        required=False
+    )
+
+    filter_fields = ('ids', 'subject')
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        subject = self.validated_data.get('subject')
+        if subject:
+            queryset = queryset.filter(subjects=subject)
+        return queryset
+
+
+class BulkSalarySerializer(serializers.Serializer):
+    """Either a new salary or a percentage raise, never both"""
+    salary = serializers.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        min_value=0,
+        required=False
+    )
+    percentage = serializers.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        min_value=-100,
+        required=False
+    )
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if ('salary' in attrs) == ('percentage' in attrs):
+            raise serializers.ValidationError(
+                'Provide either salary or percentage'
+            )
+        return attrs
+
+
+class EmployeeBulkSalarySerializer(
+        BulkSalarySerializer, EmployeeBulkFilterSerializer):
+    pass
+
+
+class TeacherBulkSalarySerializer(
+        BulkSalarySerializer, TeacherBulkFilterSerializer):
+    pass
@@ -0,0 +1,133 @@
+"""
+Server-sent event streams, served by the ASGI application.
+
+Django 3.2 cannot stream an async response, so the streams are plain ASGI
+applications: authentication and database reads run in the sync thread,
+then each connection waits on its pub/sub subscription without holding a
+thread or a database connection.
+"""
+import asyncio
+import io
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from core.pubsub import get_broker
+from university.access import get_student_access
+from university.events import SUBJECT_CHANNEL
+from university.permissions import Students
+
+
+def _authorize(scope):
+    """Subjects the caller of `scope` follows, or an error status"""
+    request = Request(
+        ASGIRequest(scope, io.BytesIO()),
+        authenticators=[
+            auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+        ]
+    )
+    try:
+        user = request.user
+    except exceptions.APIException as e:
+        return e.status_code, None
+    if not user.is_authenticated:
+        return 401, None
+    if not Students().has_permission(request, None):
+        return 403, None
+    return 200, get_student_access(user.pk).subjects
+
+
+async def _send_status(send, code):
+    await send({
+        'type': 'http.response.start',
+        'status': code,
+        'headers': [(b'content-type', b'text/plain; charset=utf-8')],
+    })
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def _wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+def event_frame(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'.encode()
+
+
+async def lesson_events(scope, receive, send):
+    """
+    Stream lesson.created and lesson.updated events of the subjects of the
+    caller's courses, in place of polling for new lessons.
+    """
+    if scope['method'] != 'GET':
+        return await _send_status(send, 405)
+    code, subjects = await sync_to_async(_authorize)(scope)
+    if code != 200:
+        return await _send_status(send, code)
+
+    subscription = get_broker().subscribe(
+        SUBJECT_CHANNEL % subject for subject in subjects
+    )
+    closed = asyncio.ensure_future(_wait_disconnect(receive))
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.SSE_MAX_AGE
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': f'retry: {settings.SSE_RETRY}\n\n'.encode(),
+            'more_body': True,
+        })
+        while not subscription.overflowed:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            message = asyncio.ensure_future(subscription.get())
+            done, _ = await asyncio.wait(
+                {message, closed},
+                timeout=min(settings.SSE_HEARTBEAT, remaining),
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if closed in done:
+                message.cancel()
+                return
+            if message in done:
+                channel, body = message.result()
+                frame = event_frame(body['event'], body['data'])
+            else:
+                message.cancel()
+                if loop.time() >= deadline:
+                    break
+                frame = b': heartbeat\n\n'
+            await send({
+                'type': 'http.response.body',
+                'body': frame,
+                'more_body': True,
+            })
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        closed.cancel()
+        subscription.close()
+
+
+def lesson_events_unavailable(request):
+    """Answer of the WSGI application, which cannot hold streams open"""
+    return JsonResponse(
+        {'detail': 'Lesson events are served by the ASGI application.'},
+        status=501
+    )
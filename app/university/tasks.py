@@ -0,0 +1,30 @@
+from django.conf import settings
+
+from core.jobs import task
+from core.rendering import rendered
+from university.derivatives import apply_derivatives
+from university.images import render_derivatives
+
+
+@task()
+def render_lesson_image(image_hash, source_path):
+    """Render the derivatives of a lesson featured image"""
+    variants = render_derivatives(
+        source_path,
+        str(settings.MEDIA_ROOT),
+        image_hash,
+        settings.LESSON_IMAGE_WIDTHS,
+        settings.LESSON_IMAGE_QUALITY
+    )
+    apply_derivatives(image_hash, variants)
+
+
+@task()
+def render_lesson_content(lesson_id):
+    """Render the HTML of a lesson content ahead of its first read"""
+    from university.models import Lesson
+
+    text = Lesson.objects.filter(pk=lesson_id)\
+        .values_list('textual_content', flat=True).first()
+    if text is not None:
+        rendered(str(text))
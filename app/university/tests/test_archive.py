@@ -0,0 +1,237 @@
+import datetime
+import uuid
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from accounts.models import ArchivedUser
+from accounts.tokens import issue_token_pair
+from core.utils import HelperTest
+from university import archive, models
+from university.archive import archive_users, inactive_users, restore_user
+
+TOKEN_URL = reverse('accounts:token')
+SIGNED_TOKEN_REFRESH_URL = reverse('accounts:signed_token_refresh')
+ME_URL = reverse('accounts:me')
+
+
+def restore_url(user_id):
+    return reverse('university:restore_user', kwargs={'pk': user_id})
+
+
+class ArchiveTests(TestCase):
+    """Tests for moving inactive students to the archive tables"""
+    def setUp(self):
+        self.client = APIClient()
+        self.courses = [
+            models.Course.objects.create(name=f'Course {count}')
+            for count in range(2)
+        ]
+        long_ago = timezone.now() - datetime.timedelta(days=400)
+        self.students = []
+        for count in range(3):
+            user = HelperTest.create_user(
+                name=f'Student {count}',
+                email=f'student{count}@email.com',
+                password='password'
+            )
+            user.last_login = long_ago
+            user.save()
+            self.students.append(models.Student.objects.create(
+                user=user, course=self.courses[0]
+            ))
+        self.students[0].courses.add(self.courses[1])
+        self.user = self.students[0].user
+        self.token = Token.objects.create(user=self.user)
+        self.refresh = issue_token_pair(self.user)['refresh']
+
+        self.active = HelperTest.create_user(
+            email='active@email.com', password='password'
+        )
+        self.active.last_login = timezone.now()
+        self.active.save()
+        models.Student.objects.create(
+            user=self.active, course=self.courses[0]
+        )
+
+    def test_inactive_users(self):
+        """Test that only idle students and deactivated users are picked"""
+        HelperTest.create_superuser('admin@email.com', 'password')
+        deactivated = HelperTest.create_user(
+            email='gone@email.com', password='password', is_active=False
+        )
+
+        self.assertEqual(
+            set(inactive_users()),
+            {student.user for student in self.students} | {deactivated}
+        )
+
+    def test_token_login_is_activity(self):
+        """Test that students logging in through the API stay live"""
+        res = self.client.post(
+            TOKEN_URL, {'email': self.user.email, 'password': 'password'}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        archive_users(inactive_users())
+
+        self.assertTrue(
+            get_user_model().objects.filter(pk=self.user.pk).exists()
+        )
+        self.assertFalse(ArchivedUser.objects.filter(pk=self.user.pk).exists())
+
+    def test_token_requests_are_activity(self):
+        """Test that requests with a token or a refresh count as activity"""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.client.get(ME_URL)
+        APIClient().post(SIGNED_TOKEN_REFRESH_URL, {'refresh': self.refresh})
+        last_login = get_user_model().objects.get(pk=self.user.pk).last_login
+
+        self.client.get(ME_URL)
+
+        self.assertGreater(
+            last_login, timezone.now() - datetime.timedelta(minutes=1)
+        )
+        self.assertEqual(
+            get_user_model().objects.get(pk=self.user.pk).last_login,
+            last_login
+        )
+        self.assertEqual(
+            set(inactive_users()),
+            {student.user for student in self.students[1:]}
+        )
+
+    def test_archive_in_batches(self):
+        """Test that users, tokens, groups and students are moved"""
+        count = archive_users(inactive_users(), batch_size=2)
+
+        self.assertEqual(count, 3)
+        self.assertFalse(get_user_model().objects.filter(
+            email__startswith='student'
+        ).exists())
+        self.assertFalse(Token.objects.filter(key=self.token.key).exists())
+        self.assertEqual(models.Student.objects.count(), 1)
+
+        archived = ArchivedUser.objects.get(pk=self.user.pk)
+        self.assertEqual(archived.groups, ['Students'])
+        self.assertEqual(archived.auth_token, self.token.key)
+        self.assertEqual(len(archived.refresh_tokens), 1)
+        student = archived.students.get()
+        self.assertEqual(student.id, self.students[0].id)
+        self.assertEqual(
+            set(student.courses),
+            {str(course.id) for course in self.courses}
+        )
+
+    def test_login_before_lock_is_activity(self):
+        """Test that students logging in while picked stay live"""
+        archive_batch = archive._archive_batch
+
+        def login_then_archive(queryset, user_ids):
+            get_user_model().objects.filter(pk=self.user.pk)\
+                .update(last_login=timezone.now())
+            return archive_batch(queryset, user_ids)
+
+        with mock.patch('university.archive._archive_batch',
+                        side_effect=login_then_archive):
+            count = archive_users(inactive_users())
+
+        self.assertEqual(count, 2)
+        self.assertTrue(
+            get_user_model().objects.filter(pk=self.user.pk).exists()
+        )
+
+    def test_archived_email_skipped(self):
+        """Test that users whose email is already archived stay live"""
+        user = self.students[1].user
+        ArchivedUser.objects.create(id=uuid.uuid4(), email=user.email, data={})
+        students = get_user_model().objects.filter(email__startswith='student')
+
+        self.assertEqual(archive_users(students, batch_size=1), 2)
+        self.assertEqual(list(students), [user])
+        self.assertNotIn(user, inactive_users())
+
+    def test_restore_user(self):
+        """Test that a restored user gets its rows back as they were"""
+        archive_users(inactive_users())
+
+        user = restore_user(self.user.pk)
+
+        self.assertTrue(user.check_password('password'))
+        self.assertEqual(user.name, 'Student 0')
+        self.assertEqual(
+            list(user.groups.values_list('name', flat=True)), ['Students']
+        )
+        self.assertEqual(Token.objects.get(user=user).key, self.token.key)
+        student = models.Student.objects.get(user=user)
+        self.assertEqual(student.id, self.students[0].id)
+        self.assertEqual(set(student.courses.all()), set(self.courses))
+        self.assertFalse(ArchivedUser.objects.filter(pk=user.pk).exists())
+
+        res = self.client.post(
+            SIGNED_TOKEN_REFRESH_URL, {'refresh': self.refresh}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_archived_login_error(self):
+        """Test that archived users are told why they cannot log in"""
+        archive_users(inactive_users())
+
+        res = self.client.post(
+            TOKEN_URL, {'email': self.user.email, 'password': 'password'}
+        )
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res.json()['detail'].split('.')[0],
+                         'This account is archived')
+
+        res = self.client.post(
+            TOKEN_URL, {'email': self.user.email, 'password': 'wrong'}
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_archived_token_error(self):
+        """Test that the token of an archived user reports the archive"""
+        archive_users(inactive_users())
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('archived', res.json()['detail'])
+
+    def test_restore_endpoint(self):
+        """Test that school administrators restore archived users"""
+        archive_users(inactive_users())
+        self.client.force_authenticate(
+            HelperTest.create_superuser('admin@email.com', 'password')
+        )
+
+        res = self.client.post(restore_url(self.user.pk))
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(
+            get_user_model().objects.filter(pk=self.user.pk).exists()
+        )
+
+        res = self.client.post(restore_url(self.user.pk))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_archive_command(self):
+        """Test that the command archives and restores users"""
+        out = StringIO()
+        call_command('archive_inactive', dry_run=True, stdout=out)
+        self.assertIn('3 users would be archived', out.getvalue())
+
+        call_command('archive_inactive', batch_size=1, stdout=out)
+        self.assertEqual(ArchivedUser.objects.count(), 3)
+
+        call_command('archive_inactive', restore=self.user.email, stdout=out)
+        self.assertEqual(ArchivedUser.objects.count(), 2)
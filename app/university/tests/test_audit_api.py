@@ -0,0 +1,191 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.audit import audit_log
+from core.models import AuditEntry
+from core.utils import HelperTest
+from university import models
+
+BULK_SALARY_EMPLOYEE_URL = reverse('university:bulk_salary_employee')
+BULK_DELETE_TEACHER_URL = reverse('university:bulk_delete_teacher')
+
+
+class AuditAPITest(TestCase):
+    """Tests for audited salary and course changes"""
+    def setUp(self):
+        audit_log.flush()
+        self.client = APIClient()
+        self.admin = HelperTest.create_superuser('admin@email.com', 'password')
+        self.client.force_authenticate(self.admin)
+        self.job = models.Job.objects.create(name='Secretary')
+        self.employee = HelperTest.create_employee(
+            user=HelperTest.create_user(
+                email='employee@email.com', password='password'
+            ),
+            salary='1000.00',
+            job=self.job
+        )
+
+    def request(self, method, *args, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            res = getattr(self.client, method)(*args, **kwargs)
+        audit_log.flush()
+        return res
+
+    def test_audit_serializer_update(self):
+        """Test that salary changes record the old and new values"""
+        url = reverse(
+            'university:retrive_employee', kwargs={'pk': self.employee.id}
+        )
+        res = self.request('patch', url, {'salary': '1500.00'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        entry = AuditEntry.objects.get(object_id=str(self.employee.id))
+        self.assertEqual(entry.model, 'university.employee')
+        self.assertEqual(entry.field, 'salary')
+        self.assertEqual(Decimal(entry.old_value), Decimal('1000.00'))
+        self.assertEqual(Decimal(entry.new_value), Decimal('1500.00'))
+        self.assertEqual(entry.actor_id, self.admin.id)
+        self.assertEqual(entry.source, 'api')
+
+    def test_unchanged_fields_not_audited(self):
+        """Test that updates keeping the audited values record nothing"""
+        url = reverse(
+            'university:retrive_employee', kwargs={'pk': self.employee.id}
+        )
+        self.request('patch', url, {'salary': '1000.00'})
+
+        self.assertFalse(AuditEntry.objects.exists())
+
+    def test_audit_student_course(self):
+        """Test that main course changes are audited"""
+        courses = [
+            models.Course.objects.create(name=f'Course {count}')
+            for count in range(2)
+        ]
+        student = models.Student.objects.create(
+            user=HelperTest.create_user(
+                email='student@email.com', password='password'
+            ),
+            course=courses[0]
+        )
+        url = reverse('university:retrive_student', kwargs={'pk': student.id})
+
+        self.request('patch', url, {'course': courses[1].id}, format='json')
+
+        entry = AuditEntry.objects.get(
+            object_id=str(student.id), field='course'
+        )
+        self.assertEqual(entry.old_value, str(courses[0].id))
+        self.assertEqual(entry.new_value, str(courses[1].id))
+
+    def test_audit_student_courses(self):
+        """Test that enrollments and unenrollments are audited per course"""
+        courses = [
+            models.Course.objects.create(name=f'Course {count}')
+            for count in range(3)
+        ]
+        student = models.Student.objects.create(
+            user=HelperTest.create_user(
+                email='student@email.com', password='password'
+            ),
+            course=courses[0]
+        )
+        student.courses.add(courses[1])
+        url = reverse('university:retrive_student', kwargs={'pk': student.id})
+
+        self.request('patch', url, {
+            'courses': [courses[0].id, courses[2].id]
+        }, format='json')
+
+        entries = AuditEntry.objects.filter(
+            object_id=str(student.id), field='courses'
+        )
+        self.assertEqual(
+            {(entry.old_value, entry.new_value) for entry in entries},
+            {(str(courses[1].id), None), (None, str(courses[2].id))}
+        )
+        self.assertTrue(all(
+            entry.actor_id == self.admin.id and entry.source == 'api'
+            for entry in entries
+        ))
+
+    def test_audit_bulk_salary(self):
+        """Test that bulk raises record the salaries the database set"""
+        self.request('post', BULK_SALARY_EMPLOYEE_URL, {
+            'job': self.job.id, 'percentage': '10'
+        })
+
+        entry = AuditEntry.objects.get(object_id=str(self.employee.id))
+        self.assertEqual(Decimal(entry.new_value), Decimal('1100.00'))
+        self.assertEqual(entry.source, 'bulk')
+
+    def test_audit_bulk_delete(self):
+        """Test that bulk deletes record the last audited values"""
+        teacher = models.Teacher.objects.create(
+            user=HelperTest.create_user(
+                email='teacher@email.com', password='password'
+            ),
+            salary='2000.00'
+        )
+        self.request(
+            'post', BULK_DELETE_TEACHER_URL, {'ids': [teacher.id]},
+            format='json'
+        )
+
+        entry = AuditEntry.objects.get(object_id=str(teacher.id))
+        self.assertEqual(Decimal(entry.old_value), Decimal('2000.00'))
+        self.assertIsNone(entry.new_value)
+        self.assertEqual(entry.source, 'bulk_delete')
+
+    def test_audit_bulk_delete_by_subject(self):
+        """Test that only the rows a bulk delete removed are audited"""
+        subject = models.Subject.objects.create(name='Subject')
+        teachers = [
+            models.Teacher.objects.create(
+                user=HelperTest.create_user(
+                    email=f'teacher{count}@email.com', password='password'
+                ),
+                salary='2000.00'
+            )
+            for count in range(2)
+        ]
+        for teacher in teachers:
+            teacher.subjects.add(subject)
+        kept = models.Teacher.objects.create(
+            user=HelperTest.create_user(
+                email='kept@email.com', password='password'
+            ),
+            salary='2000.00'
+        )
+
+        self.request('post', BULK_DELETE_TEACHER_URL, {'subject': subject.id})
+
+        self.assertEqual(
+            set(AuditEntry.objects.filter(source='bulk_delete')
+                .values_list('object_id', flat=True)),
+            {str(teacher.id) for teacher in teachers}
+        )
+        self.assertTrue(models.Teacher.objects.filter(pk=kept.pk).exists())
+
+    def test_object_history(self):
+        """Test that entries of an object are read in time order"""
+        url = reverse(
+            'university:retrive_employee', kwargs={'pk': self.employee.id}
+        )
+        self.request('patch', url, {'salary': '1500.00'})
+        self.request('patch', url, {'salary': '2000.00'})
+
+        history = AuditEntry.objects.filter(
+            model='university.employee',
+            object_id=str(self.employee.id)
+        ).order_by('changed_at')
+        self.assertEqual(
+            [Decimal(entry.new_value) for entry in history],
+            [Decimal('1500.00'), Decimal('2000.00')]
+        )
@@ -0,0 +1,175 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from university import models
+from core.utils import HelperTest
+
+BULK_SALARY_EMPLOYEE_URL = reverse('university:bulk_salary_employee')
+BULK_DELETE_EMPLOYEE_URL = reverse('university:bulk_delete_employee')
+BULK_SALARY_TEACHER_URL = reverse('university:bulk_salary_teacher')
+BULK_DELETE_TEACHER_URL = reverse('university:bulk_delete_teacher')
+
+
+class PublicBulkAPITest(TestCase):
+    """Tests from not allowed requests to the bulk endpoints"""
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_bulk_salary_unauthorized(self):
+        """Test that authentication is required for bulk salary updates"""
+        res = self.client.post(BULK_SALARY_EMPLOYEE_URL, {})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_bulk_delete_forbidden(self):
+        """Test that only school administrators delete in bulk"""
+        user = HelperTest.create_user(
+            email='test@email.com',
+            password='password'
+        )
+        self.client.force_authenticate(user=user)
+        res = self.client.post(BULK_DELETE_TEACHER_URL, {})
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class PrivateBulkAPITest(TestCase):
+    """Tests from school administrators to the bulk endpoints"""
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=HelperTest.create_superuser(
+            email='admin@email.com',
+            password='password'
+        ))
+        self.job = models.Job.objects.create(name='Secretary')
+        self.other_job = models.Job.objects.create(name='Janitor')
+        self.employees = [
+            HelperTest.create_employee(
+                user=HelperTest.create_user(
+                    email=f'employee{count}@email.com',
+                    password='password'
+                ),
+                salary='1000.00',
+                job=job
+            )
+            for count, job in enumerate(
+                (self.job, self.job, self.other_job)
+            )
+        ]
+        self.subject = models.Subject.objects.create(name='Subject')
+        self.teachers = [
+            models.Teacher.objects.create(
+                user=HelperTest.create_user(
+                    email=f'teacher{count}@email.com',
+                    password='password'
+                ),
+                salary='2000.00'
+            )
+            for count in range(2)
+        ]
+        self.teachers[0].subjects.add(self.subject)
+
+    def salaries(self, model):
+        return sorted(model.objects.values_list('salary', flat=True))
+
+    def test_raise_salary_by_job(self):
+        """Test raising the salary of every employee of a job"""
+        payload = {'job': self.job.id, 'percentage': '5.5'}
+        res = self.client.post(BULK_SALARY_EMPLOYEE_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'count': 2, 'dry_run': False})
+        self.assertEqual(
+            self.salaries(models.Employee),
+            [Decimal('1000.00'), Decimal('1055.00'), Decimal('1055.00')]
+        )
+
+    def test_set_salary_by_ids(self):
+        """Test setting the salary of the given teachers"""
+        payload = {'ids': [self.teachers[1].id], 'salary': '3000.00'}
+        res = self.client.post(BULK_SALARY_TEACHER_URL, payload, format='json')
+
+        self.assertEqual(res.data['count'], 1)
+        self.teachers[1].refresh_from_db()
+        self.assertEqual(self.teachers[1].salary, Decimal('3000.00'))
+
+    def test_salary_dry_run(self):
+        """Test that a dry run counts rows without updating them"""
+        payload = {'subject': self.subject.id, 'percentage': '10',
+                   'dry_run': True}
+        res = self.client.post(BULK_SALARY_TEACHER_URL, payload)
+
+        self.assertEqual(res.data, {'count': 1, 'dry_run': True})
+        self.assertEqual(
+            self.salaries(models.Teacher),
+            [Decimal('2000.00'), Decimal('2000.00')]
+        )
+
+    def test_salary_requires_filter_and_one_change(self):
+        """Test that filters and exactly one salary change are required"""
+        res = self.client.post(BULK_SALARY_EMPLOYEE_URL, {'salary': '10'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        payload = {'job': self.job.id, 'salary': '10', 'percentage': '10'}
+        res = self.client.post(BULK_SALARY_EMPLOYEE_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_delete_employees(self):
+        """Test deleting every employee of a job"""
+        res = self.client.post(BULK_DELETE_EMPLOYEE_URL, {'job': self.job.id})
+
+        self.assertEqual(res.data, {'count': 2, 'dry_run': False})
+        self.assertEqual(models.Employee.objects.count(), 1)
+
+    def test_bulk_delete_teachers(self):
+        """Test deleting teachers along with their subject rows"""
+        payload = {'ids': [teacher.id for teacher in self.teachers]}
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(
+                BULK_DELETE_TEACHER_URL, payload, format='json'
+            )
+
+        self.assertEqual(res.data['count'], 2)
+        self.assertEqual(len([
+            query for query in queries.captured_queries
+            if query['sql'].startswith('DELETE')
+        ]), 2)
+        self.assertFalse(models.Teacher.objects.exists())
+        self.assertFalse(models.Teacher.subjects.through.objects.exists())
+
+    def test_bulk_delete_teachers_by_subject(self):
+        """Test deleting the teachers of a subject and only their rows"""
+        other_subject = models.Subject.objects.create(name='Other subject')
+        self.teachers[0].subjects.add(other_subject)
+        self.teachers[1].subjects.add(other_subject)
+        through = models.Teacher.subjects.through
+
+        res = self.client.post(
+            BULK_DELETE_TEACHER_URL, {'subject': self.subject.id}
+        )
+
+        self.assertEqual(res.data, {'count': 1, 'dry_run': False})
+        self.assertEqual(
+            list(models.Teacher.objects.values_list('pk', flat=True)),
+            [self.teachers[1].pk]
+        )
+        self.assertFalse(
+            through.objects.filter(teacher=self.teachers[0].pk).exists()
+        )
+        self.assertEqual(
+            list(through.objects.values_list('teacher', 'subject')),
+            [(self.teachers[1].pk, other_subject.pk)]
+        )
+
+    def test_bulk_delete_dry_run(self):
+        """Test that a dry run counts rows without deleting them"""
+        payload = {'subject': self.subject.id, 'dry_run': True}
+        res = self.client.post(BULK_DELETE_TEACHER_URL, payload)
+
+        self.assertEqual(res.data, {'count': 1, 'dry_run': True})
+        self.assertEqual(models.Teacher.objects.count(), 2)
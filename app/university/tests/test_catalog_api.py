@@ -0,0 +1,112 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from university import models
+from university.catalog import build_course_catalog
+from core.utils import HelperTest
+
+
+def catalog_url(course_id):
+    return reverse('university:course_catalog', kwargs={'pk': course_id})
+
+
+class CourseCatalogAPITest(TestCase):
+    """Tests for requests to the course catalog endpoint"""
+    def setUp(self):
+        self.client = APIClient()
+        self.user = HelperTest.create_user(
+            name='Student Name',
+            email='student@email.com',
+            password='password'
+        )
+        self.course = models.Course.objects.create(name='Test Course')
+        self.subjects = [
+            models.Subject.objects.create(name='Subject 1'),
+            models.Subject.objects.create(name='Subject 2'),
+        ]
+        self.course.subjects.set(self.subjects)
+        self.lesson = models.Lesson.objects.create(
+            title='Lesson 1',
+            textual_content='Some Text',
+            subject=self.subjects[0]
+        )
+        models.Student.objects.create(user=self.user, course=self.course)
+        self.client.force_authenticate(self.user)
+
+    def test_course_catalog_tree(self):
+        """Test that the catalog nests subjects and lesson headers"""
+        res = self.client.get(catalog_url(self.course.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        data = res.json()
+        self.assertEqual(data['id'], str(self.course.id))
+        self.assertEqual(len(data['subjects']), 2)
+        subject = data['subjects'][0]
+        self.assertEqual(subject['name'], 'Subject 1')
+        self.assertEqual(
+            subject['lessons'],
+            [{'id': str(self.lesson.id), 'title': 'Lesson 1'}]
+        )
+        self.assertNotIn('textual_content', subject['lessons'][0])
+
+    def test_course_catalog_stored(self):
+        """Test that the catalog is stored and reused between requests"""
+        self.client.get(catalog_url(self.course.id))
+        self.assertTrue(models.CourseCatalog.objects.filter(
+            course=self.course
+        ).exists())
+
+        with self.assertNumQueries(2):
+            res = self.client.get(catalog_url(self.course.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_course_catalog_regenerated_on_new_lesson(self):
+        """Test that adding a lesson regenerates the course catalog"""
+        self.client.get(catalog_url(self.course.id))
+        models.Lesson.objects.create(
+            title='Lesson 2',
+            textual_content='Some Text',
+            subject=self.subjects[1]
+        )
+
+        res = self.client.get(catalog_url(self.course.id))
+        lessons = res.json()['subjects'][1]['lessons']
+        self.assertEqual(lessons[0]['title'], 'Lesson 2')
+
+    def test_course_catalog_regenerated_on_subject_change(self):
+        """Test that course subjects and subject names refresh the catalog"""
+        self.client.get(catalog_url(self.course.id))
+        self.course.subjects.remove(self.subjects[1])
+        self.subjects[0].name = 'Renamed Subject'
+        self.subjects[0].save()
+
+        res = self.client.get(catalog_url(self.course.id))
+        subjects = res.json()['subjects']
+        self.assertEqual(len(subjects), 1)
+        self.assertEqual(subjects[0]['name'], 'Renamed Subject')
+
+    def test_course_catalog_invalidated_while_building(self):
+        """Test that a catalog built across an invalidation is not stored"""
+        def build_then_change(course_id):
+            content = build_course_catalog(course_id)
+            self.subjects[0].name = 'Renamed Subject'
+            self.subjects[0].save()
+            return content
+
+        with mock.patch('university.catalog.build_course_catalog',
+                        build_then_change):
+            self.client.get(catalog_url(self.course.id))
+        res = self.client.get(catalog_url(self.course.id))
+
+        self.assertEqual(res.json()['subjects'][0]['name'], 'Renamed Subject')
+
+    def test_course_catalog_forbiden(self):
+        """Test the catalog of a course the student is not enrolled in"""
+        course = models.Course.objects.create(name='New Course')
+        res = self.client.get(catalog_url(course.id))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,163 @@
+from importlib import import_module
+
+from django.apps import apps as global_apps
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from university import models
+from university.access import get_student_access
+from core.utils import HelperTest
+
+
+def watch_course_url(course_id):
+    return reverse('university:watch_course', kwargs={'pk': course_id})
+
+
+def watch_lesson_url(lesson_id):
+    return reverse('university:watch_lesson', kwargs={'pk': lesson_id})
+
+
+class EnrollmentAPITest(TestCase):
+    """Tests for students enrolled in several courses"""
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = HelperTest.create_user(
+            email='student@email.com',
+            password='password'
+        )
+        self.subjects = [
+            models.Subject.objects.create(name=f'Subject {i}')
+            for i in range(3)
+        ]
+        self.courses = [
+            models.Course.objects.create(name=f'Course {i}')
+            for i in range(3)
+        ]
+        for course, subject in zip(self.courses, self.subjects):
+            course.subjects.add(subject)
+        self.lessons = [
+            models.Lesson.objects.create(
+                title=f'Lesson {i}',
+                textual_content='Some Text',
+                subject=subject
+            )
+            for i, subject in enumerate(self.subjects)
+        ]
+        self.student = models.Student.objects.create(
+            user=self.user,
+            course=self.courses[0]
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_main_course_enrolled(self):
+        """Test that the main course is one of the enrolled courses"""
+        self.assertEqual(
+            list(self.student.courses.all()), [self.courses[0]]
+        )
+
+    def test_watch_every_enrolled_course(self):
+        """Test that every enrolled course and its lessons are available"""
+        self.student.courses.add(self.courses[1])
+
+        for i in (0, 1):
+            res = self.client.get(watch_course_url(self.courses[i].id))
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            res = self.client.get(watch_lesson_url(self.lessons[i].id))
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(watch_course_url(self.courses[2].id))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        res = self.client.get(watch_lesson_url(self.lessons[2].id))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_cached_access_without_queries(self):
+        """Test that a cached access set is checked without queries"""
+        get_student_access(self.user.pk)
+
+        with self.assertNumQueries(0):
+            access = get_student_access(self.user.pk)
+        self.assertEqual(access.courses, {self.courses[0].id})
+        self.assertEqual(access.subjects, {self.subjects[0].id})
+
+    def test_access_rebuilt_on_enrollment(self):
+        """Test that enrolling and leaving courses drops the cached set"""
+        get_student_access(self.user.pk)
+        self.student.courses.add(self.courses[2])
+        self.assertIn(
+            self.courses[2].id, get_student_access(self.user.pk).courses
+        )
+
+        self.courses[2].enrolled_students.remove(self.student)
+        self.assertNotIn(
+            self.courses[2].id, get_student_access(self.user.pk).courses
+        )
+
+    def test_access_rebuilt_on_course_subjects(self):
+        """Test that changing the subjects of a course drops the cached set"""
+        get_student_access(self.user.pk)
+        self.courses[0].subjects.add(self.subjects[1])
+        self.assertIn(
+            self.subjects[1].id, get_student_access(self.user.pk).subjects
+        )
+
+        self.subjects[1].course_set.clear()
+        self.assertNotIn(
+            self.subjects[1].id, get_student_access(self.user.pk).subjects
+        )
+
+    def test_update_student_courses(self):
+        """Test that administrators set the enrolled courses"""
+        admin = HelperTest.create_superuser('admin@email.com', 'password')
+        self.client.force_authenticate(admin)
+        url = reverse(
+            'university:retrive_student', kwargs={'pk': self.student.id}
+        )
+
+        res = self.client.patch(
+            url, {'courses': [self.courses[1].id]}, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(self.student.courses.all()),
+            {self.courses[0], self.courses[1]}
+        )
+        self.assertEqual(
+            get_student_access(self.user.pk).courses,
+            {self.courses[0].id, self.courses[1].id}
+        )
+
+    def test_change_main_course(self):
+        """Test that changing the main course moves the enrollment"""
+        admin = HelperTest.create_superuser('admin@email.com', 'password')
+        self.client.force_authenticate(admin)
+        url = reverse(
+            'university:retrive_student', kwargs={'pk': self.student.id}
+        )
+
+        res = self.client.patch(
+            url, {'course': self.courses[2].id}, format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            list(self.student.courses.all()), [self.courses[2]]
+        )
+
+    def test_enroll_in_main_course_migration(self):
+        """Test that existing students are enrolled in their main course"""
+        self.student.courses.clear()
+        migration = import_module(
+            'university.migrations.0011_student_courses'
+        )
+
+        migration.enroll_in_main_course(global_apps, None)
+
+        self.assertEqual(
+            list(self.student.courses.all()), [self.courses[0]]
+        )
@@ -87,6 +87,26 @@ class PrivateLessonApiTest(TestCase):
         res = self.client.post(CREATE_LESSON_URL, self.lesson_payload)
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_list_lessons_image_width(self):
+        """Test that listed lessons pick the image for the asked width"""
+        lesson = models.Lesson.objects.create(
+            title='Lesson',
+            textual_content='Content',
+            subject=self.subjects[0]
+        )
+        models.Lesson.objects.filter(pk=lesson.pk).update(
+            featured_image_variants={'320': 'a320.webp', '1280': 'a1280.webp'}
+        )
+
+        res = self.client.get(CREATE_LESSON_URL, {'image_width': 300})
+        default = self.client.get(CREATE_LESSON_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data[0]['featured_image_url'], '/media/a320.webp')
+        self.assertEqual(
+            default.data[0]['featured_image_url'], '/media/a1280.webp'
+        )
+
 
 class WatchLessonAPITest(TestCase):
     """Tests fo requests to watch lesson endpoint"""
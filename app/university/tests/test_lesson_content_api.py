@@ -0,0 +1,193 @@
+import gzip
+
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.compression import ENCODINGS
+from core.jobs import Worker
+from core.models import Job, RenderedContent
+from core.rendering import content_hash, local_cache
+from university import models
+from core.utils import HelperTest
+
+CONTENT = 'A long lesson about compression. ' * 200
+
+
+def content_url(lesson_id):
+    return reverse('university:lesson_content', kwargs={'pk': lesson_id})
+
+
+def watch_lesson_url(lesson_id):
+    return reverse('university:watch_lesson', kwargs={'pk': lesson_id})
+
+
+class LessonContentAPITest(TestCase):
+    """Tests for compressed lesson responses"""
+    def setUp(self):
+        self.client = APIClient()
+        self.user = HelperTest.create_user(email='student@email.com')
+        subject = models.Subject.objects.create(name='Subject')
+        course = models.Course.objects.create(name='Course')
+        course.subjects.add(subject)
+        models.Student.objects.create(user=self.user, course=course)
+        self.lesson = models.Lesson.objects.create(
+            title='Lesson',
+            textual_content=CONTENT,
+            subject=subject
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_content_precompressed_on_save(self):
+        """Test that saving a lesson stores its compressed bodies"""
+        self.lesson.textual_content = 'New content'
+        self.lesson.save()
+        self.lesson.refresh_from_db()
+
+        self.assertEqual(
+            gzip.decompress(bytes(self.lesson.textual_content_gzip)),
+            b'New content'
+        )
+
+    def test_precompressed_content_served(self):
+        """Test that the stored body is served to clients accepting it"""
+        res = self.client.get(
+            content_url(self.lesson.id), HTTP_ACCEPT_ENCODING='gzip'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', res['Vary'])
+        self.assertEqual(res.content, bytes(self.lesson.textual_content_gzip))
+        self.assertEqual(gzip.decompress(res.content).decode(), CONTENT)
+
+    def test_identity_content(self):
+        """Test that clients without a known encoding get plain text"""
+        res = self.client.get(
+            content_url(self.lesson.id), HTTP_ACCEPT_ENCODING='gzip;q=0'
+        )
+
+        self.assertFalse(res.has_header('Content-Encoding'))
+        self.assertEqual(res.content.decode(), CONTENT)
+
+    def test_content_needs_enrollment(self):
+        """Test that only students of the lesson subject get its content"""
+        other = HelperTest.create_user(email='other@email.com')
+        models.Student.objects.create(
+            user=other, course=models.Course.objects.create(name='Other')
+        )
+        self.client.force_authenticate(other)
+
+        res = self.client.get(content_url(self.lesson.id))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_api_response_compressed(self):
+        """Test that large API responses are compressed on the fly"""
+        res = self.client.get(
+            watch_lesson_url(self.lesson.id),
+            HTTP_ACCEPT_ENCODING='gzip, br'
+        )
+
+        self.assertEqual(res['Content-Encoding'], ENCODINGS[0])
+        self.assertEqual(int(res['Content-Length']), len(res.content))
+
+        res = self.client.get(
+            watch_lesson_url(self.lesson.id), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertIn(CONTENT.encode(), gzip.decompress(res.content))
+
+    def test_small_response_not_compressed(self):
+        """Test that responses under the size threshold are sent as is"""
+        self.lesson.textual_content = 'Short'
+        self.lesson.save()
+
+        res = self.client.get(
+            watch_lesson_url(self.lesson.id), HTTP_ACCEPT_ENCODING='gzip'
+        )
+
+        self.assertFalse(res.has_header('Content-Encoding'))
+        self.assertEqual(res.json()['textual_content'], 'Short')
+
+
+class LessonHTMLAPITest(TestCase):
+    """Tests for the HTML rendering of lesson content"""
+    def setUp(self):
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+        self.client = APIClient()
+        self.user = HelperTest.create_user(email='student@email.com')
+        self.subject = models.Subject.objects.create(name='Subject')
+        course = models.Course.objects.create(name='Course')
+        course.subjects.add(self.subject)
+        models.Student.objects.create(user=self.user, course=course)
+        self.client.force_authenticate(self.user)
+
+    def create_lesson(self, text):
+        return models.Lesson.objects.create(
+            title='Lesson', textual_content=text, subject=self.subject
+        )
+
+    def test_prerendered_on_save(self):
+        """Test that saved lessons are rendered by a background job"""
+        lesson = self.create_lesson('# Limits')
+        self.create_lesson('# Limits')
+        self.assertEqual(Job.objects.count(), 1)
+
+        Worker(executor='inline').run(burst=True)
+
+        self.assertEqual(
+            RenderedContent.objects.get().content_hash,
+            content_hash('# Limits')
+        )
+        lesson = models.Lesson.objects.get(pk=lesson.pk)
+        lesson.title = 'New title'
+        lesson.save()
+        self.assertEqual(Job.objects.filter(status=Job.QUEUED).count(), 0)
+
+    def test_html_content(self):
+        """Test that clients asking for HTML get the rendered content"""
+        lesson = self.create_lesson('Some **bold** text')
+
+        res = self.client.get(
+            content_url(lesson.id), HTTP_ACCEPT='text/html'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'text/html; charset=utf-8')
+        self.assertIn('Accept', res['Vary'])
+        self.assertEqual(
+            res.content.decode(), '<p>Some <strong>bold</strong> text</p>'
+        )
+
+        res = self.client.get(content_url(lesson.id), {'format': 'md'})
+        self.assertEqual(res.content.decode(), 'Some **bold** text')
+
+    def test_json_clients_get_markdown(self):
+        """Test that clients accepting JSON get the markdown content"""
+        lesson = self.create_lesson('Some **bold** text')
+
+        res = self.client.get(
+            content_url(lesson.id), HTTP_ACCEPT='application/json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'text/markdown; charset=utf-8')
+        self.assertEqual(res.content.decode(), 'Some **bold** text')
+
+    def test_json_errors(self):
+        """Test that errors are JSON for every accepted format"""
+        other = HelperTest.create_user(email='other@email.com')
+        models.Student.objects.create(
+            user=other, course=models.Course.objects.create(name='Other')
+        )
+        lesson = self.create_lesson('Some text')
+        self.client.force_authenticate(other)
+
+        for accept in ('application/json', 'text/html', 'text/markdown'):
+            res = self.client.get(content_url(lesson.id), HTTP_ACCEPT=accept)
+            self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+            self.assertEqual(res['Content-Type'], 'application/json')
+            self.assertIn('detail', res.json())
@@ -0,0 +1,150 @@
+import json
+
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.db import transaction
+from django.test import TestCase
+
+from rest_framework.authtoken.models import Token
+
+from app.asgi import application
+from core.utils import HelperTest
+from university import models
+
+LESSON_EVENTS_PATH = '/api/university/lesson-events/'
+
+
+def events_scope(token=None, method='GET'):
+    headers = [(b'host', b'testserver')]
+    if token is not None:
+        headers.append((b'authorization', f'Token {token}'.encode()))
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': LESSON_EVENTS_PATH,
+        'raw_path': LESSON_EVENTS_PATH.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': headers,
+        'client': ('127.0.0.1', 1234),
+        'server': ('testserver', 80),
+    }
+
+
+class LessonEventsTests(TestCase):
+    """Tests for the server-sent lesson events of students"""
+    def setUp(self):
+        self.subject = models.Subject.objects.create(name='Subject')
+        self.other_subject = models.Subject.objects.create(name='Other')
+        course = models.Course.objects.create(name='Course')
+        course.subjects.add(self.subject)
+        user = HelperTest.create_user(email='student@email.com')
+        models.Student.objects.create(user=user, course=course)
+        self.token = Token.objects.create(user=user).key
+
+    def create_lesson(self, subject, rollback=False):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    lesson = models.Lesson.objects.create(
+                        title='Lesson',
+                        textual_content='Some Text',
+                        subject=subject
+                    )
+                    if rollback:
+                        raise RuntimeError
+            except RuntimeError:
+                return None
+        return lesson
+
+    def update_lesson(self, lesson):
+        with self.captureOnCommitCallbacks(execute=True):
+            lesson.title = 'New title'
+            lesson.save()
+
+    async def connect(self, token):
+        communicator = ApplicationCommunicator(
+            application, events_scope(token)
+        )
+        await communicator.send_input({'type': 'http.request'})
+        start = await communicator.receive_output(5)
+        return communicator, start
+
+    async def disconnect(self, communicator):
+        await communicator.send_input({'type': 'http.disconnect'})
+        await communicator.wait(5)
+
+    async def test_lesson_events_streamed(self):
+        """Test that lessons of followed subjects are pushed as events"""
+        communicator, start = await self.connect(self.token)
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream'),
+                      start['headers'])
+        retry = await communicator.receive_output(5)
+        self.assertTrue(retry['body'].startswith(b'retry: '))
+
+        await sync_to_async(self.create_lesson)(self.other_subject)
+        await sync_to_async(self.create_lesson)(self.subject, rollback=True)
+        lesson = await sync_to_async(self.create_lesson)(self.subject)
+        await sync_to_async(self.update_lesson)(lesson)
+
+        frames = [
+            (await communicator.receive_output(5))['body'].decode()
+            for count in range(2)
+        ]
+        events = [frame.split('\n')[0] for frame in frames]
+        self.assertEqual(
+            events, ['event: lesson.created', 'event: lesson.updated']
+        )
+        data = json.loads(frames[1].split('\n')[1][len('data: '):])
+        self.assertEqual(data['lesson'], str(lesson.pk))
+        self.assertEqual(data['title'], 'New title')
+        self.assertTrue(await communicator.receive_nothing(0.2))
+
+        await self.disconnect(communicator)
+
+    async def test_heartbeat(self):
+        """Test that idle streams send heartbeat comments"""
+        with self.settings(SSE_HEARTBEAT=0.05):
+            communicator, start = await self.connect(self.token)
+            await communicator.receive_output(5)
+            heartbeat = await communicator.receive_output(5)
+            await self.disconnect(communicator)
+
+        self.assertEqual(heartbeat['body'], b': heartbeat\n\n')
+
+    async def test_stream_closed_after_max_age(self):
+        """Test that streams end for the client to reconnect"""
+        with self.settings(SSE_MAX_AGE=0.05):
+            communicator, start = await self.connect(self.token)
+            await communicator.receive_output(5)
+            end = await communicator.receive_output(5)
+            await communicator.wait(5)
+
+        self.assertEqual(end['body'], b'')
+        self.assertFalse(end.get('more_body', False))
+
+    async def test_students_only(self):
+        """Test that the stream needs a student token"""
+        communicator, start = await self.connect(None)
+        self.assertEqual(start['status'], 401)
+
+        communicator, start = await self.connect('wrong')
+        self.assertEqual(start['status'], 401)
+
+        user = await sync_to_async(HelperTest.create_user)(
+            email='teacher@email.com'
+        )
+        token = await sync_to_async(Token.objects.create)(user=user)
+        communicator, start = await self.connect(token.key)
+        self.assertEqual(start['status'], 403)
+
+    def test_wsgi_answers_unavailable(self):
+        """Test that the WSGI application tells the stream is not there"""
+        res = self.client.get(LESSON_EVENTS_PATH)
+
+        self.assertEqual(res.status_code, 501)
+        self.assertIn('ASGI', res.json()['detail'])
@@ -0,0 +1,122 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from PIL import Image
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.jobs import Worker
+from core.models import Job
+from university import models
+from university.derivatives import best_fit
+from university.images import derivative_name, render_derivatives
+from university.serializers import LessonSerializer
+
+IMAGE_JOB = 'university.tasks.render_lesson_image'
+
+
+def image_file(width=800, height=400, color='red'):
+    output = io.BytesIO()
+    Image.new('RGB', (width, height), color).save(output, 'PNG')
+    return SimpleUploadedFile('image.png', output.getvalue(), 'image/png')
+
+
+class LessonImageTests(TestCase):
+    """Tests for the lesson featured image derivatives"""
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.subject = models.Subject.objects.create(name='Subject')
+
+    def create_lesson(self, **params):
+        return models.Lesson.objects.create(
+            title='Lesson',
+            textual_content='Some Text',
+            subject=self.subject,
+            **params
+        )
+
+    def test_render_derivatives(self):
+        """Test that WebP variants are written without upscaling"""
+        source = os.path.join(self.media_root, 'source.png')
+        Image.new('RGB', (800, 400)).save(source)
+
+        variants = render_derivatives(
+            source, self.media_root, 'ab' * 32, (320, 640, 1280)
+        )
+
+        self.assertEqual(set(variants), {'320', '640'})
+        path = os.path.join(self.media_root, variants['320'])
+        with Image.open(path) as image:
+            self.assertEqual(image.format, 'WEBP')
+            self.assertEqual(image.size, (320, 160))
+
+        mtime = os.path.getmtime(path)
+        render_derivatives(source, self.media_root, 'ab' * 32, (320,))
+        self.assertEqual(os.path.getmtime(path), mtime)
+
+    def test_upload_queues_derivatives(self):
+        """Test that uploads only queue the rendering job"""
+        lesson = self.create_lesson(featured_image=image_file())
+
+        self.assertEqual(len(lesson.featured_image_hash), 64)
+        self.assertEqual(lesson.featured_image_variants, {})
+        job = Job.objects.get(name=IMAGE_JOB)
+        self.assertEqual(job.args[0], lesson.featured_image_hash)
+
+    def test_duplicate_content_reuses_variants(self):
+        """Test that an image with known content is not rendered again"""
+        lesson = self.create_lesson(featured_image=image_file())
+        self.create_lesson(featured_image=image_file())
+        self.assertEqual(Job.objects.filter(name=IMAGE_JOB).count(), 1)
+
+        variants = {'320': derivative_name(lesson.featured_image_hash, 320)}
+        models.Lesson.objects.filter(pk=lesson.pk)\
+            .update(featured_image_variants=variants)
+        Job.objects.update(status=Job.DONE)
+        duplicate = self.create_lesson(featured_image=image_file())
+
+        self.assertEqual(Job.objects.filter(name=IMAGE_JOB).count(), 1)
+        self.assertEqual(duplicate.featured_image_variants, variants)
+
+    def test_worker_renders_derivatives(self):
+        """Test that the queued job renders and saves the variants"""
+        lesson = self.create_lesson(featured_image=image_file(width=400))
+        image_hash = lesson.featured_image_hash
+
+        Worker(executor='inline').run(burst=True)
+
+        lesson.refresh_from_db()
+        self.assertEqual(
+            lesson.featured_image_variants,
+            {'320': derivative_name(image_hash, 320)}
+        )
+        self.assertTrue(os.path.exists(
+            os.path.join(self.media_root, derivative_name(image_hash, 320))
+        ))
+
+    def test_best_fit_variant(self):
+        """Test that the smallest variant covering the width is picked"""
+        variants = {'320': 'a.webp', '640': 'b.webp'}
+        self.assertEqual(best_fit(variants, 300), 'a.webp')
+        self.assertEqual(best_fit(variants, 500), 'b.webp')
+        self.assertEqual(best_fit(variants, 2000), 'b.webp')
+        self.assertIsNone(best_fit({}, 300))
+
+        lesson = self.create_lesson(featured_image=image_file())
+        lesson.featured_image_variants = variants
+        self.assertEqual(
+            LessonSerializer(lesson).data['featured_image_url'],
+            '/media/b.webp'
+        )
+        request = Request(APIRequestFactory().get('/', {'image_width': 300}))
+        data = LessonSerializer(lesson, context={'request': request}).data
+        self.assertEqual(data['featured_image_url'], '/media/a.webp')
@@ -0,0 +1,122 @@
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.responses import parse_range
+from university import models
+from core.utils import HelperTest
+
+PDF_CONTENT = b'%PDF-1.4 ' + bytes(range(256)) * 4
+
+
+def media_url_url(lesson_id):
+    return reverse('university:lesson_media_url', kwargs={'pk': lesson_id})
+
+
+class ParseRangeTests(TestCase):
+    """Tests for the Range header parsing"""
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=0-9', 100), (0, 9))
+        self.assertEqual(parse_range('bytes=90-', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=-10', 100), (90, 99))
+        self.assertEqual(parse_range('bytes=50-500', 100), (50, 99))
+        self.assertIsNone(parse_range('bytes=0-1,5-9', 100))
+        self.assertIsNone(parse_range(None, 100))
+        with self.assertRaises(ValueError):
+            parse_range('bytes=100-', 100)
+
+
+class LessonMediaAPITest(TestCase):
+    """Tests for signed, range-served lesson file downloads"""
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+        self.user = HelperTest.create_user(
+            email='student@email.com',
+            password='password'
+        )
+        subject = models.Subject.objects.create(name='Subject')
+        self.course = models.Course.objects.create(name='Course')
+        self.course.subjects.add(subject)
+        models.Student.objects.create(user=self.user, course=self.course)
+        self.lesson = models.Lesson.objects.create(
+            title='Lesson',
+            textual_content='Some Text',
+            subject=subject
+        )
+        self.lesson.pdf.save('lesson.pdf', ContentFile(PDF_CONTENT))
+        self.client.force_authenticate(self.user)
+
+    def signed_url(self):
+        res = self.client.get(media_url_url(self.lesson.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.client.force_authenticate(None)
+        return res.data['url']
+
+    def test_download_whole_file(self):
+        """Test that a signed URL serves the file without a query"""
+        url = self.signed_url()
+        with self.assertNumQueries(0):
+            res = self.client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/pdf')
+        self.assertEqual(res['Accept-Ranges'], 'bytes')
+        self.assertEqual(b''.join(res.streaming_content), PDF_CONTENT)
+
+    def test_download_range(self):
+        """Test that a Range request is answered with partial content"""
+        res = self.client.get(self.signed_url(), HTTP_RANGE='bytes=10-19')
+
+        self.assertEqual(res.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(
+            res['Content-Range'], f'bytes 10-19/{len(PDF_CONTENT)}'
+        )
+        self.assertEqual(res['Content-Length'], '10')
+        self.assertEqual(b''.join(res.streaming_content), PDF_CONTENT[10:20])
+
+    def test_download_unsatisfiable_range(self):
+        """Test that a range past the end of the file is refused"""
+        res = self.client.get(self.signed_url(), HTTP_RANGE='bytes=5000-')
+
+        self.assertEqual(
+            res.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+
+    @override_settings(MEDIA_ACCEL_REDIRECT='/protected-media/')
+    def test_download_accel_redirect(self):
+        """Test that the front proxy is asked to send the file"""
+        res = self.client.get(self.signed_url())
+
+        self.assertEqual(
+            res['X-Accel-Redirect'],
+            '/protected-media/' + self.lesson.pdf.name
+        )
+
+    def test_tampered_and_expired_url(self):
+        """Test that changed or expired URLs are refused"""
+        url = self.signed_url()
+        res = self.client.get(url[:-1] + ('a' if url[-1] != 'a' else 'b'))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        with override_settings(LESSON_MEDIA_URL_LIFETIME=-1):
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_not_enrolled_student(self):
+        """Test that students of other courses cannot get a URL"""
+        self.course.subjects.clear()
+        res = self.client.get(media_url_url(self.lesson.id))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,147 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from university import models
+from core.utils import HelperTest
+
+CREATE_LIST_EMPLOYEE_URL = reverse('university:create_list_employee')
+CREATE_TEACHER_URL = reverse('university:create_teacher')
+CREATE_STUDENT_URL = reverse('university:create_student')
+
+
+def create_user(email):
+    return get_user_model().objects.create_user(
+        email=email,
+        password='password'
+    )
+
+
+class ListFiltersAPITest(TestCase):
+    """Tests for filtering and ordering the list endpoints"""
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            HelperTest.create_superuser('admin@email.com', 'password')
+        )
+        self.jobs = [
+            models.Job.objects.create(name='Teacher Assistant'),
+            models.Job.objects.create(name='Secretary'),
+        ]
+        self.employees = [
+            models.Employee.objects.create(
+                user=create_user(f'employee{count}@email.com'),
+                salary=1000 + count * 100,
+                job=self.jobs[count % 2],
+                hired_date=datetime.date(2020, 1, 1) +
+                datetime.timedelta(days=count * 30)
+            )
+            for count in range(4)
+        ]
+
+    def ids(self, res):
+        return [row['id'] for row in res.json()]
+
+    def test_filter_employees_by_job(self):
+        """Test that employees are filtered by job"""
+        res = self.client.get(
+            CREATE_LIST_EMPLOYEE_URL, {'job': self.jobs[1].id}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(self.ids(res)),
+            {str(self.employees[1].id), str(self.employees[3].id)}
+        )
+
+    def test_filter_employees_by_hired_date_range(self):
+        """Test that employees are filtered by a hired date range"""
+        res = self.client.get(CREATE_LIST_EMPLOYEE_URL, {
+            'hired_after': '2020-01-15',
+            'hired_before': '2020-03-15',
+            'ordering': 'hired_date',
+        })
+
+        self.assertEqual(
+            self.ids(res),
+            [str(self.employees[1].id), str(self.employees[2].id)]
+        )
+
+    def test_order_employees_descending(self):
+        """Test that employees are ordered by an indexed field"""
+        res = self.client.get(
+            CREATE_LIST_EMPLOYEE_URL, {'ordering': '-salary'}
+        )
+
+        self.assertEqual(
+            self.ids(res),
+            [str(employee.id) for employee in reversed(self.employees)]
+        )
+
+    def test_reject_unindexed_ordering(self):
+        """Test that sort keys without an index are rejected"""
+        res = self.client.get(CREATE_LIST_EMPLOYEE_URL, {'ordering': 'user'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ordering', res.json())
+
+    def test_reject_invalid_filter_value(self):
+        """Test that filter values are validated by the model field"""
+        res = self.client.get(
+            CREATE_LIST_EMPLOYEE_URL, {'hired_after': 'yesterday'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('hired_after', res.json())
+
+    def test_filter_teachers_by_subject(self):
+        """Test that teachers are filtered by one of their subjects"""
+        subject = models.Subject.objects.create(name='Subject')
+        teachers = [
+            models.Teacher.objects.create(
+                user=create_user(f'teacher{count}@email.com'),
+                salary=1000
+            )
+            for count in range(2)
+        ]
+        teachers[0].subjects.add(subject)
+
+        res = self.client.get(CREATE_TEACHER_URL, {'subject': subject.id})
+
+        self.assertEqual(self.ids(res), [str(teachers[0].id)])
+
+    def test_filter_students_by_course(self):
+        """Test that students are filtered by main and enrolled courses"""
+        courses = [
+            models.Course.objects.create(name=f'Course {count}')
+            for count in range(2)
+        ]
+        students = [
+            models.Student.objects.create(
+                user=create_user(f'student{count}@email.com'),
+                course=course
+            )
+            for count, course in enumerate(courses)
+        ]
+        students[0].courses.add(courses[1])
+
+        res = self.client.get(CREATE_STUDENT_URL, {'course': courses[1].id})
+        self.assertEqual(self.ids(res), [str(students[1].id)])
+
+        res = self.client.get(
+            CREATE_STUDENT_URL,
+            {'enrolled_in': courses[1].id, 'ordering': 'id'}
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.client.get(
+            CREATE_STUDENT_URL, {'enrolled_in': courses[1].id}
+        )
+        self.assertEqual(
+            set(self.ids(res)), {str(student.id) for student in students}
+        )
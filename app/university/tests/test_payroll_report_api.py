@@ -0,0 +1,146 @@
+import datetime
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from university import models
+from university.cache import invalidate_payroll_report
+from university.reports import build_payroll_report
+from core.utils import HelperTest
+
+PAYROLL_REPORT_URL = reverse('university:payroll_report')
+
+
+class PublicPayrollReportAPITest(TestCase):
+    """Tests from unauthorized requests to the payroll report endpoint"""
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_payroll_report_unauthorized(self):
+        """Test that authentication is required for the payroll report"""
+        res = self.client.get(PAYROLL_REPORT_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_payroll_report_forbidden(self):
+        """Test that only school administrators read the payroll report"""
+        user = HelperTest.create_user(
+            email='test@email.com',
+            password='password'
+        )
+        self.client.force_authenticate(user=user)
+        res = self.client.get(PAYROLL_REPORT_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class PrivatePayrollReportAPITest(TestCase):
+    """Tests from school administrators to the payroll report endpoint"""
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = HelperTest.create_superuser(
+            email='admin@email.com',
+            password='password'
+        )
+        self.client.force_authenticate(user=self.user)
+
+        self.job = models.Job.objects.create(name='Secretary')
+        self.employees = []
+        salaries = ('1000.00', '2000.00', '3000.00')
+        for count, salary in enumerate(salaries):
+            self.employees.append(HelperTest.create_employee(
+                user=HelperTest.create_user(
+                    email=f'employee{count}@email.com',
+                    password='password'
+                ),
+                salary=salary,
+                job=self.job,
+                hired_date=datetime.date(2020 + count % 2, 1, 1)
+            ))
+        models.Teacher.objects.create(
+            user=HelperTest.create_user(
+                email='teacher@email.com',
+                password='password'
+            ),
+            salary='5000.00',
+            hired_date=datetime.date(2021, 6, 1)
+        )
+
+    def _staff(self, data, name):
+        return next(row for row in data['staff'] if row['staff'] == name)
+
+    def test_payroll_report_by_staff(self):
+        """Test salary aggregates across employees and teachers"""
+        res = self.client.get(PAYROLL_REPORT_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        employees = self._staff(res.data, 'employees')
+        self.assertEqual(employees['headcount'], 3)
+        self.assertEqual(employees['total'], '6000.00')
+        self.assertEqual(employees['mean'], '2000.00')
+        self.assertEqual(employees['median'], '2000.00')
+        self.assertEqual(employees['p90'], '2800.00')
+
+        everyone = self._staff(res.data, 'all')
+        self.assertEqual(everyone['headcount'], 4)
+        self.assertEqual(everyone['total'], '11000.00')
+        self.assertEqual(everyone['mean'], '2750.00')
+        self.assertEqual(everyone['median'], '2500.00')
+        self.assertEqual(everyone['p90'], '4400.00')
+
+    def test_payroll_report_by_job(self):
+        """Test salary aggregates grouped by job"""
+        res = self.client.get(PAYROLL_REPORT_URL)
+        self.assertEqual(len(res.data['jobs']), 1)
+        job = res.data['jobs'][0]
+        self.assertEqual(job['job'], str(self.job.id))
+        self.assertEqual(job['job_name'], self.job.name)
+        self.assertEqual(job['total'], '6000.00')
+
+    def test_payroll_report_by_hire_year(self):
+        """Test salary aggregates grouped by hire-year cohort"""
+        res = self.client.get(PAYROLL_REPORT_URL)
+        cohorts = {
+            (row['staff'], row['year']): row
+            for row in res.data['hire_years']
+        }
+        self.assertEqual(cohorts[('employees', 2020)]['headcount'], 2)
+        self.assertEqual(cohorts[('employees', 2020)]['total'], '4000.00')
+        self.assertEqual(cohorts[('employees', 2021)]['total'], '2000.00')
+        self.assertEqual(cohorts[('teachers', 2021)]['total'], '5000.00')
+
+    def test_payroll_report_refreshed_after_salary_change(self):
+        """Test that a salary update invalidates the cached report"""
+        self.client.get(PAYROLL_REPORT_URL)
+        url = reverse(
+            'university:retrive_employee',
+            kwargs={'pk': self.employees[0].pk}
+        )
+        self.client.patch(url, {'salary': '4000.00'}, format='json')
+
+        res = self.client.get(PAYROLL_REPORT_URL)
+        employees = self._staff(res.data, 'employees')
+        self.assertEqual(employees['total'], '9000.00')
+
+    def test_payroll_report_invalidated_while_building(self):
+        """Test that a report built across an invalidation is not served"""
+        def build_then_change():
+            report = build_payroll_report()
+            models.Employee.objects.filter(pk=self.employees[0].pk)\
+                .update(salary='4000.00')
+            invalidate_payroll_report()
+            return report
+
+        with mock.patch('university.reports.build_payroll_report',
+                        build_then_change):
+            stale = self.client.get(PAYROLL_REPORT_URL)
+        res = self.client.get(PAYROLL_REPORT_URL)
+
+        self.assertEqual(self._staff(stale.data, 'employees')['total'],
+                         '6000.00')
+        self.assertEqual(self._staff(res.data, 'employees')['total'],
+                         '9000.00')
@@ -1,6 +1,7 @@
 from django.urls import path
 
 from . import views
+from .streams import lesson_events_unavailable
 
 
 app_name = "university"
@@ -16,6 +17,21 @@ urlpatterns = [
             views.RetriveEmployeeAPIView.as_view(),
             name='retrive_employee'
         ),
+    path(
+            'employee/bulk-salary/',
+            views.BulkEmployeeSalaryAPIView.as_view(),
+            name='bulk_salary_employee'
+        ),
+    path(
+            'employee/bulk-delete/',
+            views.BulkEmployeeDeleteAPIView.as_view(),
+            name='bulk_delete_employee'
+        ),
+    path(
+            'payroll-report/',
+            views.PayrollReportAPIView.as_view(),
+            name='payroll_report'
+        ),
     path(
             'teacher/',
             views.CreateTeacherAPIView.as_view(),
@@ -26,6 +42,16 @@ urlpatterns = [
             views.RetriveTeacherAPIView.as_view(),
             name='retrive_teacher'
         ),
+    path(
+            'teacher/bulk-salary/',
+            views.BulkTeacherSalaryAPIView.as_view(),
+            name='bulk_salary_teacher'
+        ),
+    path(
+            'teacher/bulk-delete/',
+            views.BulkTeacherDeleteAPIView.as_view(),
+            name='bulk_delete_teacher'
+        ),
     path(
         'student/',
         views.CreateStudentAPIView.as_view(),
@@ -56,6 +82,11 @@ urlpatterns = [
             views.WatchCourseAPIView.as_view(),
             name='watch_course'
         ),
+    path(
+            'course-catalog/<uuid:pk>',
+            views.CourseCatalogAPIView.as_view(),
+            name='course_catalog'
+        ),
     path(
             'create-subject/',
             views.CreateSubjectAPIView.as_view(),
@@ -65,5 +96,30 @@ urlpatterns = [
             'watch-lesson/<uuid:pk>',
             views.WatchLessonAPIVIew.as_view(),
             name='watch_lesson'
+        ),
+    path(
+            'lesson-content/<uuid:pk>',
+            views.LessonContentAPIView.as_view(),
+            name='lesson_content'
+        ),
+    path(
+            'lesson-media-url/<uuid:pk>',
+            views.LessonMediaURLAPIView.as_view(),
+            name='lesson_media_url'
+        ),
+    path(
+            'lesson-media/<str:token>',
+            views.LessonMediaView.as_view(),
+            name='lesson_media'
+        ),
+    path(
+            'lesson-events/',
+            lesson_events_unavailable,
+            name='lesson_events'
+        ),
+    path(
+            'restore-user/<uuid:pk>',
+            views.RestoreUserAPIView.as_view(),
+            name='restore_user'
         )
 ]
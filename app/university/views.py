@@ -1,18 +1,50 @@
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_vary_headers
+
 from rest_framework import generics, exceptions
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
+from rest_framework import status
 from rest_framework.response import Response
 
+from accounts.models import ArchivedUser
+from core.compression import negotiate
+from core.renderers import FastJSONRenderer, HTMLRenderer, MarkdownRenderer
+from core.rendering import render_html
+from core.responses import ranged_file_response
+from core.views import ValuesListMixin
 from university.serializers import (
                                         EmployeeSerializer,
                                         StudentSerializer,
                                         SubjectSerializer,
                                         TeacherSerializer,
                                         CourseSerializer,
-                                        LessonSerializer
+                                        LessonSerializer,
+                                        EmployeeBulkFilterSerializer,
+                                        EmployeeBulkSalarySerializer,
+                                        TeacherBulkFilterSerializer,
+                                        TeacherBulkSalarySerializer
                                     )
 from university.permissions import SchoolAdministrators, Teachers, Students
+from university.reports import get_payroll_report
+from university.access import get_student_access
+from university.archive import RestoreError, restore_user
+from university.catalog import get_course_catalog
+from university.media import load_lesson_media, sign_lesson_media
 from university import models
+from university.bulk import adjust_salaries, bulk_delete
+
+
+def check_lesson_access(user, lesson):
+    """Allow students enrolled in a course with the lesson subject"""
+    if lesson.subject_id not in get_student_access(user.pk).subjects:
+        raise exceptions.PermissionDenied(
+            'The student can only access the lessons of the courses in '
+            'which he is enrolled'
+        )
 
 
 class ExibitionView(APIView):
@@ -44,11 +76,17 @@ class ExibitionView(APIView):
 
 
 
-class CreateListEmployeeAPIView(generics.ListCreateAPIView):
+class CreateListEmployeeAPIView(ValuesListMixin, generics.ListCreateAPIView):
     """Create a new employee in the system"""
     serializer_class = EmployeeSerializer
     permission_classes = (SchoolAdministrators,)
     queryset = models.Employee.objects.all()
+    filter_fields = {
+        'job': 'job',
+        'hired_after': 'hired_date__gte',
+        'hired_before': 'hired_date__lte',
+    }
+    ordering_fields = ('hired_date', 'salary')
 
 
 class RetriveEmployeeAPIView(
@@ -61,11 +99,69 @@ class RetriveEmployeeAPIView(
     queryset = models.Employee.objects.all()
 
 
-class CreateTeacherAPIView(generics.ListCreateAPIView):
+class BulkSalaryAPIView(generics.GenericAPIView):
+    """Set or raise the salary of the filtered rows in one statement"""
+    permission_classes = (SchoolAdministrators,)
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        count = adjust_salaries(
+            serializer.filter_queryset(self.get_queryset()),
+            percentage=data.get('percentage'),
+            salary=data.get('salary'),
+            dry_run=data['dry_run'],
+            actor=request.user
+        )
+        return Response({'count': count, 'dry_run': data['dry_run']})
+
+
+class BulkDeleteAPIView(generics.GenericAPIView):
+    """Delete the filtered rows in one statement"""
+    permission_classes = (SchoolAdministrators,)
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        dry_run = serializer.validated_data['dry_run']
+        count = bulk_delete(
+            serializer.filter_queryset(self.get_queryset()),
+            dry_run=dry_run,
+            actor=request.user
+        )
+        return Response({'count': count, 'dry_run': dry_run})
+
+
+class BulkEmployeeSalaryAPIView(BulkSalaryAPIView):
+    serializer_class = EmployeeBulkSalarySerializer
+    queryset = models.Employee.objects.all()
+
+
+class BulkEmployeeDeleteAPIView(BulkDeleteAPIView):
+    serializer_class = EmployeeBulkFilterSerializer
+    queryset = models.Employee.objects.all()
+
+
+class PayrollReportAPIView(APIView):
+    """Salary aggregates by staff type, job and hire-year cohort"""
+    permission_classes = (SchoolAdministrators,)
+
+    def get(self, request):
+        return Response(get_payroll_report())
+
+
+class CreateTeacherAPIView(ValuesListMixin, generics.ListCreateAPIView):
     """Create a new Teacher in the system"""
     serializer_class = TeacherSerializer
     permission_classes = (SchoolAdministrators,)
     queryset = models.Teacher.objects.all()
+    filter_fields = {
+        'subject': 'subjects',
+        'hired_after': 'hired_date__gte',
+        'hired_before': 'hired_date__lte',
+    }
+    ordering_fields = ('hired_date', 'salary')
 
 
 class RetriveTeacherAPIView(
@@ -78,11 +174,22 @@ class RetriveTeacherAPIView(
     queryset = models.Teacher.objects.all()
 
 
-class CreateStudentAPIView(generics.ListCreateAPIView):
+class BulkTeacherSalaryAPIView(BulkSalaryAPIView):
+    serializer_class = TeacherBulkSalarySerializer
+    queryset = models.Teacher.objects.all()
+
+
+class BulkTeacherDeleteAPIView(BulkDeleteAPIView):
+    serializer_class = TeacherBulkFilterSerializer
+    queryset = models.Teacher.objects.all()
+
+
+class CreateStudentAPIView(ValuesListMixin, generics.ListCreateAPIView):
     """Create a new student in the system"""
     serializer_class = StudentSerializer
     permission_classes = (SchoolAdministrators,)
     queryset = models.Student.objects.all()
+    filter_fields = {'course': 'course', 'enrolled_in': 'courses'}
 
 
 class RetriveStudentAPIView(
@@ -94,11 +201,13 @@ class RetriveStudentAPIView(
     queryset = models.Student.objects.all()
 
 
-class CreateCourseAPIView(generics.ListCreateAPIView):
+class CreateCourseAPIView(ValuesListMixin, generics.ListCreateAPIView):
     """Create a new Course on de system"""
     serializer_class = CourseSerializer
     permission_classes = (SchoolAdministrators,)
     queryset = models.Course.objects.all()
+    filter_fields = {'subject': 'subjects'}
+    ordering_fields = ('name',)
 
 
 class RetriveCourseAPIView(
@@ -111,11 +220,17 @@ class RetriveCourseAPIView(
     queryset = models.Course.objects.all()
 
 
-class CreateLessonAPIView(generics.CreateAPIView, generics.ListAPIView):
+class CreateLessonAPIView(
+        ValuesListMixin,
+        generics.CreateAPIView,
+        generics.ListAPIView
+        ):
     """Create a new lesson on the system"""
     serializer_class = LessonSerializer
     permission_classes = (Teachers,)
     queryset = models.Lesson.objects.all()
+    filter_fields = {'subject': 'subject'}
+    ordering_fields = ('title',)
 
 
 class WatchCourseAPIView(generics.RetrieveAPIView):
@@ -124,58 +239,140 @@ class WatchCourseAPIView(generics.RetrieveAPIView):
     permission_classes = (Students,)
     queryset = models.Course.objects.all()
 
+    def check_enrollment(self):
+        access = get_student_access(self.request.user.pk)
+        if self.kwargs['pk'] not in access.courses:
+            raise exceptions.PermissionDenied(
+                'The student can only access the courses in which he is '
+                'enrolled'
+            )
+
     def get_object(self):
+        self.check_enrollment()
+        return super().get_object()
+
+
+class CourseCatalogAPIView(WatchCourseAPIView):
+    """Retrive the subjects and lesson headers of a course to a student"""
+
+    def retrieve(self, request, *args, **kwargs):
+        self.check_enrollment()
         try:
-            queryset = super().get_object()
-            user = self.request.user
-            student = models.Student.objects.get(user=user)
-            if student.course != queryset:
-                raise exceptions.PermissionDenied(
-                    'The student can only access the course in which he is enrolled',
-                    )
-
-            return queryset
-        except exceptions.PermissionDenied as e:
-             raise e
-        except:
-            raise exceptions.PermissionDenied('Only students can watch a course')
-
-
-class CreateSubjectAPIView(generics.ListCreateAPIView):
+            content = get_course_catalog(self.kwargs['pk'])
+        except models.Course.DoesNotExist:
+            raise Http404
+        return HttpResponse(content, content_type='application/json')
+
+
+class CreateSubjectAPIView(ValuesListMixin, generics.ListCreateAPIView):
     serializer_class = SubjectSerializer
     permission_classes = (SchoolAdministrators,)
     queryset = models.Subject.objects.all()
+    ordering_fields = ('name',)
 
 
 class WatchLessonAPIVIew(generics.RetrieveAPIView):
     serializer_class = LessonSerializer
     permission_classes = (Students,)
-    queryset = models.Lesson.objects.all()
+    queryset = models.Lesson.objects.defer(
+        *models.Lesson.precompressed_fields.values()
+    )
 
     def get_object(self):
-        queryset = super().get_object()
+        lesson = super().get_object()
+        check_lesson_access(self.request.user, lesson)
+        return lesson
+
+
+class LessonContentAPIView(generics.RetrieveAPIView):
+    """
+    Serve the textual content of a lesson to a student: the markdown, as
+    the body compressed on save when the client accepts its encoding, or
+    its cached HTML rendering to clients asking for text/html.
+
+    Clients accepting JSON, as the API clients do, get the markdown too;
+    errors are JSON whatever the client asked for.
+    """
+    permission_classes = (Students,)
+    renderer_classes = (MarkdownRenderer, HTMLRenderer, FastJSONRenderer)
+    queryset = models.Lesson.objects.all()
+
+    def handle_exception(self, exc):
+        self.request.accepted_renderer = FastJSONRenderer()
+        self.request.accepted_media_type = FastJSONRenderer.media_type
+        return super().handle_exception(exc)
+
+    def retrieve(self, request, *args, **kwargs):
+        lesson = self.get_object()
+        check_lesson_access(request.user, lesson)
+        if request.accepted_renderer.format == HTMLRenderer.format:
+            return Response(render_html(lesson.textual_content))
+
+        fields = lesson.precompressed_fields
+        coding = negotiate(
+            request.META.get('HTTP_ACCEPT_ENCODING'),
+            [coding for coding in fields if getattr(lesson, fields[coding])]
+        )
+        if coding is None:
+            body = lesson.textual_content.encode()
+        else:
+            body = bytes(getattr(lesson, fields[coding]))
+        response = HttpResponse(
+            body, content_type='text/markdown; charset=utf-8'
+        )
+        if coding is not None:
+            response['Content-Encoding'] = coding
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+class LessonMediaURLAPIView(generics.RetrieveAPIView):
+    """Sign a short-lived download URL of a lesson file to a student"""
+    permission_classes = (Students,)
+    queryset = models.Lesson.objects.all()
+
+    def retrieve(self, request, *args, **kwargs):
+        lesson = self.get_object()
+        if not request.user.is_superuser:
+            check_lesson_access(request.user, lesson)
+        if not lesson.pdf:
+            raise exceptions.NotFound('The lesson has no file')
+        return Response({
+            'url': request.build_absolute_uri(sign_lesson_media(lesson)),
+            'expires_in': settings.LESSON_MEDIA_URL_LIFETIME,
+        })
+
+
+class LessonMediaView(APIView):
+    """Serve the lesson file a signed URL grants, with Range support"""
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+
+    def get(self, request, token):
+        try:
+            name = load_lesson_media(token)
+        except signing.BadSignature:
+            raise exceptions.PermissionDenied('Invalid or expired link')
         try:
-            student = models.Student.objects.get(
-                user=self.request.user
+            return ranged_file_response(
+                request, default_storage.path(name), name
             )
-            course = student.course
-            subjects = course.subjects.all()
-            exists = False
-            for subject in subjects:
-                exists = models.Lesson.objects.filter(
-                    subject=subject
-                ).exists()
-                if exists:
-                    break
-
-            if not exists:
-                raise exceptions.PermissionDenied(
-                    'The student can only access the lessons of the course in which he is enrolled'
-                )
-            return queryset
-        except exceptions.PermissionDenied as e:
-            raise e
-        except:
-            raise exceptions.PermissionDenied(
-                    'Only a student can watch a lesson'
-                )
\ No newline at end of file
+        except FileNotFoundError:
+            raise Http404
+
+
+class RestoreUserAPIView(APIView):
+    """Move an archived user and its students back to the live tables"""
+    permission_classes = (SchoolAdministrators,)
+
+    def post(self, request, pk):
+        try:
+            user = restore_user(pk)
+        except ArchivedUser.DoesNotExist:
+            raise Http404
+        except RestoreError as e:
+            raise exceptions.ValidationError(str(e))
+        return Response(
+            {'id': user.pk, 'email': user.email},
+            status=status.HTTP_201_CREATED
+        )